@@ -1,266 +1,196 @@
 import streamlit as st
-import cv2
-import numpy as np
 import os
-import joblib
-from skimage.feature import hog, local_binary_pattern
-import mysql.connector
-import bcrypt
-import base64
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from signature_verification import (
+    CANCELLED, CANDIDATE, CURRENT, DEFAULT_ROUNDS, DEFAULT_THRESHOLD, FAILED, FEATURE_DTYPE, INDEX_DIR, REGISTRY,
+    STATIC_DIR, TRACER, WALLPAPER, CachedResult, HasherBusy, JobManager, LoginThrottle, LoginThrottled, ModelRegistry,
+    ModelStore, PasswordHasher, ReferenceIndex, ResultCache, ShadowScorer, UserStoreError, counter,
+    create_user_store, extract_single_feature, feature_length, featurize_image_bytes, histogram, iter_scored,
+    iter_zip_images, make_cache_key, make_job_id, page_style, preprocess_single_image, results_to_csv, score,
+    start_http_server,
+)
+
+MODEL_FILENAME = "signature_model.joblib"
+JOB_POLL_SECONDS = 0.5      # progress refresh interval for running jobs
+INLINE_WAIT_SECONDS = 0.5   # single uploads that finish within this render without polling
+BATCH_CHUNK_SIZE = 32       # rows classified (and shown) at a time while a batch runs
+
+logger = logging.getLogger(__name__)
+
+LOGIN_MS = histogram("signature_login_ms", "Sign-in check latency (throttle + user lookup + bcrypt) in ms.")
+LOGINS = counter("signature_logins_total", "Sign-in attempts by outcome.", labels=("outcome",))
 
 # --- Function to Set Advanced Styling & Background ---
-def set_styling(image_file):
+def set_styling():
     """
-    Sets a background image and applies advanced CSS for a Glassmorphism UI.
+    Applies the Glassmorphism UI styles. The CSS is built once per process (page_assets.py)
+    and the wallpaper is served as a static file rather than re-encoded on every rerun.
     """
-    if not os.path.exists(image_file):
-        st.error(f"Background image not found at {image_file}")
+    font_source = st.secrets.get("ui", {}).get("fonts", "google")
+    style = page_style(static_serving=bool(st.get_option("server.enableStaticServing")), font_source=font_source)
+    if style is None:
+        st.error(f"Background image not found at {os.path.join(STATIC_DIR, WALLPAPER)}")
         return
-        
-    with open(image_file, "rb") as f:
-        img_bytes = f.read()
-    
-    encoded_img = base64.b64encode(img_bytes).decode()
-    
-    # Advanced CSS styling
-    page_style = f"""
-    <style>
-    /* Import Fonts: Dancing Script (Headers) & Poppins (Body) */
-    @import url('https://fonts.googleapis.com/css2?family=Dancing+Script:wght@700&family=Poppins:wght@300;400;600&display=swap');
-
-    /* --- Global Styles --- */
-    .stApp {{
-        background-image: url("data:image/avif;base64,{encoded_img}");
-        background-size: cover;
-        background-position: center;
-        background-attachment: fixed;
-    }}
-
-    /* --- Animations --- */
-    @keyframes slideUpFade {{
-        0% {{
-            opacity: 0;
-            transform: translateY(50px);
-        }}
-        100% {{
-            opacity: 1;
-            transform: translateY(0);
-        }}
-    }}
-
-    @keyframes pulseGlow {{
-        0% {{ box-shadow: 0 0 15px rgba(118, 75, 162, 0.3); }}
-        50% {{ box-shadow: 0 0 25px rgba(118, 75, 162, 0.6); }}
-        100% {{ box-shadow: 0 0 15px rgba(118, 75, 162, 0.3); }}
-    }}
-
-    /* --- Glassmorphism Main Container --- */
-    .main .block-container {{
-        background: rgba(0, 0, 0, 0.65);
-        backdrop-filter: blur(20px);
-        -webkit-backdrop-filter: blur(20px);
-        border-radius: 25px;
-        padding: 3rem !important;
-        /* Neon Glow Border */
-        border: 1px solid rgba(255, 255, 255, 0.1);
-        box-shadow: 0 8px 32px 0 rgba(0, 0, 0, 0.5);
-        max-width: 1100px;
-        margin-top: 2rem;
-        /* Apply Entrance Animation */
-        animation: slideUpFade 1s ease-out forwards;
-    }}
-
-    /* --- Typography --- */
-    h1, h2, h3 {{
-        font-family: 'Dancing Script', cursive !important;
-        font-weight: 700 !important;
-    }}
-    
-    /* Gradient Title */
-    h1 {{ 
-        font-size: 4.5rem !important; 
-        margin-bottom: 0.5rem !important; 
-        background: linear-gradient(to right, #ffffff, #a8c0ff);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        text-shadow: 0px 0px 20px rgba(168, 192, 255, 0.3);
-    }}
-
-    h2 {{ font-size: 2.8rem !important; color: #ffffff !important; }}
-    h3 {{ font-size: 2rem !important; color: #e0e0e0 !important; }}
-
-    p, label, .stMarkdown {{
-        font-family: 'Poppins', sans-serif !important;
-        color: #d1d1d1 !important;
-        font-size: 1.1rem !important;
-        line-height: 1.6;
-    }}
-
-    /* --- Interactive Input Fields --- */
-    .stTextInput > div > div > input {{
-        background-color: rgba(255, 255, 255, 0.9);
-        color: #333 !important;
-        border-radius: 12px;
-        border: 2px solid transparent;
-        padding: 12px 15px;
-        font-size: 1rem;
-        transition: all 0.3s ease;
-    }}
-    
-    /* Focus Effect: Glows and expands slightly */
-    .stTextInput > div > div > input:focus {{
-        border-color: #764ba2;
-        box-shadow: 0 0 15px rgba(118, 75, 162, 0.5);
-        transform: scale(1.02);
-        background-color: #ffffff;
-    }}
-
-    .stTextInput label {{
-        font-weight: 600 !important;
-        color: #ffffff !important;
-        letter-spacing: 0.5px;
-    }}
-
-    /* --- Buttons --- */
-    .stButton > button {{
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white !important;
-        border-radius: 50px;
-        border: none;
-        padding: 0.7rem 2.5rem;
-        font-size: 1.2rem !important;
-        font-weight: 600;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.3);
-        transition: all 0.3s ease;
-        width: 100%;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }}
-    
-    .stButton > button:hover {{
-        transform: translateY(-4px) scale(1.02);
-        box-shadow: 0 10px 25px rgba(118, 75, 162, 0.6);
-        background: linear-gradient(135deg, #764ba2 0%, #667eea 100%);
-    }}
-
-    /* --- Tabs --- */
-    .stTabs [data-baseweb="tab-list"] {{
-        gap: 10px;
-        border-bottom: none;
-    }}
-    .stTabs [data-baseweb="tab"] {{
-        background-color: rgba(255,255,255,0.05);
-        border-radius: 30px;
-        color: #aaa;
-        border: 1px solid rgba(255,255,255,0.1);
-        padding: 10px 25px;
-        transition: all 0.3s;
-    }}
-    .stTabs [aria-selected="true"] {{
-        background-color: #764ba2 !important;
-        color: white !important;
-        border: 1px solid #764ba2;
-        font-weight: bold;
-        box-shadow: 0 0 15px rgba(118, 75, 162, 0.4);
-    }}
-    
-    /* --- Sidebar --- */
-    [data-testid="stSidebar"] {{
-        background-color: rgba(15, 15, 20, 0.98);
-        border-right: 1px solid rgba(255,255,255,0.05);
-    }}
-    </style>
-    """
-    st.markdown(page_style, unsafe_allow_html=True)
+    st.markdown(style, unsafe_allow_html=True)
 
 # --- Helper Functions ---
-def preprocess_single_image(image_bytes, image_size=(256, 128)):
-    nparr = np.frombuffer(image_bytes, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
-    if img is not None:
-        resized_img = cv2.resize(img, image_size)
-        _, binarized_img = cv2.threshold(resized_img, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-        return binarized_img, cv2.resize(img, (400, 200))
-    return None, None
-
-def extract_single_feature(image):
-    hog_features = hog(image, orientations=9, pixels_per_cell=(8, 8),
-                       cells_per_block=(2, 2), block_norm='L2-Hys')
-    lbp = local_binary_pattern(image, P=24, R=8, method="uniform")
-    (lbp_hist, _) = np.histogram(lbp.ravel(), bins=np.arange(0, 27), range=(0, 26))
-    lbp_hist = lbp_hist.astype("float")
-    lbp_hist /= (lbp_hist.sum() + 1e-7)
-    combined_features = np.hstack([hog_features, lbp_hist])
-    return combined_features.reshape(1, -1)
+@st.cache_resource
+def get_model_store():
+    """ Versioned model store configured by the optional [model] secrets section. """
+    return ModelStore(st.secrets.get("model", {}).get("store", "models"))
+
+@st.cache_resource
+def get_model_registry():
+    """
+    One registry per server process, shared by every session. Serves the store's CURRENT
+    version (hot-swapped when the pointer moves); until a version is activated it serves
+    MODEL_FILENAME, checked on every call so a later activation is picked up live.
+    """
+    return ModelRegistry.for_store(get_model_store(), CURRENT, fallback=MODEL_FILENAME)
+
+@st.cache_resource
+def get_shadow_scorer():
+    """ Scores live uploads with the store's CANDIDATE version in the background (idle while none is set). """
+    return ShadowScorer(ModelRegistry.for_store(get_model_store(), CANDIDATE))
+
+@st.cache_resource
+def get_result_cache():
+    """ Result cache shared by all sessions; configured by the optional [cache] secrets section. """
+    cache_config = st.secrets.get("cache", {})
+    return ResultCache(max_entries=cache_config.get("max_entries", 256),
+                       spill_path=cache_config.get("spill_path"))
+
+def is_admin():
+    """ True if the signed-in user is listed under [admin] usernames in secrets.toml. """
+    admins = st.secrets.get("admin", {}).get("usernames", [])
+    return st.session_state.get("username") in admins
+
+@st.cache_resource
+def get_metrics_server():
+    """
+    Starts the Prometheus endpoint (/metrics, /traces) once per process if [metrics] port
+    is set in secrets.toml; [metrics] tracing = true turns on span recording.
+    """
+    metrics_config = st.secrets.get("metrics", {})
+    TRACER.enabled = TRACER.enabled or bool(metrics_config.get("tracing", False))
+    port = metrics_config.get("port")
+    if not port:
+        return None
+    try:
+        return start_http_server(int(port), metrics_config.get("host", "127.0.0.1"))
+    except OSError as err:
+        logger.warning("Metrics endpoint not started on port %s: %s", port, err)
+        return None
+
+def metrics_panel():
+    """ Admin-only view of the process's counters and latency histograms. """
+    counters, histograms = REGISTRY.snapshot()
+    with st.expander("Metrics"):
+        if histograms:
+            st.dataframe(histograms, use_container_width=True, hide_index=True)
+        if counters:
+            st.dataframe(counters, use_container_width=True, hide_index=True)
+        if TRACER.enabled:
+            st.caption("Recent spans")
+            st.dataframe([{"name": span["name"], "ms": span["duration_ms"], "trace": span["trace_id"],
+                           "parent": span["parent_id"], "error": span.get("error")}
+                          for span in reversed(TRACER.recent(50))], use_container_width=True, hide_index=True)
+
+@st.cache_resource
+def get_featurize_pool():
+    """
+    Worker processes shared by all sessions for batch featurization. Started from a fork
+    server, not forked from this multithreaded process: a forked worker could inherit a
+    lock (e.g. a metrics histogram's) held by another thread at that moment and hang.
+    """
+    return ProcessPoolExecutor(mp_context=multiprocessing.get_context("forkserver"))
 
 # --- Database Logic ---
-def get_db_connection():
+@st.cache_resource
+def get_user_store():
+    """ One pooled user store per server process; the backend is set in [database] of secrets.toml. """
+    return create_user_store(st.secrets["database"])
+
+def load_user_store():
     try:
-        db_config = st.secrets["database"]
-        conn = mysql.connector.connect(
-            host=db_config["host"],
-            user=db_config["user"],
-            password=db_config["password"],
-            database=db_config["db_name"],
-            port=db_config["port"]
-        )
-        return conn
-    except mysql.connector.Error as err:
+        return get_user_store()
+    except UserStoreError as err:
         st.error(f"Error connecting to database: {err}")
         return None
     except Exception as e:
         st.error(f"Configuration Error: Please check your `.streamlit/secrets.toml` file. Details: {e}")
         return None
 
+@st.cache_resource
+def get_password_hasher():
+    """ bcrypt worker pool shared by all sessions; cost and size come from [auth] in secrets.toml. """
+    auth_config = st.secrets.get("auth", {})
+    return PasswordHasher(rounds=auth_config.get("bcrypt_rounds", DEFAULT_ROUNDS),
+                          max_workers=auth_config.get("hash_workers", 4))
+
+@st.cache_resource
+def get_login_throttle():
+    """ Per-username failed sign-in limits shared by all sessions. """
+    auth_config = st.secrets.get("auth", {})
+    return LoginThrottle(max_failures=auth_config.get("max_failed_logins", 5),
+                         window=auth_config.get("throttle_window_seconds", 300))
+
 def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    return get_password_hasher().hash(password)
 
 def verify_password(plain_password, hashed_password):
-    if isinstance(hashed_password, str):
-        hashed_password = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password)
+    return get_password_hasher().verify(plain_password, hashed_password)
 
 def check_credentials(username, password):
-    conn = get_db_connection()
-    if conn is None: return False
+    """ Raises LoginThrottled before any bcrypt work if the user has too many recent failures. """
+    with LOGIN_MS.time():
+        outcome = _check_credentials(username, password)
+    LOGINS.inc(outcome=outcome)
+    return outcome == "success"
+
+def _check_credentials(username, password):
+    throttle = get_login_throttle()
     try:
-        cursor = conn.cursor(buffered=True)
-        cursor.execute("SELECT password_hash FROM users WHERE username = %s", (username,))
-        result = cursor.fetchone()
-        if result:
-            return verify_password(password, result[0])
-        return False
-    finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+        throttle.check(username)
+    except LoginThrottled:
+        LOGINS.inc(outcome="throttled")
+        raise
+    store = load_user_store()
+    if store is None: return "error"
+    try:
+        password_hash = store.get_password_hash(username)
+    except UserStoreError as err:
+        st.error(f"Database error: {err}")
+        return "error"
+    if password_hash and verify_password(password, password_hash):
+        throttle.record_success(username)
+        return "success"
+    throttle.record_failure(username)
+    return "failure"
 
 def add_user(username, password):
-    conn = get_db_connection()
-    if conn is None: return False, "Database connection failed."
+    store = load_user_store()
+    if store is None: return False, "Database connection failed."
     try:
-        cursor = conn.cursor(buffered=True)
-        cursor.execute("SELECT username FROM users WHERE username = %s", (username,))
-        if cursor.fetchone():
+        if store.user_exists(username):
+            return False, "Username already exists."
+        if not store.create_user(username, hash_password(password)):
             return False, "Username already exists."
-        
-        hashed_pw = hash_password(password)
-        cursor.execute("INSERT INTO users (username, password_hash) VALUES (%s, %s)", (username, hashed_pw.decode('utf-8')))
-        conn.commit()
         return True, "User registered successfully!"
-    except mysql.connector.Error as err:
+    except UserStoreError as err:
         return False, f"Database error: {err}"
-    finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+    except HasherBusy as err:
+        return False, str(err)
 
 # --- Main App Configuration ---
 
 st.set_page_config(page_title="Signature Forgery Detection", layout="wide")
 
 # Apply the new styling function
-set_styling('wallpaper.jpg')
+set_styling()
 
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
@@ -299,12 +229,16 @@ def authentication_page():
                     st.write("")
                     submitted = st.form_submit_button("Sign In")
                     if submitted:
-                        if check_credentials(username, password):
-                            st.session_state.logged_in = True
-                            st.success("Logged in successfully!")
-                            st.rerun()
-                        else:
-                            st.error("Invalid username or password.")
+                        try:
+                            if check_credentials(username, password):
+                                st.session_state.logged_in = True
+                                st.session_state.username = username
+                                st.success("Logged in successfully!")
+                                st.rerun()
+                            else:
+                                st.error("Invalid username or password.")
+                        except (LoginThrottled, HasherBusy) as err:
+                            st.error(str(err))
 
             with tab2:
                 st.write("")
@@ -327,6 +261,223 @@ def authentication_page():
                                 st.error(message)
             st.markdown("</div>", unsafe_allow_html=True)
 
+# --- Background Scoring Jobs ---
+@st.cache_resource
+def get_job_manager():
+    """ Scoring job threads shared by all sessions; sized by the optional [jobs] secrets section. """
+    jobs_config = st.secrets.get("jobs", {})
+    return JobManager(jobs_config.get("workers", 4), jobs_config.get("keep_finished", 64))
+
+def _score_upload_job(job, cache, shadow, model, key, image_bytes):
+    """ Job body: the CachedResult for one upload (None if it can't be decoded), computed on a cache miss. """
+    result = cache.get(key)
+    if result is None:
+        processed_image, _ = preprocess_single_image(image_bytes)
+        if processed_image is None:
+            return None
+        feature_vector = extract_single_feature(processed_image).astype(FEATURE_DTYPE)
+        scored = score(model, feature_vector)
+        result = CachedResult(processed_image, feature_vector, int(scored.labels[0]),
+                              float(scored.confidences[0]), float(scored.margins[0]))
+        cache.put(key, result)
+        shadow.submit(feature_vector, result.label, result.confidence)
+    return result
+
+def _score_batch_job(job, model, named_images, executor):
+    """ Job body: scores a batch, publishing rows as each chunk is classified, until done or cancelled. """
+    rows = iter_scored(model, named_images, executor=executor, chunk_size=BATCH_CHUNK_SIZE)
+    try:
+        for row in rows:
+            job.add(row)
+            if job.cancelled:
+                break
+    finally:
+        rows.close()
+
+def score_upload(model, model_version, uploaded_file, slot):
+    """
+    Returns the job scoring an upload. Its id is the result-cache key, so reruns reuse it.
+    A failed job for the same bytes is restarted when the file is uploaded again (a new
+    file_id in this ``slot``), not on every rerun, which would retry a lasting failure forever.
+    """
+    image_bytes = uploaded_file.getvalue()
+    key = make_cache_key(image_bytes, model_version)
+    seen_key = f"{slot}_upload_id"
+    restart = st.session_state.get(seen_key) != uploaded_file.file_id
+    st.session_state[seen_key] = uploaded_file.file_id
+    return get_job_manager().submit(key, _score_upload_job, get_result_cache(), get_shadow_scorer(),
+                                    model, key, image_bytes, restart=restart)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_progress(job_id, message, show_rows=False):
+    """ Redraws a running job every JOB_POLL_SECONDS and reruns the page once it has finished. """
+    job = get_job_manager().get(job_id)
+    if job is None or job.done:
+        st.rerun()
+    rows = job.rows()
+    progress = job.progress()
+    if progress is None:
+        st.info(message)
+    else:
+        st.progress(progress, text=f"{message} {len(rows)} of {job.total} ({job.elapsed:.1f}s)")
+    if show_rows and rows:
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+    if show_rows and st.button("Cancel", key=f"cancel_{job_id}"):
+        job.cancel()
+
+def job_ready(job, message, wait=INLINE_WAIT_SECONDS, show_rows=False):
+    """
+    True once ``job`` has finished. Quick jobs finish within ``wait`` seconds and render in
+    this run; otherwise a self-refreshing progress fragment is drawn and the session stays
+    responsive until it reruns the page. A failed job shows its error and returns False.
+    """
+    if not job.wait(wait):
+        job_progress(job.id, message, show_rows)
+        return False
+    if job.status == FAILED:
+        st.error(f"Scoring failed: {job.error}")
+        return False
+    return True
+
+# --- Single & Batch Verification Views ---
+def single_verification(model, model_version):
+    uploaded_file = st.file_uploader("Choose a signature image...", type=["png", "jpg", "jpeg", "avif"], label_visibility="collapsed")
+
+    if uploaded_file is not None:
+        st.write("")
+        col1, col2 = st.columns(2, gap="large")
+        
+        with col1:
+            st.markdown("<h3>Uploaded Signature</h3>", unsafe_allow_html=True)
+            st.image(uploaded_file.getvalue(), use_container_width=True)
+        
+        with col2:
+            st.markdown("<h3>Prediction Analysis</h3>", unsafe_allow_html=True)
+            job = score_upload(model, model_version, uploaded_file, "single")
+            if job_ready(job, "Analyzing signature patterns..."):
+                scored = job.result
+                if scored is not None:
+                    confidence = scored.confidence * 100
+                    
+                    if scored.label == 1:
+                        result = "Genuine"
+                        st.markdown(f"""
+                            <div style='background-color: rgba(0, 200, 83, 0.2); padding: 20px; border-radius: 15px; border: 2px solid #00c853; text-align: center; animation: pulseGlow 2s infinite;'>
+                                <h2 style='color: #00e676 !important; margin:0;'>Genuine</h2>
+                                <p style='margin:0;'>Confidence: <strong>{confidence:.2f}%</strong></p>
+                            </div>
+                        """, unsafe_allow_html=True)
+                    else:
+                        result = "Forged"
+                        st.markdown(f"""
+                            <div style='background-color: rgba(255, 23, 68, 0.2); padding: 20px; border-radius: 15px; border: 2px solid #ff1744; text-align: center; animation: pulseGlow 2s infinite;'>
+                                <h2 style='color: #ff5252 !important; margin:0;'>Forged</h2>
+                                <p style='margin:0;'>Confidence: <strong>{confidence:.2f}%</strong></p>
+                            </div>
+                        """, unsafe_allow_html=True)
+                    
+                    st.write("")
+                    st.progress(int(confidence))
+
+                    with st.expander("Show Preprocessed Image"):
+                        st.image(scored.processed_image, caption="Binarized & Resized Image (Model Input)", use_container_width=True)
+                else:
+                    st.error("Could not process the uploaded image.")
+
+def batch_verification(model, model_version):
+    st.write("Upload many signature images, or ZIP archives of them, to score the whole bundle in one pass.")
+    uploaded_files = st.file_uploader("Choose signature images or ZIP archives...", type=["png", "jpg", "jpeg", "avif", "zip"],
+                                      accept_multiple_files=True, label_visibility="collapsed", key="batch_uploader")
+
+    if uploaded_files and st.button("Score Batch"):
+        named_images = []
+        for uploaded in uploaded_files:
+            if uploaded.name.lower().endswith(".zip"):
+                named_images.extend(iter_zip_images(io.BytesIO(uploaded.getvalue()), prefix=uploaded.name + "/"))
+            else:
+                named_images.append((uploaded.name, uploaded.getvalue()))
+        job_id = make_job_id("batch", model_version, named_images)
+        get_job_manager().submit(job_id, _score_batch_job, model, named_images, get_featurize_pool(),
+                                 total=len(named_images), restart=True)
+        st.session_state.batch_job_id = job_id
+
+    job = get_job_manager().get(st.session_state.get("batch_job_id"))
+    if job is None or not job_ready(job, "Analyzing signatures...", wait=0, show_rows=True):
+        return
+    results = job.rows()
+    if job.status == CANCELLED:
+        st.warning(f"Cancelled after {len(results)} of {job.total} images.")
+    if results:
+        failed = sum(1 for row in results if row["error"])
+        genuine = sum(1 for row in results if row["label"] == "Genuine")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Images", len(results))
+        col2.metric("Genuine", genuine)
+        col3.metric("Forged", len(results) - genuine - failed)
+        col4.metric("Total Time", f"{job.elapsed:.2f}s")
+        st.dataframe(results, use_container_width=True, hide_index=True)
+        st.download_button("Download CSV", results_to_csv(results), file_name="signature_results.csv", mime="text/csv")
+
+@st.cache_resource
+def get_reference_index():
+    """ Enrolled reference signatures, shared by all sessions and saved to disk on every change. """
+    return ReferenceIndex.load(INDEX_DIR, dim=feature_length())
+
+def customer_verification(model, model_version):
+    try:
+        index = get_reference_index()
+    except ValueError as err:  # index built with other feature parameters; not cached, so a rebuild is picked up
+        st.error(f"{err} Move '{INDEX_DIR}' aside and rebuild it with `python enrollment.py enroll-dataset` "
+                 f"(customers enrolled here must be enrolled again).")
+        return
+    threshold = st.secrets.get("enrollment", {}).get("threshold", DEFAULT_THRESHOLD)
+    st.write(f"Compare a signature with the references enrolled for a customer. {len(index.customers)} customers enrolled.")
+    enroll_col, verify_col = st.columns(2, gap="large")
+
+    with enroll_col:
+        st.markdown("<h3>Enroll Customer</h3>", unsafe_allow_html=True)
+        customer_id = st.text_input("Customer ID", key="enroll_customer_id")
+        references = st.file_uploader("Reference signatures", type=["png", "jpg", "jpeg", "avif"],
+                                      accept_multiple_files=True, key="enroll_uploader")
+        if st.button("Enroll References"):
+            if not customer_id or not references:
+                st.warning("Please enter a customer ID and upload at least one reference signature.")
+            else:
+                vectors = [featurize_image_bytes(reference.getvalue()) for reference in references]
+                failed = [reference.name for reference, vector in zip(references, vectors) if vector is None]
+                vectors = [vector for vector in vectors if vector is not None]
+                if vectors:
+                    index.enroll(customer_id, vectors)
+                    index.save(INDEX_DIR)
+                    st.success(f"Enrolled {len(vectors)} reference(s) for '{customer_id}' "
+                               f"({index.reference_count(customer_id)} in total).")
+                if failed:
+                    st.error(f"Could not process: {', '.join(failed)}")
+
+    with verify_col:
+        st.markdown("<h3>Verify Signature</h3>", unsafe_allow_html=True)
+        verify_id = st.text_input("Customer ID", key="verify_customer_id")
+        questioned = st.file_uploader("Questioned signature", type=["png", "jpg", "jpeg", "avif"], key="verify_uploader")
+        if verify_id and questioned is not None:
+            if index.reference_count(verify_id) == 0:
+                st.warning(f"No references enrolled for '{verify_id}'.")
+            else:
+                job = score_upload(model, model_version, questioned, "verify")
+                if job_ready(job, "Scoring signature..."):
+                    scored = job.result
+                    if scored is None:
+                        st.error("Could not process the uploaded image.")
+                    else:
+                        similarity = index.verify(verify_id, scored.feature_vector[0])
+                        matched = similarity >= threshold
+                        color, border, verdict = ("#00e676", "#00c853", "Matches References") if matched else ("#ff5252", "#ff1744", "Does Not Match")
+                        st.markdown(f"""
+                            <div style='background-color: rgba(255, 255, 255, 0.08); padding: 20px; border-radius: 15px; border: 2px solid {border}; text-align: center;'>
+                                <h2 style='color: {color} !important; margin:0;'>{verdict}</h2>
+                                <p style='margin:0;'>Similarity: <strong>{similarity:.3f}</strong> (threshold {threshold:.2f}, {index.reference_count(verify_id)} references)</p>
+                            </div>
+                        """, unsafe_allow_html=True)
+
 # --- Main Prediction Page ---
 def signature_detection_app():
     with st.sidebar:
@@ -338,8 +489,34 @@ def signature_detection_app():
         st.write("**Model:** Support Vector Machine (SVM)")
         st.write("**Features:** HOG + LBP")
         st.markdown("---")
+        if is_admin():
+            st.markdown("<h3>Admin</h3>", unsafe_allow_html=True)
+            stats = get_result_cache().stats()
+            st.write(f"**Result cache:** {stats['entries']} entries")
+            st.write(f"**Hits:** {stats['hits']} memory, {stats['disk_hits']} disk · **Misses:** {stats['misses']}")
+            st.write(f"**Hit rate:** {stats['hit_rate']:.1%}")
+            if st.button("Clear Cache"):
+                get_result_cache().clear()
+                st.rerun()
+            metrics_panel()
+            job_stats = get_job_manager().stats()
+            st.write(f"**Scoring jobs:** {job_stats['running']} running, {job_stats['finished']} finished")
+            registry = get_model_registry()
+            try:
+                st.write(f"**Model version:** {registry.get_versioned()[1][:24]}")
+            except (FileNotFoundError, ValueError):
+                st.write("**Model version:** not loaded")
+            if registry.last_error:
+                st.warning(f"Model reload failed, still serving the previous version: {registry.last_error}")
+            if get_model_store().read_pointer(CANDIDATE) is not None:
+                shadow_stats = get_shadow_scorer().stats()
+                st.write(f"**Shadow model:** {shadow_stats['candidate'] or 'pending'}")
+                st.write(f"**Disagreement:** {shadow_stats['disagreement_rate']:.1%} of {shadow_stats['compared']} "
+                         f"· **Dropped:** {shadow_stats['dropped']}")
+            st.markdown("---")
         if st.button("Logout"):
             st.session_state.logged_in = False
+            st.session_state.username = None
             st.rerun()
 
     # Main Content
@@ -351,59 +528,26 @@ def signature_detection_app():
     </div>
     """, unsafe_allow_html=True)
 
-    MODEL_FILENAME = "signature_model.joblib"
-    if not os.path.exists(MODEL_FILENAME):
-        st.error(f"Error: Model file '{MODEL_FILENAME}' not found!")
-    else:
-        model = joblib.load(MODEL_FILENAME)
-        
-        uploaded_file = st.file_uploader("Choose a signature image...", type=["png", "jpg", "jpeg", "avif"], label_visibility="collapsed")
-
-        if uploaded_file is not None:
-            st.write("")
-            col1, col2 = st.columns(2, gap="large")
-            
-            with col1:
-                st.markdown("<h3>Uploaded Signature</h3>", unsafe_allow_html=True)
-                st.image(uploaded_file.getvalue(), use_container_width=True)
-            
-            with col2:
-                st.markdown("<h3>Prediction Analysis</h3>", unsafe_allow_html=True)
-                with st.spinner('Analyzing signature patterns...'):
-                    processed_image, _ = preprocess_single_image(uploaded_file.getvalue())
-                    if processed_image is not None:
-                        feature_vector = extract_single_feature(processed_image)
-                        prediction = model.predict(feature_vector)
-                        probabilities = model.predict_proba(feature_vector)
-                        
-                        if prediction[0] == 1:
-                            result = "Genuine"
-                            confidence = probabilities[0][1] * 100
-                            st.markdown(f"""
-                                <div style='background-color: rgba(0, 200, 83, 0.2); padding: 20px; border-radius: 15px; border: 2px solid #00c853; text-align: center; animation: pulseGlow 2s infinite;'>
-                                    <h2 style='color: #00e676 !important; margin:0;'>Genuine</h2>
-                                    <p style='margin:0;'>Confidence: <strong>{confidence:.2f}%</strong></p>
-                                </div>
-                            """, unsafe_allow_html=True)
-                        else:
-                            result = "Forged"
-                            confidence = probabilities[0][0] * 100
-                            st.markdown(f"""
-                                <div style='background-color: rgba(255, 23, 68, 0.2); padding: 20px; border-radius: 15px; border: 2px solid #ff1744; text-align: center; animation: pulseGlow 2s infinite;'>
-                                    <h2 style='color: #ff5252 !important; margin:0;'>Forged</h2>
-                                    <p style='margin:0;'>Confidence: <strong>{confidence:.2f}%</strong></p>
-                                </div>
-                            """, unsafe_allow_html=True)
-                        
-                        st.write("")
-                        st.progress(int(confidence))
-
-                        with st.expander("Show Preprocessed Image"):
-                            st.image(processed_image, caption="Binarized & Resized Image (Model Input)", use_container_width=True)
-                    else:
-                        st.error("Could not process the uploaded image.")
+    model = model_version = None
+    try:
+        model, model_version = get_model_registry().get_versioned()
+    except FileNotFoundError:
+        st.error(f"Error: No model found! Please run `train_model.py` to create '{MODEL_FILENAME}' "
+                 f"or activate a version with `manage_models.py`.")
+    except ValueError as err:
+        st.error(f"Error: Invalid model file. {err}")
+
+    if model is not None:
+        single_tab, batch_tab, customer_tab = st.tabs(["Single Signature", "Batch Verification", "Enrolled Customers"])
+        with single_tab:
+            single_verification(model, model_version)
+        with batch_tab:
+            batch_verification(model, model_version)
+        with customer_tab:
+            customer_verification(model, model_version)
 
 # --- Router ---
+get_metrics_server()
 if not st.session_state.logged_in:
     authentication_page()
 else:
@@ -0,0 +1,175 @@
+# augment_dataset.py (Synthetic Signature Generator)
+#
+# Generates realistic variants of dataset/real and dataset/forge (rotation, scale,
+# stroke-width jitter, noise and rescan resolution; see signature_verification/augment.py).
+# The same --seed always produces the same images. Output goes to a dataset folder or a
+# ZIP, or is streamed straight into a scoring path without writing anything to disk:
+#
+#   python augment_dataset.py --count 20000 --output synthetic/        # real/ + forge/, usable as --dataset
+#   python augment_dataset.py --count 20000 --output synthetic.zip     # one archive for batch_score.py
+#   python augment_dataset.py --count 5000 --score                     # in-process batch scoring (iter_scored)
+#   python augment_dataset.py --count 0 --url http://127.0.0.1:8000/score --concurrency 8   # until Ctrl+C
+#   python augment_dataset.py --count 2000 --score --resolution 4 8    # production-sized scans
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from signature_verification import AUGMENT_PARAMS, FEATURE_ENGINES, ModelRegistry, iter_augmented, iter_scored
+from train_model import DATASET_DIR, MODEL_FILENAME, list_dataset
+
+LABEL_NAMES = {1: "Genuine", 0: "Forged"}
+
+
+def load_sources(dataset_dir):
+    """ Returns [(relative_path, label, bytes)] for every dataset image, read once. """
+    sources = []
+    for rel_path, label in list_dataset(dataset_dir):
+        with open(os.path.join(dataset_dir, rel_path), "rb") as f:
+            sources.append((rel_path, label, f.read()))
+    return sources
+
+
+# --- Sinks ---
+
+def write_images(stream, output):
+    """ Writes the stream to a ZIP (``*.zip``) or a folder with the dataset's real/ + forge/ layout. """
+    count = 0
+    if output.lower().endswith(".zip"):
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_STORED) as archive:  # PNG/JPEG don't compress further
+            for name, _, data in stream:
+                archive.writestr(name, data)
+                count += 1
+    else:
+        for name, _, data in stream:
+            path = os.path.join(output, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+            count += 1
+    return count
+
+def score_in_process(stream, model_path, workers=None, chunk_size=256, engine=None):
+    """ Scores the stream with batch.iter_scored; yields (expected label, predicted label, featurize ms). """
+    model = ModelRegistry(model_path).get()
+    expected = deque()
+
+    def images():
+        for name, label, data in stream:
+            expected.append(label)
+            yield name, data
+
+    for row in iter_scored(model, images(), workers=workers, chunk_size=chunk_size, engine=engine):
+        yield expected.popleft(), row["label"], row["featurize_ms"]
+
+def _post(url, name, data):
+    request = urllib.request.Request(url, data=data, headers={"X-Filename": name}, method="POST")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            label = json.loads(response.read()).get("label")
+    except (urllib.error.URLError, OSError, ValueError):
+        label = None
+    return label, (time.perf_counter() - start) * 1000
+
+def score_over_http(stream, url, concurrency=4):
+    """
+    POSTs each image to scoring_service.py with ``concurrency`` requests in flight; yields
+    (expected label, returned label, request ms). Requests that fail yield a None label.
+    """
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as pool:
+        for name, label, data in stream:
+            in_flight.append((label, pool.submit(_post, url, name, data)))
+            if len(in_flight) >= 2 * concurrency:
+                expected, future = in_flight.popleft()
+                yield (expected, *future.result())
+        while in_flight:
+            expected, future = in_flight.popleft()
+            yield (expected, *future.result())
+
+
+# --- Reporting ---
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1] if len(values) > 1 else values[0]
+
+def run_load(results, report_every=1000):
+    """ Consumes (expected, label, ms) tuples, printing progress, and prints a summary on exit or Ctrl+C. """
+    latencies, correct, failed = [], 0, 0
+    start = time.perf_counter()
+    try:
+        for expected, label, elapsed_ms in results:
+            if label is None:
+                failed += 1
+                continue
+            latencies.append(elapsed_ms)
+            correct += label == LABEL_NAMES[expected]
+            if len(latencies) % report_every == 0:
+                print(f"... {len(latencies)} images ({len(latencies) / (time.perf_counter() - start):.1f}/s)",
+                      file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.perf_counter() - start
+    if not latencies:
+        print(f"No images scored ({failed} failed).")
+        return
+    print(f"Scored {len(latencies)} images ({failed} failed) in {elapsed:.1f}s: {len(latencies) / elapsed:.1f} images/s.")
+    print(f"Latency ms: p50 {percentile(latencies, 50):.1f}  p95 {percentile(latencies, 95):.1f}  "
+          f"p99 {percentile(latencies, 99):.1f}")
+    print(f"Accuracy on augmented images: {correct / len(latencies):.4f}")
+
+
+# --- Command Line ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate augmented signature images for training and load tests.")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="folder containing real/ and forge/ sub-folders")
+    parser.add_argument("--count", type=int, default=1000, help="images to generate; 0 streams until interrupted")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", type=int, default=0, help="index of the first image (resume or split a run)")
+    parser.add_argument("--format", choices=("png", "jpg"), default="png")
+    parser.add_argument("--rotation", type=float, default=AUGMENT_PARAMS["rotation"], help="max rotation in degrees")
+    for name, help_text in (("scale", "signature size on the page"),
+                            ("stroke", "pen width change in px per 100 px of height (< 0 thins)"),
+                            ("noise", "Gaussian noise std-dev in grey levels"),
+                            ("resolution", "output size relative to the source (rescan)")):
+        parser.add_argument(f"--{name}", type=float, nargs=2, metavar=("LOW", "HIGH"),
+                            default=AUGMENT_PARAMS[name], help=help_text)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", help="write to this folder, or to a ZIP if it ends in .zip")
+    target.add_argument("--score", action="store_true", help="stream into in-process batch scoring")
+    target.add_argument("--url", help="stream to a scoring_service.py /score endpoint")
+    parser.add_argument("--model", default=MODEL_FILENAME, help="with --score")
+    parser.add_argument("--workers", type=int, default=None, help="with --score: featurization processes")
+    parser.add_argument("--engine", choices=FEATURE_ENGINES, default=None, help="with --score")
+    parser.add_argument("--chunk-size", type=int, default=256, help="with --score: images per classifier call")
+    parser.add_argument("--concurrency", type=int, default=4, help="with --url: requests in flight")
+    args = parser.parse_args()
+    if args.count < 0 or (args.count == 0 and args.output):
+        parser.error("--count must be positive (0, an endless stream, needs --score or --url).")
+
+    params = {"rotation": args.rotation, "scale": tuple(args.scale), "stroke": tuple(args.stroke),
+              "noise": tuple(args.noise), "resolution": tuple(args.resolution)}
+    end = args.start + args.count if args.count else None
+    stream = iter_augmented(load_sources(args.dataset), end, seed=args.seed, params=params,
+                            image_format="." + args.format, start=args.start)
+    if args.output:
+        start = time.perf_counter()
+        count = write_images(stream, args.output)
+        print(f"Wrote {count} images to '{args.output}' in {time.perf_counter() - start:.1f}s.")
+    elif args.score:
+        run_load(score_in_process(stream, args.model, args.workers, args.chunk_size, args.engine))
+    else:
+        run_load(score_over_http(stream, args.url, args.concurrency))
+
+if __name__ == "__main__":
+    main()
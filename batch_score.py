@@ -0,0 +1,173 @@
+# batch_score.py (Batch Verification)
+#
+# Streams images from files, directories and ZIP archives through the scoring
+# pipeline and writes results as they are produced, so memory stays flat for
+# archives of any size:
+#
+#   python batch_score.py scans/ audit.zip --output results.csv
+#   python batch_score.py audit.zip --output results.parquet           # Parquet part files (needs pyarrow)
+#   python batch_score.py audit.zip --output results.csv --resume      # continue an interrupted run
+
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+
+from signature_verification import FEATURE_ENGINES, RESULT_FIELDS, ModelRegistry, iter_image_inputs, iter_scored
+
+
+# --- Result Sinks ---
+
+class CsvSink:
+    """ Appends result rows to a CSV file (or stdout), flushing every ``flush_every`` rows. """
+
+    def __init__(self, path, resume=False, flush_every=64):
+        self.flush_every = flush_every
+        self._count = 0
+        if path == "-":
+            self._file = sys.stdout
+            new_file = True
+        else:
+            new_file = not (resume and os.path.exists(path) and os.path.getsize(path) > 0)
+            self._file = open(path, "w" if new_file else "a", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=RESULT_FIELDS)
+        if new_file:
+            self._writer.writeheader()
+
+    @staticmethod
+    def completed(path):
+        """ Returns the names already in a CSV from an earlier run, dropping a truncated last line. """
+        if not os.path.exists(path):
+            return set()
+        with open(path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+        with open(path, newline="") as f:
+            return {row["name"] for row in csv.DictReader(f)}
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self._count += 1
+        if self._count % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        self._file.flush()
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+class ParquetSink:
+    """
+    Writes result rows to a directory of Parquet part files of ``rows_per_part`` rows.
+    Each part is written under a temporary name and renamed when complete, so an
+    interrupted run leaves only whole parts behind. pandas/pyarrow read the directory
+    as one table.
+    """
+
+    def __init__(self, path, resume=False, rows_per_part=1024):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as err:
+            raise SystemExit("Parquet output requires pyarrow (`pip install pyarrow`).") from err
+        self._pa, self._pq = pa, pq
+        self.path = path
+        self.rows_per_part = rows_per_part
+        self._schema = pa.schema([("name", pa.string()), ("label", pa.string()), ("confidence", pa.float64()),
+                                  ("featurize_ms", pa.float64()), ("classify_ms", pa.float64()),
+                                  ("error", pa.string())])
+        os.makedirs(path, exist_ok=True)
+        existing = self._parts(path)
+        if not resume:
+            for part in existing:
+                os.remove(part)
+            existing = []
+        self._next_part = int(os.path.basename(existing[-1])[5:11]) + 1 if existing else 0
+        self._rows = []
+
+    @staticmethod
+    def _parts(path):
+        return sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+
+    @classmethod
+    def completed(cls, path):
+        """ Returns the names in the complete part files of an earlier run. """
+        if not os.path.isdir(path):
+            return set()
+        import pyarrow.parquet as pq
+        names = set()
+        for part in cls._parts(path):
+            names.update(pq.read_table(part, columns=["name"]).column("name").to_pylist())
+        return names
+
+    def write(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= self.rows_per_part:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        table = self._pa.Table.from_pylist(self._rows, schema=self._schema)
+        final_path = os.path.join(self.path, f"part-{self._next_part:06d}.parquet")
+        tmp_path = final_path + ".tmp"
+        self._pq.write_table(table, tmp_path)
+        os.replace(tmp_path, final_path)
+        self._next_part += 1
+        self._rows = []
+
+    def close(self):
+        self._flush()
+
+
+# --- Command Line ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream many signature images through the scoring pipeline.")
+    parser.add_argument("inputs", nargs="+", help="image files, directories or ZIP archives")
+    parser.add_argument("--model", default="signature_model.joblib")
+    parser.add_argument("--output", default="-", help="CSV path, Parquet directory (*.parquet) or '-' for stdout")
+    parser.add_argument("--format", choices=("csv", "parquet"), default=None,
+                        help="output format (default: parquet if --output ends in .parquet, else csv)")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip inputs already present in --output and append the rest")
+    parser.add_argument("--workers", type=int, default=None, help="featurization processes (default: all cores)")
+    parser.add_argument("--engine", choices=FEATURE_ENGINES, default=None,
+                        help="feature extraction engine (default: $SIGNATURE_FEATURE_ENGINE or skimage)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="images per classifier call")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="images queued for featurization at once (default: 4 x chunk size)")
+    args = parser.parse_args()
+
+    output_format = args.format or ("parquet" if args.output.endswith(".parquet") else "csv")
+    if args.output == "-" and (output_format == "parquet" or args.resume):
+        parser.error("Parquet output and --resume need an --output path.")
+    sink_class = ParquetSink if output_format == "parquet" else CsvSink
+
+    done = sink_class.completed(args.output) if args.resume else set()
+    if done:
+        print(f"Resuming: {len(done)} images already scored in '{args.output}'.", file=sys.stderr)
+
+    model = ModelRegistry(args.model).get()
+    sink = sink_class(args.output, resume=args.resume)
+    start = time.perf_counter()
+    scored = failed = 0
+    try:
+        for row in iter_scored(model, iter_image_inputs(args.inputs, skip=done), workers=args.workers,
+                               chunk_size=args.chunk_size, max_in_flight=args.max_in_flight, engine=args.engine):
+            sink.write(row)
+            scored += 1
+            failed += bool(row["error"])
+            if scored % 1000 == 0:
+                print(f"... {scored} images ({scored / (time.perf_counter() - start):.1f}/s)", file=sys.stderr)
+    finally:
+        sink.close()
+    elapsed = time.perf_counter() - start
+    print(f"Scored {scored - failed} images ({failed} failed) in {elapsed:.2f}s.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
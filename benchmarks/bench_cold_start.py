@@ -0,0 +1,65 @@
+# benchmarks/bench_cold_start.py
+#
+# Measures what a fresh Streamlit server process pays before the login page is
+# on screen: the time to run app.py once (module imports included) in a new
+# interpreter, and which heavy libraries that first run pulled in. Each sample
+# is a separate subprocess, so nothing is warm.
+#
+#   python benchmarks/bench_cold_start.py                 # this checkout
+#   git worktree add /tmp/before HEAD~1
+#   python benchmarks/bench_cold_start.py --repo /tmp/before
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the login page does not need.
+HEAVY_MODULES = ["cv2", "skimage", "sklearn", "joblib", "bcrypt", "mysql.connector", "scipy"]
+
+# Runs inside the child interpreter, with the checkout under test as its working directory.
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_ready = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout=120)
+at.run()
+done = time.perf_counter()
+print(json.dumps({
+    "streamlit_import_ms": (streamlit_ready - start) * 1000,
+    "login_render_ms": (done - streamlit_ready) * 1000,
+    "exception": bool(at.exception),
+    "heavy_loaded": [m for m in HEAVY if m in sys.modules],
+}))
+"""
+
+
+def sample(repo):
+    code = f"HEAVY = {HEAVY_MODULES!r}\n" + CHILD
+    proc = subprocess.run([sys.executable, "-c", code], cwd=repo, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start cost of rendering the login page.")
+    parser.add_argument("--repo", default=ROOT, help="checkout to measure (default: this one)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [sample(args.repo) for _ in range(args.runs)]
+    if any(run["exception"] for run in runs):
+        print("Warning: app.py raised an exception while rendering.")
+    render = [run["login_render_ms"] for run in runs]
+    st_import = [run["streamlit_import_ms"] for run in runs]
+    print(f"Checkout: {args.repo} ({args.runs} fresh processes)")
+    print(f"streamlit import      median {statistics.median(st_import):8.1f} ms")
+    print(f"first login render    median {statistics.median(render):8.1f} ms   "
+          f"(min {min(render):.1f}, max {max(render):.1f})")
+    print(f"heavy modules loaded: {', '.join(runs[-1]['heavy_loaded']) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_login.py
+#
+# Measures sign-in throughput and latency as the number of concurrent sessions
+# grows. Each simulated session runs the same steps as app.check_credentials
+# against a temporary SQLite user store: throttle check -> hash lookup -> bcrypt.
+#
+#   python benchmarks/bench_login.py --rounds 12 --concurrency 1 2 4 8 16
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import bcrypt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signature_verification import LoginThrottle, PasswordHasher, SQLiteUserStore
+
+
+def login(store, hasher, throttle, username, password, inline):
+    throttle.check(username)
+    password_hash = store.get_password_hash(username)
+    if inline:
+        ok = bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+    else:
+        ok = hasher.verify(password, password_hash)
+    if ok:
+        throttle.record_success(username)
+    else:
+        throttle.record_failure(username)
+    return ok
+
+def run_level(store, hasher, throttle, users, concurrency, logins_per_session, inline):
+    latencies, lock = [], threading.Lock()
+
+    def session(index):
+        username = users[index % len(users)]
+        for _ in range(logins_per_session):
+            start = time.perf_counter()
+            login(store, hasher, throttle, username, "correct horse", inline)
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, statistics.median(latencies), latencies[int(0.95 * (len(latencies) - 1))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sign-in throughput under concurrency.")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="PasswordHasher threads")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--logins", type=int, default=4, help="sign-ins per simulated session")
+    parser.add_argument("--inline", action="store_true", help="call bcrypt on the session thread (old behaviour)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteUserStore(os.path.join(tmp, "users.sqlite"))
+        hasher = PasswordHasher(rounds=args.rounds, max_workers=args.workers)
+        throttle = LoginThrottle()
+        users = [f"user{i}" for i in range(max(args.concurrency))]
+        for username in users:
+            store.create_user(username, hasher.hash("correct horse"))
+
+        mode = "inline bcrypt" if args.inline else f"PasswordHasher ({args.workers} workers)"
+        print(f"bcrypt rounds={args.rounds}, {mode}")
+        print(f"{'sessions':>8} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9}")
+        for concurrency in args.concurrency:
+            throughput, p50, p95 = run_level(store, hasher, throttle, users, concurrency, args.logins, args.inline)
+            print(f"{concurrency:>8} {throughput:>10.1f} {p50:>9.1f} {p95:>9.1f}")
+
+if __name__ == "__main__":
+    main()
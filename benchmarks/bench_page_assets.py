@@ -0,0 +1,49 @@
+# benchmarks/bench_page_assets.py
+#
+# Compares the per-rerun cost of the page styling before and after page_assets.py:
+# bytes of <style> sent to the browser on every rerun and the server-side time to
+# build it. The old path read, base64-encoded and inlined static/wallpaper.jpg on
+# every rerun; the new path builds the CSS once and references the wallpaper by URL.
+
+import base64
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from signature_verification.page_assets import GOOGLE_FONTS_CSS, STATIC_DIR, WALLPAPER, page_style, style_block
+
+
+def legacy_style():
+    """ What set_styling('wallpaper.jpg') produced on every rerun before page_assets.py. """
+    with open(os.path.join(STATIC_DIR, WALLPAPER), "rb") as f:
+        encoded_img = base64.b64encode(f.read()).decode()
+    return style_block(f"data:image/avif;base64,{encoded_img}", GOOGLE_FONTS_CSS)
+
+def time_per_call(fn, repeats=200):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+def main():
+    page_style.cache_clear()
+    rows = [
+        ("legacy (inline base64, per rerun)", legacy_style),
+        ("cached, data URI fallback", lambda: page_style(static_serving=False)),
+        ("cached, static file + Google Fonts", lambda: page_style(static_serving=True)),
+        ("cached, static file + local fonts", lambda: page_style(static_serving=True, font_source="local")),
+    ]
+    wallpaper_bytes = os.path.getsize(os.path.join(STATIC_DIR, WALLPAPER))
+    print(f"{'styling path':<38} {'bytes/rerun':>12} {'build us/rerun':>15}")
+    for name, fn in rows:
+        payload = fn()
+        print(f"{name:<38} {len(payload.encode()):>12,} {time_per_call(fn):>15.1f}")
+    print(f"\nWith static serving the {wallpaper_bytes:,}-byte wallpaper is fetched once and then served from the browser cache.")
+    print("Local fonts also remove the render-blocking @import request to fonts.googleapis.com before first paint.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# benchmarks/bench_pipeline.py
+#
+# Replays dataset/real and dataset/forge through the full inference path and
+# reports where the time goes:
+#
+#   - per-stage latency (p50/p95/p99) for decode, resize, Otsu threshold, HOG,
+#     LBP, histogram, predict, predict_proba and the single-pass score()
+#   - end-to-end throughput with 1..N worker processes
+#   - peak RSS of the benchmark process and of its workers
+#
+# Results are written as JSON so runs can be compared between commits:
+#
+#   python benchmarks/bench_pipeline.py --output before.json
+#   ... change something ...
+#   python benchmarks/bench_pipeline.py --output after.json --compare before.json
+#
+# Run from the repository root after `python train_model.py`.
+
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import resource
+import subprocess
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+import sklearn
+from skimage.feature import hog, local_binary_pattern
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signature_verification import (FEATURE_DTYPE, FEATURE_ENGINES, HOG_PARAMS, IMAGE_SIZE, LBP_PARAMS,
+                                    ModelRegistry, extract_single_feature, preprocess_single_image, score)
+from train_model import DATASET_DIR, list_dataset
+
+STAGES = ["decode", "resize", "threshold", "hog", "lbp", "histogram", "predict", "predict_proba", "score", "end_to_end"]
+PERCENTILES = (50, 95, 99)
+
+
+def load_images(dataset_dir, limit=None):
+    """ Returns [(relative_path, bytes)] for the dataset, read once so disk I/O isn't timed. """
+    items = list_dataset(dataset_dir)[:limit]
+    images = []
+    for rel_path, _ in items:
+        with open(os.path.join(dataset_dir, rel_path), "rb") as f:
+            images.append((rel_path, f.read()))
+    return images
+
+def _timed(timings, stage, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    timings[stage].append((time.perf_counter() - start) * 1000)
+    return result
+
+def run_stages(model, image_bytes, timings, engine):
+    """ Runs one image through the pipeline stage by stage, mirroring signature_verification/features.py. """
+    img = _timed(timings, "decode", cv2.imdecode, np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        return False
+    resized = _timed(timings, "resize", cv2.resize, img, IMAGE_SIZE)
+    _, binarized = _timed(timings, "threshold", cv2.threshold, resized, 0, 255,
+                          cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+    if engine == "fast":
+        from signature_verification.fast_features import FastFeatureExtractor
+        extractor = FastFeatureExtractor(binarized.shape)
+        hog_features = _timed(timings, "hog", extractor.hog_features, binarized)
+        lbp_hist = _timed(timings, "lbp", extractor.lbp_histogram, binarized)  # includes the histogram
+    else:
+        hog_features = _timed(timings, "hog", lambda im: hog(im, **HOG_PARAMS), binarized)
+        lbp = _timed(timings, "lbp", lambda im: local_binary_pattern(im, **LBP_PARAMS), binarized)
+        counts, _ = _timed(timings, "histogram", np.histogram, lbp.ravel(), np.arange(0, 27), (0, 26))
+        lbp_hist = counts / (counts.sum() + 1e-7)
+    x = np.hstack([hog_features, lbp_hist]).astype(FEATURE_DTYPE).reshape(1, -1)
+
+    _timed(timings, "predict", model.predict, x)
+    _timed(timings, "predict_proba", model.predict_proba, x)
+    _timed(timings, "score", score, model, x)
+    _timed(timings, "end_to_end", score_image, model, image_bytes, engine)
+    return True
+
+def score_image(model, image_bytes, engine=None):
+    """ The production path: preprocess, featurize, single-pass score. """
+    processed_image, _ = preprocess_single_image(image_bytes)
+    if processed_image is None:
+        return None
+    return score(model, extract_single_feature(processed_image, engine=engine).astype(FEATURE_DTYPE))
+
+def summarize(values):
+    values = np.asarray(values)
+    summary = {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+    summary.update(mean=float(values.mean()), count=int(values.size))
+    return summary
+
+
+# --- Throughput ---
+
+_worker_model = None
+
+def _init_worker(model_path):
+    global _worker_model
+    warnings.simplefilter("ignore", FutureWarning)
+    _worker_model = ModelRegistry(model_path).get()
+
+def _score_in_worker(image_bytes, engine):
+    score_image(_worker_model, image_bytes, engine)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def measure_throughput(model_path, images, workers, engine):
+    payloads = [data for _, data in images]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+        # Warm-up: load the model and import the feature stack in every worker.
+        list(pool.map(_score_in_worker, payloads[:workers], [engine] * workers))
+        start = time.perf_counter()
+        worker_rss = list(pool.map(_score_in_worker, payloads, [engine] * len(payloads), chunksize=8))
+        elapsed = time.perf_counter() - start
+    return {"workers": workers, "seconds": elapsed, "images_per_s": len(payloads) / elapsed,
+            "worker_peak_rss_mb": max(worker_rss) / 1024}
+
+
+# --- Reporting ---
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(report, baseline=None):
+    print(f"\n{'stage':<15}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}" + ("{:>12}".format("p50 delta") if baseline else ""))
+    for stage, stats in report["stages"].items():
+        line = f"{stage:<15}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}"
+        old = baseline and baseline["stages"].get(stage)
+        if old and old["p50"] > 0:
+            line += f"{(stats['p50'] / old['p50'] - 1):>+12.1%}"
+        print(line)
+
+    print(f"\n{'workers':<10}{'images/s':>10}{'worker RSS MB':>15}" + ("{:>12}".format("delta") if baseline else ""))
+    old_rates = {row["workers"]: row["images_per_s"] for row in (baseline or {}).get("throughput", [])}
+    for row in report["throughput"]:
+        line = f"{row['workers']:<10}{row['images_per_s']:>10.1f}{row['worker_peak_rss_mb']:>15.1f}"
+        if row["workers"] in old_rates:
+            line += f"{(row['images_per_s'] / old_rates[row['workers']] - 1):>+12.1%}"
+        print(line)
+    print(f"\nPeak RSS of the benchmark process: {report['peak_rss_mb']:.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency, throughput and memory of the inference path.")
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--model", default="signature_model.joblib")
+    parser.add_argument("--engine", choices=FEATURE_ENGINES, default="skimage")
+    parser.add_argument("--limit", type=int, default=None, help="only replay the first N images")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="worker counts for the throughput sweep (default: 1, 2, 4, ... up to all cores)")
+    parser.add_argument("--output", default="bench_pipeline.json", help="where to write the JSON results")
+    parser.add_argument("--compare", default=None, help="JSON from a previous run to print deltas against")
+    parser.add_argument("--profile", action="store_true", help="also print the top cProfile entries of one pass")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", FutureWarning)
+
+    registry = ModelRegistry(args.model)
+    model = registry.get()
+    images = load_images(args.dataset, args.limit)
+    print(f"Replaying {len(images)} images with the '{args.engine}' engine (model {registry.version[:12]}).")
+
+    for _, data in images[:5]:  # warm-up: first calls pay for lazy imports and allocations
+        run_stages(model, data, {stage: [] for stage in STAGES}, args.engine)
+    timings = {stage: [] for stage in STAGES}
+    failed = sum(not run_stages(model, data, timings, args.engine) for _, data in images)
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for _, data in images:
+            score_image(model, data, args.engine)
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+    worker_counts = args.workers
+    if worker_counts is None:
+        worker_counts, n = [], 1
+        while n < (os.cpu_count() or 1):
+            worker_counts.append(n)
+            n *= 2
+        worker_counts.append(os.cpu_count() or 1)
+    throughput = [measure_throughput(args.model, images, n, args.engine) for n in worker_counts]
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "scikit_learn": sklearn.__version__,
+            "cpu_count": os.cpu_count(),
+            "engine": args.engine,
+            "model_version": registry.version,
+            "images": len(images),
+            "failed": failed,
+        },
+        "stages": {stage: summarize(values) for stage, values in timings.items() if values},
+        "throughput": throughput,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"Results written to '{args.output}'.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_projection.py
+#
+# Accuracy vs. latency vs. size for the optional projection stage in front of
+# the SVM (train_model.py --projection / --components). Every configuration is
+# trained on the same stratified split of the cached feature matrix; latency is
+# inference.score() on one vector at a time, the way app.py scores an upload.
+# Run from the repository root.
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signature_verification import score
+from train_model import CACHE_DIR, DATASET_DIR, build_feature_matrix, train
+
+DEFAULT_CONFIGS = ["none", "pca:32", "pca:64", "pca:128", "pca:256", "random:256", "random:1024", "random:4096"]
+
+
+def parse_config(text):
+    kind, _, n = text.partition(":")
+    return kind, int(n) if n else 0
+
+def model_bytes(model):
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
+
+def bench(X, y, kind, n_components, seed, repeats):
+    train_start = time.perf_counter()
+    model, _ = train(X, y, projection=kind, n_components=n_components, seed=seed)
+    fit_s = time.perf_counter() - train_start
+
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=seed, stratify=y)
+    X_test = np.asarray(X_test)
+    accuracy = float((score(model, X_test).labels == y_test).mean())
+
+    timings = []
+    for _ in range(repeats):
+        for row in X_test:
+            start = time.perf_counter()
+            score(model, row)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    dims = n_components if kind != "none" else X.shape[1]
+    return {
+        "config": kind if kind == "none" else f"{kind}:{n_components}",
+        "dims": dims,
+        "vector_bytes": dims * 4,
+        "model_bytes": model_bytes(model),
+        "accuracy": accuracy,
+        "p50_ms": statistics.median(timings),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "fit_s": fit_s,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare projection settings for the signature SVM.")
+    parser.add_argument("configs", nargs="*", default=DEFAULT_CONFIGS,
+                        help="'none', 'pca:N' or 'random:N' (default: a sweep of both)")
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--repeats", type=int, default=3, help="passes over the hold-out set when timing")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    X, y, _ = build_feature_matrix(args.dataset, args.cache_dir)
+    rows = []
+    for config in args.configs:
+        kind, n_components = parse_config(config)
+        print(f"--- {config} ---")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            rows.append(bench(X, y, kind, n_components, args.seed, args.repeats))
+
+    # Feature vectors travel between processes and sit in caches as float32, 4 bytes per value.
+    print(f"\n{'config':<14}{'dims':>7}{'bytes/vec':>11}{'model KB':>10}{'accuracy':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'fit s':>8}")
+    for row in rows:
+        print(f"{row['config']:<14}{row['dims']:>7}{row['vector_bytes']:>11}{row['model_bytes'] // 1024:>10}"
+              f"{row['accuracy']:>10.4f}{row['p50_ms']:>9.3f}{row['p95_ms']:>9.3f}{row['fit_s']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_single_pass.py
+#
+# Compares the old two-call inference (predict + predict_proba) with the
+# single-pass inference.score() on one feature vector at a time, the way app.py
+# scores an upload. Run from the repository root after `python train_model.py`.
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signature_verification import ModelRegistry, score
+from train_model import CACHE_DIR, DATASET_DIR, build_feature_matrix
+
+
+def two_call(model, x):
+    prediction = model.predict(x)
+    probabilities = model.predict_proba(x)
+    return prediction[0], probabilities[0][prediction[0]]
+
+def single_pass(model, x):
+    result = score(model, x)
+    return result.labels[0], result.confidences[0]
+
+def time_per_request(fn, model, X, repeats):
+    timings = []
+    for _ in range(repeats):
+        for row in X:
+            x = row.reshape(1, -1)
+            start = time.perf_counter()
+            fn(model, x)
+            timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark predict+predict_proba vs single-pass scoring.")
+    parser.add_argument("--model", default="signature_model.joblib")
+    parser.add_argument("--samples", type=int, default=100, help="feature vectors to score per repeat")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    model = ModelRegistry(args.model).get()
+    X, _, _ = build_feature_matrix(DATASET_DIR, CACHE_DIR)
+    X = np.ascontiguousarray(X[:args.samples])
+
+    mismatches = 0
+    for row in X:
+        old_label, old_conf = two_call(model, row.reshape(1, -1))
+        new_label, new_conf = single_pass(model, row.reshape(1, -1))
+        if old_label != new_label or abs(old_conf - new_conf) > 1e-9:
+            mismatches += 1
+    print(f"Agreement check: {len(X) - mismatches}/{len(X)} identical (label, confidence) pairs")
+
+    for name, fn in (("predict + predict_proba", two_call), ("single pass", single_pass)):
+        timings = time_per_request(fn, model, X, args.repeats)
+        print(f"{name:<24} median {statistics.median(timings):9.1f} us   mean {statistics.mean(timings):9.1f} us")
+
+if __name__ == "__main__":
+    main()
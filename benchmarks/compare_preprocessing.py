@@ -0,0 +1,120 @@
+# benchmarks/compare_preprocessing.py
+#
+# Compares the preprocessing modes of preprocess_single_image ("resize" and
+# "crop") on the bundled dataset:
+#
+#   - preprocessing latency on the dataset as stored, and on "phone photo"
+#     versions of the same images (upscaled to a 4000 px long side and
+#     JPEG-encoded), where the crop mode's reduced-resolution decode applies
+#   - SVM accuracy: stratified k-fold cross-validation on each mode's features
+#   - accuracy on "framed" copies of a hold-out split: the signature placed
+#     small and slightly rotated on a large blank page, as in a careless photo
+#
+# Run from the repository root.
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+
+import cv2
+import numpy as np
+from sklearn.model_selection import StratifiedKFold, cross_val_score, train_test_split
+from sklearn.svm import SVC
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signature_verification import FEATURE_DTYPE, PREPROCESS_MODES, extract_single_feature, preprocess_single_image
+from train_model import CACHE_DIR, DATASET_DIR, build_feature_matrix, list_dataset
+
+
+def load_images(dataset_dir, limit):
+    images = []
+    for rel_path, _ in list_dataset(dataset_dir)[:limit]:
+        with open(os.path.join(dataset_dir, rel_path), "rb") as f:
+            images.append(f.read())
+    return images
+
+def as_photo(image_bytes, long_side=4000, quality=90):
+    """ Upscaled, JPEG-encoded copy of a scan, standing in for a phone photo. """
+    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    scale = long_side / max(img.shape[:2])
+    img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    return cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+def as_framed(image_bytes, rng, page_scale=3, max_angle=10, long_side=3000):
+    """ The signature pasted at a random spot of a blank page ``page_scale`` times its size, slightly rotated. """
+    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    height, width = img.shape
+    background = int(np.median(img))
+    page = np.full((height * page_scale, width * page_scale), background, dtype=np.uint8)
+    top, left = rng.integers(0, height * (page_scale - 1)), rng.integers(0, width * (page_scale - 1))
+    page[top:top + height, left:left + width] = img
+    rotation = cv2.getRotationMatrix2D((left + width / 2, top + height / 2), rng.uniform(-max_angle, max_angle), 1.0)
+    page = cv2.warpAffine(page, rotation, (page.shape[1], page.shape[0]), borderValue=background)
+    scale = long_side / max(page.shape)
+    page = cv2.resize(page, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    return cv2.imencode(".jpg", page, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+def featurize(images, mode):
+    vectors = []
+    for data in images:
+        processed_image, _ = preprocess_single_image(data, mode=mode)
+        vectors.append(extract_single_feature(processed_image, engine="fast")[0].astype(FEATURE_DTYPE))
+    return np.vstack(vectors)
+
+def time_preprocess(images, mode):
+    timings = []
+    for data in images:
+        start = time.perf_counter()
+        preprocess_single_image(data, mode=mode)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), float(np.percentile(timings, 95))
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the resize and crop preprocessing modes.")
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--timing-images", type=int, default=100, help="images used for the latency comparison")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", FutureWarning)
+
+    scans = load_images(args.dataset, args.timing_images)
+    photos = [as_photo(data) for data in scans]
+    print(f"Latency on {len(scans)} images (photos: 4000 px JPEG, "
+          f"median {statistics.median(len(p) for p in photos) // 1024} KB)")
+
+    rows = []
+    for mode in PREPROCESS_MODES:
+        scan_p50, scan_p95 = time_preprocess(scans, mode)
+        photo_p50, photo_p95 = time_preprocess(photos, mode)
+
+        X, y, paths = build_feature_matrix(args.dataset, args.cache_dir, preprocess=mode)
+        X = np.asarray(X)
+        folds = StratifiedKFold(n_splits=args.folds, shuffle=True, random_state=args.seed)
+        scores = cross_val_score(SVC(kernel="rbf", gamma="scale"), X, y, cv=folds)
+
+        train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=args.seed, stratify=y)
+        model = SVC(kernel="rbf", gamma="scale").fit(X[train_idx], y[train_idx])
+        rng = np.random.default_rng(args.seed)  # same framed pages for every mode
+        framed = []
+        for i in test_idx:
+            with open(os.path.join(args.dataset, paths[i]), "rb") as f:
+                framed.append(as_framed(f.read(), rng))
+        clean_accuracy = model.score(X[test_idx], y[test_idx])
+        framed_accuracy = model.score(featurize(framed, mode), y[test_idx])
+        rows.append((mode, scan_p50, scan_p95, photo_p50, photo_p95, scores.mean(), scores.std(),
+                     clean_accuracy, framed_accuracy))
+
+    print(f"\n{'mode':<8}{'scan p50':>10}{'scan p95':>10}{'photo p50':>11}{'photo p95':>11}"
+          f"{'cv accuracy':>17}{'hold-out':>10}{'framed':>8}")
+    for mode, scan_p50, scan_p95, photo_p50, photo_p95, mean, std, clean, framed in rows:
+        print(f"{mode:<8}{scan_p50:>8.2f}ms{scan_p95:>8.2f}ms{photo_p50:>9.2f}ms{photo_p95:>9.2f}ms"
+              f"{mean:>10.4f} ±{std:.3f}{clean:>10.4f}{framed:>8.4f}")
+
+if __name__ == "__main__":
+    main()
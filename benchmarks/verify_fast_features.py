@@ -0,0 +1,58 @@
+# benchmarks/verify_fast_features.py
+#
+# Checks that the fast feature engine (fast_features.py) reproduces the skimage
+# reference on every image in the bundled dataset and compares their speed.
+# Exits with status 1 if any vector differs by more than FEATURE_TOLERANCE.
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from signature_verification import extract_single_feature, preprocess_single_image
+from signature_verification.fast_features import FEATURE_TOLERANCE
+
+
+def timed(fn, image):
+    start = time.perf_counter()
+    result = fn(image)
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the fast feature engine against skimage.")
+    parser.add_argument("--dataset", default=os.path.join(ROOT, "dataset"))
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.dataset, "*", "*.png")))
+    reference_ms, fast_ms, max_diff, worst = [], [], 0.0, None
+    for path in paths:
+        with open(path, "rb") as f:
+            image, _ = preprocess_single_image(f.read())
+        if image is None:
+            continue
+        reference, ref_time = timed(lambda im: extract_single_feature(im, engine="skimage"), image)
+        fast, fast_time = timed(lambda im: extract_single_feature(im, engine="fast"), image)
+        reference_ms.append(ref_time)
+        fast_ms.append(fast_time)
+        diff = float(np.abs(reference - fast).max())
+        if diff > max_diff:
+            max_diff, worst = diff, path
+
+    print(f"Images compared:      {len(reference_ms)}")
+    print(f"Max |fast - skimage|: {max_diff:.3e} (tolerance {FEATURE_TOLERANCE:.0e})" + (f", worst: {worst}" if worst else ""))
+    print(f"skimage engine:       median {statistics.median(reference_ms):7.2f} ms")
+    print(f"fast engine:          median {statistics.median(fast_ms):7.2f} ms "
+          f"({statistics.median(reference_ms) / statistics.median(fast_ms):.1f}x)")
+    if max_diff > FEATURE_TOLERANCE:
+        print("FAILED: fast engine is outside the documented tolerance.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# compact_model.py (Compact Scorer Export)
+#
+# Fits a CompactScorer (signature_verification/compact.py) on the cached feature
+# matrix and exports it as a NumPy .npz that app.py, scoring_service.py and
+# batch_score.py serve in place of the SVC. It also reports the accuracy gap
+# against an RBF SVM trained on the same split, plus latency, size and load time.
+#
+#   python compact_model.py                                  # linear scorer -> signature_model.npz
+#   python compact_model.py --kind rff --components 2048
+#   python compact_model.py --store models --candidate       # shadow-score it next to the SVM
+#   python scoring_service.py --model signature_model.npz
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.svm import SVC
+
+from signature_verification import (CANDIDATE, COMPACT_KINDS, CURRENT, PREPROCESS_MODES, CompactScorer, ModelStore,
+                                    dataset_digest, feature_config, fit_compact, score)
+from train_model import CACHE_DIR, DATASET_DIR, build_feature_matrix
+
+COMPACT_MODEL_FILENAME = "signature_model.npz"
+
+
+# --- Evaluation ---
+
+def evaluate(model, X_test, y_test, reference_labels=None, repeats=3):
+    """ Hold-out accuracy, agreement with the SVM, single-vector p50 and whole-batch latency in ms. """
+    labels = score(model, X_test).labels
+    single = []
+    for _ in range(repeats):
+        for row in X_test:
+            start = time.perf_counter()
+            score(model, row)
+            single.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        score(model, X_test)
+    return {
+        "accuracy": float((labels == y_test).mean()),
+        "agreement": float((labels == reference_labels).mean()) if reference_labels is not None else 1.0,
+        "p50_ms": statistics.median(single),
+        "batch_ms": (time.perf_counter() - start) * 1000 / repeats,
+    }
+
+def load_ms(path, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        if path.endswith(".npz"):
+            CompactScorer.load(path)
+        else:
+            joblib.load(path, mmap_mode="c")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+# --- Command Line ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a compact NumPy scorer and compare it with the SVM.")
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--preprocess", choices=PREPROCESS_MODES, default=None)
+    parser.add_argument("--kind", choices=COMPACT_KINDS, default="linear")
+    parser.add_argument("--components", type=int, default=1024, help="feature-map size for rff / nystroem")
+    parser.add_argument("--C", type=float, default=1.0)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=COMPACT_MODEL_FILENAME)
+    parser.add_argument("--store", default=None, help="publish into this model store instead of --output")
+    pointer = parser.add_mutually_exclusive_group()
+    pointer.add_argument("--activate", action="store_true", help="with --store: serve it (CURRENT)")
+    pointer.add_argument("--candidate", action="store_true", help="with --store: shadow-score it (CANDIDATE)")
+    args = parser.parse_args()
+    if (args.activate or args.candidate) and not args.store:
+        parser.error("--activate and --candidate need --store.")
+    warnings.simplefilter("ignore", FutureWarning)
+
+    X, y, paths = build_feature_matrix(args.dataset, args.cache_dir, preprocess=args.preprocess)
+    X_train, X_test, y_train, y_test = train_test_split(
+        np.asarray(X), y, test_size=args.test_size, random_state=args.seed, stratify=y)
+
+    start = time.perf_counter()
+    svm = SVC(kernel="rbf", gamma="scale", probability=True, random_state=args.seed).fit(X_train, y_train)
+    svm_fit_s = time.perf_counter() - start
+    start = time.perf_counter()
+    compact = fit_compact(X_train, y_train, kind=args.kind, C=args.C, n_components=args.components, seed=args.seed)
+    compact_fit_s = time.perf_counter() - start
+
+    svm_labels = score(svm, X_test).labels
+    rows = [("svm (rbf)", evaluate(svm, X_test, y_test), svm_fit_s),
+            (f"compact {args.kind}", evaluate(compact, X_test, y_test, svm_labels), compact_fit_s)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        svm_file, compact_file = os.path.join(tmp_dir, "svm.joblib"), os.path.join(tmp_dir, "compact.npz")
+        joblib.dump(svm, svm_file)
+        compact.save(compact_file)
+        for (_, result, _), path in zip(rows, (svm_file, compact_file)):
+            result["size_kb"] = os.path.getsize(path) / 1024
+            result["load_ms"] = load_ms(path)
+
+    print(f"\nHold-out: {len(y_test)} images. Latency: one vector at a time (p50) and the whole hold-out in one call.")
+    print(f"{'model':<18}{'accuracy':>10}{'agree':>8}{'p50 ms':>9}{'batch ms':>10}{'size KB':>10}{'load ms':>9}{'fit s':>7}")
+    for name, result, fit_s in rows:
+        print(f"{name:<18}{result['accuracy']:>10.4f}{result['agreement']:>8.3f}{result['p50_ms']:>9.3f}"
+              f"{result['batch_ms']:>10.3f}{result['size_kb']:>10.0f}{result['load_ms']:>9.2f}{fit_s:>7.1f}")
+    gap = rows[1][1]["accuracy"] - rows[0][1]["accuracy"]
+    print(f"Accuracy gap vs SVM: {gap:+.4f} ({rows[1][1]['agreement']:.1%} of hold-out labels agree).")
+
+    # The exported scorer is refit on every image, like the SVM train_model.py saves after its report.
+    compact = fit_compact(np.asarray(X), y, kind=args.kind, C=args.C, n_components=args.components, seed=args.seed)
+    if args.store is None:
+        compact.save(args.output)
+        print(f"Compact scorer saved to '{args.output}'.")
+        return
+
+    store = ModelStore(args.store)
+    manifest = {
+        "feature_config": feature_config(args.preprocess),
+        "training_set": {"images": len(paths), "sha256": dataset_digest(args.dataset, paths, y)},
+        "metrics": {"holdout_accuracy": rows[1][1]["accuracy"], "svm_holdout_accuracy": rows[0][1]["accuracy"],
+                    "svm_agreement": rows[1][1]["agreement"], "p50_ms": rows[1][1]["p50_ms"]},
+        "params": {"compact": args.kind, "components": args.components, "C": args.C, "seed": args.seed},
+    }
+    os.makedirs(args.store, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=args.store, prefix=".build-") as tmp_dir:
+        model_file = os.path.join(tmp_dir, "model.npz")
+        compact.save(model_file)
+        version = store.publish(model_file, manifest)
+    pointer = CURRENT if args.activate else CANDIDATE if args.candidate else None
+    if pointer is not None:
+        store.set_pointer(version, pointer)
+    print(f"Compact scorer published to '{args.store}' as version {version}" + (f" ({pointer})." if pointer else "."))
+
+if __name__ == "__main__":
+    main()
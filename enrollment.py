@@ -0,0 +1,101 @@
+# enrollment.py (Writer-Dependent Verification)
+#
+# Stores reference feature vectors per customer and scores a questioned signature
+# against that customer's references by cosine similarity.
+#
+#   python enrollment.py enroll-dataset --refs 3     # enroll writers from dataset/real
+#   python enrollment.py evaluate --refs 3           # similarity stats + EER threshold
+#   python enrollment.py verify 001 path/to/image.png
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from signature_verification import DEFAULT_THRESHOLD, INDEX_DIR, ReferenceIndex, featurize_image_bytes, writer_id_from_filename
+
+
+# --- Command Line ---
+
+def _dataset_vectors(dataset_dir):
+    """ Yields (writer_id, is_genuine, vector) for every dataset image with an NFI-style name. """
+    for folder, genuine in (("real", True), ("forge", False)):
+        folder_path = os.path.join(dataset_dir, folder)
+        for name in sorted(os.listdir(folder_path)):
+            writer = writer_id_from_filename(name)
+            if writer is None:
+                continue
+            with open(os.path.join(folder_path, name), "rb") as f:
+                vector = featurize_image_bytes(f.read())
+            if vector is not None:
+                yield writer, genuine, vector
+
+def _split_references(dataset_dir, refs):
+    references, queries = {}, []
+    for writer, genuine, vector in _dataset_vectors(dataset_dir):
+        if genuine and len(references.setdefault(writer, [])) < refs:
+            references[writer].append(vector)
+        else:
+            queries.append((writer, genuine, vector))
+    return references, queries
+
+def main():
+    parser = argparse.ArgumentParser(description="Enroll reference signatures and verify against them.")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    enroll = sub.add_parser("enroll-dataset", help="enroll the first N genuine signatures of each dataset writer")
+    enroll.add_argument("--dataset", default="dataset")
+    enroll.add_argument("--refs", type=int, default=3)
+    evaluate = sub.add_parser("evaluate", help="report genuine/forged similarity and the equal-error threshold")
+    evaluate.add_argument("--dataset", default="dataset")
+    evaluate.add_argument("--refs", type=int, default=3)
+    verify = sub.add_parser("verify", help="score an image against a customer's references")
+    verify.add_argument("customer_id")
+    verify.add_argument("image")
+    verify.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.command == "enroll-dataset":
+        references, _ = _split_references(args.dataset, args.refs)
+        dim = len(next(iter(references.values()))[0])
+        index = ReferenceIndex.load(args.index_dir, dim=dim)
+        for writer, vectors in references.items():
+            index.remove(writer)
+            index.enroll(writer, vectors)
+        index.save(args.index_dir)
+        print(f"Enrolled {len(references)} writers ({len(index)} references) into '{args.index_dir}'.")
+
+    elif args.command == "evaluate":
+        references, queries = _split_references(args.dataset, args.refs)
+        index = ReferenceIndex(len(next(iter(references.values()))[0]))
+        for writer, vectors in references.items():
+            index.enroll(writer, vectors)
+        genuine, forged, timings = [], [], []
+        for writer, is_genuine, vector in queries:
+            start = time.perf_counter()
+            similarity = index.verify(writer, vector)
+            timings.append((time.perf_counter() - start) * 1000)
+            (genuine if is_genuine else forged).append(similarity)
+        genuine, forged = np.array(genuine), np.array(forged)
+        thresholds = np.linspace(0, 1, 1001)
+        far = np.array([(forged >= t).mean() for t in thresholds])
+        frr = np.array([(genuine < t).mean() for t in thresholds])
+        best = np.argmin(np.abs(far - frr))
+        print(f"Writers: {len(references)}, genuine queries: {len(genuine)}, forged queries: {len(forged)}")
+        print(f"Genuine similarity median {np.median(genuine):.3f}, forged median {np.median(forged):.3f}")
+        print(f"Equal error rate ~{(far[best] + frr[best]) / 2:.1%} at threshold {thresholds[best]:.3f}")
+        print(f"Verify latency: median {np.median(timings):.3f} ms")
+
+    elif args.command == "verify":
+        index = ReferenceIndex.load(args.index_dir)
+        with open(args.image, "rb") as f:
+            vector = featurize_image_bytes(f.read())
+        if vector is None:
+            raise SystemExit(f"Could not decode '{args.image}'.")
+        similarity = index.verify(args.customer_id, vector)
+        verdict = "Genuine" if similarity >= args.threshold else "Forged"
+        print(f"{verdict} (similarity {similarity:.3f}, threshold {args.threshold:.3f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# manage_models.py (Model Versions)
+#
+# Lists the versions in a model store and moves its CURRENT / CANDIDATE pointers.
+# Servers watching the store (app.py, scoring_service.py --store) pick up a moved
+# pointer on their next request, without a restart.
+#
+#   python manage_models.py list
+#   python manage_models.py import signature_model.joblib --activate   # adopt an existing model file
+#   python manage_models.py candidate 20260101-120000-1a2b3c4d          # shadow-score it next to CURRENT
+#   python manage_models.py activate 20260101-120000-1a2b3c4d           # serve it
+#   python manage_models.py rollback                                   # serve the version before CURRENT
+
+import argparse
+import json
+
+from signature_verification import CANDIDATE, CURRENT, MODELS_DIR, ModelRegistry, ModelStore, feature_config
+
+
+def _check(store, version):
+    """ Loads a version the way a server would, so a broken artifact is never activated. """
+    if store.manifest(version).get("feature_config") != feature_config():
+        raise SystemExit(f"Version {version} was trained with different feature/preprocessing parameters.")
+    try:
+        ModelRegistry(store.model_path(version)).get()
+    except (OSError, ValueError) as err:
+        raise SystemExit(f"Version {version} failed to load: {err}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage versioned signature models.")
+    parser.add_argument("--store", default=MODELS_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list stored versions with their hold-out accuracy")
+    show = sub.add_parser("show", help="print a version's manifest")
+    show.add_argument("version")
+    activate = sub.add_parser("activate", help="serve a version (moves CURRENT)")
+    activate.add_argument("version")
+    sub.add_parser("rollback", help="serve the version published before CURRENT")
+    candidate = sub.add_parser("candidate", help="shadow-score a version (moves CANDIDATE)")
+    candidate.add_argument("version", nargs="?")
+    candidate.add_argument("--clear", action="store_true", help="stop shadow scoring")
+    imported = sub.add_parser("import", help="add an existing model file as a new version")
+    imported.add_argument("model_file")
+    imported.add_argument("--activate", action="store_true")
+    args = parser.parse_args()
+
+    store = ModelStore(args.store)
+
+    if args.command == "list":
+        current, shadow = store.read_pointer(CURRENT), store.read_pointer(CANDIDATE)
+        for manifest in store.versions():
+            version = manifest["version"]
+            marker = "CURRENT" if version == current else "CANDIDATE" if version == shadow else ""
+            accuracy = manifest.get("metrics", {}).get("holdout_accuracy")
+            accuracy = f"{accuracy:.4f}" if accuracy is not None else "-"
+            print(f"{version:<28}{manifest['created'][:19]:<21}{accuracy:>8}  {marker}")
+
+    elif args.command == "show":
+        print(json.dumps(store.manifest(args.version), indent=2))
+
+    elif args.command == "activate":
+        _check(store, args.version)
+        store.set_pointer(args.version, CURRENT)
+        print(f"CURRENT -> {args.version}")
+
+    elif args.command == "rollback":
+        versions = [manifest["version"] for manifest in store.versions()]
+        current = store.read_pointer(CURRENT)
+        if current not in versions or versions.index(current) == 0:
+            raise SystemExit("No earlier version to roll back to.")
+        previous = versions[versions.index(current) - 1]
+        _check(store, previous)
+        store.set_pointer(previous, CURRENT)
+        print(f"CURRENT -> {previous} (was {current})")
+
+    elif args.command == "candidate":
+        if args.clear:
+            store.set_pointer(None, CANDIDATE)
+            print("CANDIDATE cleared.")
+        elif args.version is None:
+            parser.error("candidate needs a version or --clear.")
+        else:
+            _check(store, args.version)
+            store.set_pointer(args.version, CANDIDATE)
+            print(f"CANDIDATE -> {args.version}")
+
+    elif args.command == "import":
+        ModelRegistry(args.model_file).get()
+        version = store.publish(args.model_file, {"source": args.model_file})
+        if args.activate:
+            store.set_pointer(version, CURRENT)
+        print(f"Imported '{args.model_file}' as {version}" + (" (CURRENT)." if args.activate else "."))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# scoring_service.py (Headless HTTP Scoring Service)
+#
+# A small asyncio HTTP/1.1 server (standard library only) exposing the same
+# preprocessing, features and model as app.py:
+#
+#   GET  /health        model version, queue depth and shadow-model agreement
+#   POST /score         raw image bytes in the body            -> one result
+#   POST /score/batch   multipart/form-data files or a ZIP body -> list of results
+#   GET  /metrics       latency histograms and counters (Prometheus text format)
+#   GET  /traces        recent spans as JSON (with SIGNATURE_TRACING=1)
+#
+# Featurization runs in a process pool so the event loop never blocks. Feature
+# vectors from concurrent requests are coalesced by a micro-batcher into a single
+# classifier call.
+#
+# With --store the service serves the store's CURRENT version and hot-swaps when
+# manage_models.py moves the pointer; --shadow also scores every request with the
+# CANDIDATE version in the background and reports disagreement in /health.
+#
+#   python scoring_service.py --port 8000
+#   python scoring_service.py --store models --shadow
+#   curl --data-binary @dataset/real/00101001.png http://127.0.0.1:8000/score
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from functools import partial
+
+import numpy as np
+
+from signature_verification import (CANDIDATE, CURRENT, FEATURE_ENGINES, REGISTRY, TRACER, ModelRegistry, ModelStore,
+                                    ShadowScorer, counter, featurize_bytes, histogram, iter_zip_images, score)
+from signature_verification.batch import FEATURIZE_MS
+from signature_verification.features import DECODE_FAILURES
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+# --- Micro-Batching ---
+
+def _score_current(registry, X):
+    """ Runs in a worker thread: get() may hash and reload a changed model file, which must not block the loop. """
+    return score(registry.get(), X)
+
+class MicroBatcher:
+    """
+    Coalesces feature vectors submitted by concurrent requests into one classifier call.
+
+    A batch is flushed when it reaches ``max_batch_size`` vectors or when the oldest
+    vector has waited ``max_wait_ms``. Model lookup (including any hot reload) and scoring
+    run in a thread so the loop stays free.
+    """
+
+    def __init__(self, registry, max_batch_size=32, max_wait_ms=5.0, shadow=None):
+        self.registry = registry
+        self.shadow = shadow
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.batch_sizes = histogram("signature_batch_size", "Vectors per classifier call.",
+                                     buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+        self.classify_latency = histogram("signature_classify_ms", "Micro-batch classifier latency in ms.")
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def submit(self, vector):
+        """ Returns (label, confidence, margin) for one feature vector. """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((vector, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            vectors, futures = zip(*batch)
+            start = time.perf_counter()
+            try:
+                scored = await loop.run_in_executor(None, _score_current, self.registry, np.vstack(vectors))
+            except Exception as err:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(err)
+                continue
+            self.classify_latency.observe((time.perf_counter() - start) * 1000)
+            self.batch_sizes.observe(len(batch))
+            for future, label, confidence, margin in zip(futures, scored.labels, scored.confidences, scored.margins):
+                if not future.done():
+                    future.set_result((int(label), float(confidence), float(margin)))
+            if self.shadow is not None:
+                for vector, label, confidence in zip(vectors, scored.labels, scored.confidences):
+                    self.shadow.submit(vector, int(label), float(confidence))
+
+
+# --- Service ---
+
+class ScoringService:
+    def __init__(self, model_path, workers=None, max_batch_size=32, max_wait_ms=5.0, engine=None,
+                 store_dir=None, shadow=False):
+        store = ModelStore(store_dir) if store_dir else None
+        self.registry = ModelRegistry.for_store(store, CURRENT) if store else ModelRegistry(model_path)
+        self.registry.get()  # fail fast on a missing or invalid model
+        self.shadow = ShadowScorer(ModelRegistry.for_store(store, CANDIDATE)) if store and shadow else None
+        # forkserver: workers start lazily, after the shadow-scoring thread is running, and a
+        # plain fork could copy a lock that thread holds into a worker.
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver"))
+        self.batcher = MicroBatcher(self.registry, max_batch_size, max_wait_ms, self.shadow)
+        self.featurize = partial(featurize_bytes, engine=engine)
+        self.request_latency = histogram("signature_request_ms", "End-to-end request latency in ms.")
+        self.responses = counter("signature_http_responses_total", "HTTP responses by status code.", labels=("status",))
+
+    async def score_image(self, name, image_bytes):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        vector, featurize_ms = await loop.run_in_executor(self.pool, self.featurize, image_bytes)
+        FEATURIZE_MS.observe(featurize_ms)  # recorded here: pool workers' metrics stay in their processes
+        if vector is None:
+            DECODE_FAILURES.inc()
+            return {"name": name, "error": "Could not decode image"}
+        label, confidence, margin = await self.batcher.submit(vector)
+        return {
+            "name": name,
+            "label": "Genuine" if label == 1 else "Forged",
+            "confidence": round(confidence * 100, 2),
+            "margin": margin,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    def metrics_text(self):
+        return REGISTRY.render()
+
+    async def route(self, method, path, headers, body):
+        """ Returns (status, content_type, payload_bytes). """
+        if path == "/health" and method == "GET":
+            payload = {"status": "ok", "model_version": self.registry.version, "queued": self.batcher.queue.qsize()}
+            if self.registry.last_error:
+                payload["reload_error"] = self.registry.last_error
+            if self.shadow is not None:
+                payload["shadow"] = self.shadow.stats()
+            return 200, "application/json", json.dumps(payload).encode()
+        if path == "/metrics" and method == "GET":
+            return 200, "text/plain; version=0.0.4", self.metrics_text().encode()
+        if path == "/traces" and method == "GET":
+            return 200, "application/json", json.dumps(TRACER.recent()).encode()
+        if path == "/score":
+            if method != "POST":
+                return 405, "application/json", b'{"error": "Use POST"}'
+            if not body:
+                return 400, "application/json", b'{"error": "Empty body"}'
+            result = await self.score_image(headers.get("x-filename", "upload"), body)
+            status = 400 if "error" in result else 200
+            return status, "application/json", json.dumps(result).encode()
+        if path == "/score/batch":
+            if method != "POST":
+                return 405, "application/json", b'{"error": "Use POST"}'
+            images = _split_batch(headers.get("content-type", ""), body)
+            if not images:
+                return 400, "application/json", b'{"error": "No images found in request"}'
+            results = await asyncio.gather(*(self.score_image(name, data) for name, data in images))
+            return 200, "application/json", json.dumps({"results": results}).encode()
+        return 404, "application/json", b'{"error": "Not found"}'
+
+    async def handle(self, reader, writer):
+        start = time.perf_counter()
+        status, content_type, payload = 500, "application/json", b'{"error": "Internal error"}'
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            method, path, _ = request_line.split(" ", 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                key, _, value = line.partition(":")
+                headers[key.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_BYTES:
+                status, payload = 413, b'{"error": "Request body too large"}'
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, content_type, payload = await self.route(method, path.split("?", 1)[0], headers, body)
+        except (ValueError, asyncio.IncompleteReadError):
+            status, payload = 400, b'{"error": "Malformed request"}'
+        except Exception as err:
+            payload = json.dumps({"error": str(err)}).encode()
+        finally:
+            head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\nContent-Length: {len(payload)}\r\nConnection: close\r\n\r\n")
+            writer.write(head.encode("latin-1") + payload)
+            try:
+                await writer.drain()
+            finally:
+                writer.close()
+            self.request_latency.observe((time.perf_counter() - start) * 1000)
+            self.responses.inc(status=status)
+
+    async def serve(self, host, port):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Scoring service listening on http://{host}:{port} (model {self.registry.version[:12]})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+            self.pool.shutdown()
+
+
+def _split_batch(content_type, body):
+    """ Returns [(name, bytes)] from a multipart/form-data body or a ZIP archive body. """
+    if content_type.startswith("multipart/form-data"):
+        message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body)
+        return [(part.get_filename() or f"part-{i}", part.get_payload(decode=True))
+                for i, part in enumerate(message.iter_parts())]
+    if content_type in ("application/zip", "application/x-zip-compressed"):
+        return list(iter_zip_images(io.BytesIO(body)))
+    return []
+
+
+# --- Command Line ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve signature scoring over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default="signature_model.joblib")
+    parser.add_argument("--store", default=None, help="serve the CURRENT version of this model store instead of --model")
+    parser.add_argument("--shadow", action="store_true", help="also score requests with the store's CANDIDATE version")
+    parser.add_argument("--workers", type=int, default=None, help="featurization processes (default: all cores)")
+    parser.add_argument("--max-batch", type=int, default=32, help="max vectors per classifier call")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="max time a vector waits for a batch")
+    parser.add_argument("--engine", choices=FEATURE_ENGINES, default=None,
+                        help="feature extraction engine (default: $SIGNATURE_FEATURE_ENGINE or skimage)")
+    args = parser.parse_args()
+    if args.shadow and not args.store:
+        parser.error("--shadow needs --store.")
+
+    service = ScoringService(args.model, args.workers, args.max_batch, args.max_wait_ms, args.engine,
+                             store_dir=args.store, shadow=args.shadow)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
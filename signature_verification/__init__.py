@@ -0,0 +1,48 @@
+"""
+Signature verification pipeline shared by app.py, train_model.py and the command-line tools.
+
+Names are resolved lazily: ``from signature_verification import score`` imports only the
+submodule that defines it. Heavy libraries are deferred further, to the first call that
+needs them: OpenCV and scikit-image on the first preprocess/featurize, joblib and
+scikit-learn on the first model load, bcrypt on the first hash, mysql-connector on the
+first MySQL connection. Rendering the login page therefore loads none of them.
+"""
+
+import importlib
+
+# Public name -> submodule that defines it.
+_EXPORTS = {
+    "features": ["FEATURE_DTYPE", "FEATURE_ENGINE", "FEATURE_ENGINES", "HOG_PARAMS", "IMAGE_SIZE", "LBP_PARAMS",
+                 "PREPROCESS_MODE", "PREPROCESS_MODES", "extract_single_feature", "feature_config", "feature_length", "preprocess_single_image"],
+    "inference": ["ScoreResult", "score"],
+    "augment": ["AUGMENT_PARAMS", "IMAGE_FORMATS", "augment_image", "iter_augmented"],
+    "compact": ["COMPACT_KINDS", "CompactScorer", "fit_compact"],
+    "model_registry": ["ModelRegistry", "file_digest"],
+    "model_store": ["CANDIDATE", "CURRENT", "MODELS_DIR", "ModelStore", "ShadowScorer", "dataset_digest"],
+    "batch": ["IMAGE_EXTENSIONS", "RESULT_FIELDS", "featurize_bytes", "iter_image_inputs", "iter_scored",
+              "iter_zip_images", "results_to_csv", "score_batch"],
+    "jobs": ["CANCELLED", "DONE", "FAILED", "RUNNING", "Job", "JobManager", "make_job_id"],
+    "metrics": ["REGISTRY", "TRACER", "Counter", "Histogram", "MetricsRegistry", "Tracer", "counter", "histogram",
+                "start_http_server"],
+    "result_cache": ["CachedResult", "ResultCache", "make_cache_key"],
+    "enrollment": ["DEFAULT_THRESHOLD", "INDEX_DIR", "ReferenceIndex", "featurize_image_bytes",
+                   "writer_id_from_filename"],
+    "user_store": ["MySQLUserStore", "SQLiteUserStore", "UserStore", "UserStoreError", "create_user_store"],
+    "passwords": ["DEFAULT_ROUNDS", "HasherBusy", "LoginThrottle", "LoginThrottled", "PasswordHasher"],
+    "page_assets": ["STATIC_DIR", "STATIC_URL", "WALLPAPER", "page_style"],
+}
+_ORIGIN = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_ORIGIN)
+
+
+def __getattr__(name):
+    module = _ORIGIN.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+
+# --- Augmentation Parameters ---
+# Ranges each synthetic image is drawn from. "stroke" is in pixels per 100 px of
+# source height, so the same setting thickens a 90 px thumbnail and a 700 px scan
+# by a similar fraction of the pen width. "resolution" rescales the whole image, as
+# if the page had been scanned at a different DPI; values above 1 turn the bundled
+# thumbnails into production-sized scans.
+AUGMENT_PARAMS = {
+    "rotation": 5.0,            # degrees, uniform in [-rotation, rotation]
+    "scale": (0.9, 1.1),        # signature size on the page
+    "stroke": (-1.0, 1.5),      # pen width change: < 0 thins, > 0 thickens
+    "noise": (0.0, 8.0),        # std-dev of additive Gaussian noise, in grey levels
+    "resolution": (0.75, 1.5),  # output size relative to the source
+}
+IMAGE_FORMATS = (".png", ".jpg")
+
+
+def augment_image(gray, rng, params=None):
+    """
+    Returns a randomly distorted copy of a greyscale (uint8) signature image: stroke-width
+    jitter, rotation and scale about the centre, a rescan at another resolution, then
+    sensor noise. ``params`` overrides AUGMENT_PARAMS; ``rng`` is a numpy Generator.
+    """
+    import cv2
+
+    params = {**AUGMENT_PARAMS, **(params or {})}
+    height, width = gray.shape
+    background = int(np.median(gray[::4, ::4]))
+
+    # Stroke width: a grey-level erosion grows dark ink, a dilation thins it. Thinning
+    # that would wipe out most of the ink (1 px strokes) is skipped.
+    unit = max(1.0, height / 100)
+    stroke = int(round(rng.uniform(*params["stroke"]) * unit))
+    if stroke:
+        kernel = np.ones((abs(stroke) + 1, abs(stroke) + 1), np.uint8)
+        if stroke > 0:
+            gray = cv2.erode(gray, kernel)
+        else:
+            thinned = cv2.dilate(gray, kernel)
+            if np.count_nonzero(thinned < 128) * 2 >= np.count_nonzero(gray < 128):
+                gray = thinned
+
+    angle = rng.uniform(-params["rotation"], params["rotation"])
+    rotation = cv2.getRotationMatrix2D((width / 2, height / 2), angle, rng.uniform(*params["scale"]))
+    gray = cv2.warpAffine(gray, rotation, (width, height), flags=cv2.INTER_LINEAR,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=background)
+
+    factor = rng.uniform(*params["resolution"])
+    size = (max(8, int(round(width * factor))), max(8, int(round(height * factor))))
+    gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA if factor < 1 else cv2.INTER_CUBIC)
+
+    sigma = rng.uniform(*params["noise"])
+    if sigma > 0:
+        noisy = gray + rng.normal(0.0, sigma, gray.shape).astype(np.float32)
+        gray = np.clip(noisy, 0, 255).astype(np.uint8)
+    return gray
+
+
+def iter_augmented(sources, count=None, seed=0, params=None, image_format=".png", start=0):
+    """
+    Yields (name, label, image_bytes) for synthetic images ``start`` .. ``count - 1``
+    (forever when ``count`` is None), cycling through ``sources``, a list of (name, label,
+    image_bytes). Nothing is written to disk; each source is decoded once.
+
+    Image ``i`` depends only on (seed, i, its source and params), so a stream can be
+    replayed, resumed from ``start`` or split across processes and produce the same
+    bytes. Names are the source name with an ``-aug<i>`` suffix, e.g.
+    ``real/00101001-aug000534.png``.
+    """
+    import cv2
+
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format '{image_format}'. Use one of {IMAGE_FORMATS}.")
+    if not sources:
+        raise ValueError("No source images to augment.")
+    decoded = {}
+    index = start
+    while count is None or index < count:
+        position = index % len(sources)
+        name, label, image_bytes = sources[position]
+        if position not in decoded:
+            decoded[position] = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if decoded[position] is not None:
+            rng = np.random.default_rng([seed, index])
+            ok, encoded = cv2.imencode(image_format, augment_image(decoded[position], rng, params))
+            if ok:
+                yield f"{os.path.splitext(name)[0]}-aug{index:06d}{image_format}", label, encoded.tobytes()
+        index += 1
+        if len(decoded) == len(sources) and all(image is None for image in decoded.values()):
+            raise ValueError("None of the source images could be decoded.")
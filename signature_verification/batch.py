@@ -0,0 +1,154 @@
+import csv
+import io
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .features import DECODE_FAILURES, FEATURE_DTYPE, extract_single_feature, preprocess_single_image
+from .inference import score
+from .metrics import histogram
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".avif")
+RESULT_FIELDS = ["name", "label", "confidence", "featurize_ms", "classify_ms", "error"]
+
+# Recorded in this process from the timings pool workers return (see metrics.py).
+FEATURIZE_MS = histogram("signature_featurize_ms", "Decode + featurize latency per image in ms (pool workers).")
+
+
+# --- Input Discovery ---
+
+def iter_zip_images(zip_source, prefix="", skip=()):
+    """
+    Yields (name, bytes) for every image inside a ZIP file path or file-like object.
+    Members are read one at a time; names in ``skip`` are not read at all.
+    """
+    with zipfile.ZipFile(zip_source) as archive:
+        for info in archive.infolist():
+            name = prefix + info.filename
+            if not info.is_dir() and info.filename.lower().endswith(IMAGE_EXTENSIONS) and name not in skip:
+                yield name, archive.read(info)
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def iter_image_inputs(paths, skip=()):
+    """
+    Yields (name, bytes) for image files, directories (recursively, in sorted order) and
+    ZIP archives. Files are read lazily; names in ``skip`` are not read at all.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    full_path = os.path.join(root, name)
+                    if name.lower().endswith(".zip"):
+                        yield from iter_zip_images(full_path, prefix=full_path + "/", skip=skip)
+                    elif name.lower().endswith(IMAGE_EXTENSIONS) and full_path not in skip:
+                        yield full_path, _read_file(full_path)
+        elif path.lower().endswith(".zip"):
+            yield from iter_zip_images(path, prefix=path + "/", skip=skip)
+        elif path not in skip:
+            yield path, _read_file(path)
+
+
+# --- Scoring ---
+
+def featurize_bytes(image_bytes, engine=None):
+    """ Worker: returns (feature_vector or None, elapsed_ms). A corrupt image yields None, never an exception. """
+    start = time.perf_counter()
+    vector = None
+    try:
+        processed_image, _ = preprocess_single_image(image_bytes)
+        if processed_image is not None:
+            vector = extract_single_feature(processed_image, engine=engine)[0].astype(FEATURE_DTYPE)
+    except Exception:  # e.g. cv2.error from a truncated file: one bad image must not end a batch
+        vector = None
+    return vector, (time.perf_counter() - start) * 1000
+
+def _classify_chunk(model, rows, vectors):
+    """ Scores one stacked chunk with a single classifier call and fills in the rows. """
+    start = time.perf_counter()
+    X = np.vstack(vectors)
+    scored = score(model, X)
+    per_image_ms = (time.perf_counter() - start) * 1000 / len(rows)
+    for row, label, confidence in zip(rows, scored.labels, scored.confidences):
+        row["label"] = "Genuine" if label == 1 else "Forged"
+        row["confidence"] = round(float(confidence) * 100, 2)
+        row["classify_ms"] = round(per_image_ms, 3)
+
+def iter_scored(model, named_images, executor=None, workers=None, chunk_size=256, max_in_flight=None, engine=None):
+    """
+    Scores a stream of (name, bytes) pairs and yields one result dict per input, in input
+    order, with the keys listed in RESULT_FIELDS.
+
+    Images are decoded and featurized in the process pool while at most ``max_in_flight``
+    (default 4 x chunk_size) are queued or running, so the input is consumed only as fast
+    as it is scored. Vectors are stacked and classified once per ``chunk_size`` images, and
+    each chunk's rows are yielded as soon as it is classified. Memory use therefore stays
+    flat however long the input is.
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    max_in_flight = max_in_flight or 4 * chunk_size
+    in_flight = deque()
+    try:
+        images = iter(named_images)
+        rows, pending_rows, pending_vectors = [], [], []
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                item = next(images, None)
+                if item is None:
+                    exhausted = True
+                    break
+                name, data = item
+                in_flight.append((name, executor.submit(featurize_bytes, data, engine)))
+            if not in_flight:
+                break
+
+            name, future = in_flight.popleft()
+            vector, elapsed_ms = future.result()
+            FEATURIZE_MS.observe(elapsed_ms)
+            row = {"name": name, "label": None, "confidence": None,
+                   "featurize_ms": round(elapsed_ms, 3), "classify_ms": None, "error": None}
+            rows.append(row)
+            if vector is None:
+                DECODE_FAILURES.inc()
+                row["error"] = "Could not decode image"
+            else:
+                pending_rows.append(row)
+                pending_vectors.append(vector)
+            if len(pending_rows) >= chunk_size or len(rows) >= max_in_flight:
+                if pending_rows:
+                    _classify_chunk(model, pending_rows, pending_vectors)
+                yield from rows
+                rows, pending_rows, pending_vectors = [], [], []
+        if pending_rows:
+            _classify_chunk(model, pending_rows, pending_vectors)
+        yield from rows
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+        else:  # closed early: don't leave our queued work in a shared pool
+            for _, future in in_flight:
+                future.cancel()
+
+def score_batch(model, named_images, executor=None, workers=None, chunk_size=256, engine=None):
+    """ Scores an iterable of (name, bytes) pairs and returns the list of result dicts (see iter_scored). """
+    return list(iter_scored(model, named_images, executor=executor, workers=workers,
+                            chunk_size=chunk_size, engine=engine))
+
+def results_to_csv(results):
+    """ Returns the results as CSV text. """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=RESULT_FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+    return buffer.getvalue()
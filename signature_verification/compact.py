@@ -0,0 +1,125 @@
+import json
+
+import numpy as np
+
+COMPACT_KINDS = ("linear", "rff", "nystroem")
+
+
+class CompactScorer:
+    """
+    A classifier reduced to plain NumPy arrays: an optional kernel feature map, one
+    weight vector and a Platt calibration, saved as an ``.npz`` file.
+
+    - "linear":   decision = X @ w + b on the HOG + LBP features directly
+    - "rff":      random Fourier features, cos(X @ W + offset) * sqrt(2 / D), then linear
+    - "nystroem": RBF kernel against m basis images, with the Nyström normalisation
+                  folded into the weights, then linear
+
+    Unlike the SVC there is no per-support-vector work: a batch is one matmul (linear)
+    or two. It exposes the parts of the scikit-learn interface the pipeline relies on
+    (classes_, n_features_in_, decision_function, predict, predict_proba and the Platt
+    parameters), so inference.score() and ModelRegistry serve it like the SVC.
+    """
+
+    def __init__(self, kind, weights, bias, prob_a, prob_b, classes=(0, 1), gamma=None, basis=None, offset=None):
+        if kind not in COMPACT_KINDS:
+            raise ValueError(f"Unknown compact scorer '{kind}'. Use one of {COMPACT_KINDS}.")
+        self.kind = kind
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+        self.probA_ = np.array([prob_a], dtype=np.float64)
+        self.probB_ = np.array([prob_b], dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.gamma = gamma
+        self.basis = None if basis is None else np.asarray(basis, dtype=np.float32)
+        self.offset = None if offset is None else np.asarray(offset, dtype=np.float32)
+        if kind == "linear":
+            self.n_features_in_ = self.weights.shape[0]
+        else:
+            self.n_features_in_ = self.basis.shape[0] if kind == "rff" else self.basis.shape[1]
+        if kind == "nystroem":
+            self._basis_sq = np.einsum("ij,ij->i", self.basis, self.basis)
+
+    def _features(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.kind == "linear":
+            return X
+        if self.kind == "rff":
+            projected = X @ self.basis
+            projected += self.offset
+            return np.cos(projected, out=projected) * np.float32(np.sqrt(2.0 / self.basis.shape[1]))
+        sq_dist = np.einsum("ij,ij->i", X, X)[:, None] + self._basis_sq[None, :] - 2 * (X @ self.basis.T)
+        return np.exp(-self.gamma * np.maximum(sq_dist, 0))
+
+    def decision_function(self, X):
+        return (self._features(X) @ self.weights).astype(np.float64) + self.bias
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(np.intp)]
+
+    def predict_proba(self, X):
+        from .inference import score
+
+        return score(self, X).probabilities
+
+    def save(self, path):
+        meta = {"kind": self.kind, "bias": self.bias, "prob_a": float(self.probA_[0]),
+                "prob_b": float(self.probB_[0]), "classes": self.classes_.tolist(), "gamma": self.gamma}
+        arrays = {"weights": self.weights}
+        if self.basis is not None:
+            arrays["basis"] = self.basis
+        if self.offset is not None:
+            arrays["offset"] = self.offset
+        with open(path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(meta["kind"], data["weights"], meta["bias"], meta["prob_a"], meta["prob_b"],
+                       classes=meta["classes"], gamma=meta["gamma"],
+                       basis=data["basis"] if "basis" in data else None,
+                       offset=data["offset"] if "offset" in data else None)
+
+
+def fit_compact(X, y, kind="linear", C=1.0, n_components=1024, gamma="scale", seed=42, calibration_folds=5):
+    """
+    Fits a CompactScorer: the feature map (if any), a linear SVM on top of it, and a
+    Platt sigmoid fitted on out-of-fold decision values, as SVC(probability=True) does.
+    """
+    from sklearn.kernel_approximation import Nystroem, RBFSampler
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import StratifiedKFold, cross_val_predict
+    from sklearn.svm import LinearSVC
+
+    X = np.asarray(X, dtype=np.float32)
+    if gamma == "scale":
+        gamma = 1.0 / (X.shape[1] * float(X.astype(np.float64).var()))
+    basis = offset = None
+    if kind == "rff":
+        sampler = RBFSampler(gamma=gamma, n_components=n_components, random_state=seed).fit(X)
+        basis, offset = sampler.random_weights_, sampler.random_offset_
+    elif kind == "nystroem":
+        sampler = Nystroem(gamma=gamma, n_components=min(n_components, len(X)), random_state=seed).fit(X)
+        basis = sampler.components_
+    elif kind != "linear":
+        raise ValueError(f"Unknown compact scorer '{kind}'. Use one of {COMPACT_KINDS}.")
+    Z = X if kind == "linear" else sampler.transform(X).astype(np.float32)
+
+    svm = LinearSVC(C=C, max_iter=10000, random_state=seed)
+    folds = StratifiedKFold(n_splits=calibration_folds, shuffle=True, random_state=seed)
+    held_out = cross_val_predict(svm, Z, y, cv=folds, method="decision_function")
+    svm.fit(Z, y)
+
+    # P(classes_[1]) = sigmoid(c * d + i); libsvm's convention is 1 / (1 + exp(A * -d + B)) for classes_[0].
+    sigmoid = LogisticRegression(C=1e6).fit(held_out.reshape(-1, 1), y)
+    prob_a, prob_b = -float(sigmoid.coef_[0, 0]), float(sigmoid.intercept_[0])
+
+    weights = svm.coef_[0]
+    if kind == "nystroem":
+        weights = sampler.normalization_.T @ weights
+    return CompactScorer(kind, weights, svm.intercept_[0], prob_a, prob_b, classes=svm.classes_,
+                         gamma=gamma if kind == "nystroem" else None, basis=basis, offset=offset)
@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from .features import FEATURE_DTYPE, extract_single_feature, feature_config, preprocess_single_image
+
+INDEX_DIR = "reference_index"
+INDEX_FILE = "index.npz"
+DEFAULT_THRESHOLD = 0.37  # equal-error point of `python enrollment.py evaluate` on the bundled dataset
+
+
+def writer_id_from_filename(filename):
+    """
+    Returns the claimed writer of a dataset image, or None for other file names.
+    Dataset names are XXXYYZZZ.png: signed by XXX, sample YY, signature of writer ZZZ.
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    if len(stem) == 8 and stem.isdigit():
+        return stem[5:8]
+    return None
+
+def featurize_image_bytes(image_bytes):
+    """ Returns the 1-D feature vector of an image, or None if it can't be decoded. """
+    processed_image, _ = preprocess_single_image(image_bytes)
+    if processed_image is None:
+        return None
+    return extract_single_feature(processed_image)[0].astype(FEATURE_DTYPE)
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+class ReferenceIndex:
+    """
+    Nearest-neighbour index over enrolled reference signatures.
+
+    Vectors are L2-normalised float32 rows of one contiguous, geometrically grown array,
+    so cosine similarity is a single matrix-vector product. Each customer's row ids are
+    kept in a dict, so scoring against one customer only touches their few references
+    regardless of how many customers are enrolled.
+
+    search() without a customer runs over the whole index: exactly by default, or
+    approximately through an inverted file (k-means lists, rebuilt lazily after changes)
+    when ``approximate=True``.
+    """
+
+    def __init__(self, dim):
+        self.dim = dim
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._owners = []
+        self._rows = {}
+        self._size = 0
+        self._lock = threading.RLock()
+        self._ivf = None
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def customers(self):
+        return sorted(self._rows)
+
+    def reference_count(self, customer_id):
+        return len(self._rows.get(customer_id, ()))
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed > self._vectors.shape[0]:
+            capacity = max(needed, 2 * self._vectors.shape[0], 64)
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+
+    def enroll(self, customer_id, vectors):
+        """ Adds one or more reference vectors for a customer. """
+        vectors = _normalize(vectors)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}.")
+        with self._lock:
+            self._reserve(len(vectors))
+            start = self._size
+            self._vectors[start:start + len(vectors)] = vectors
+            self._owners.extend([customer_id] * len(vectors))
+            self._rows.setdefault(customer_id, []).extend(range(start, start + len(vectors)))
+            self._size += len(vectors)
+            self._ivf = None
+
+    def remove(self, customer_id):
+        """ Deletes every reference of a customer (compacts the array). """
+        with self._lock:
+            rows = set(self._rows.pop(customer_id, ()))
+            if not rows:
+                return
+            keep = np.array([i for i in range(self._size) if i not in rows], dtype=np.intp)
+            self._vectors[:len(keep)] = self._vectors[keep]
+            self._owners = [self._owners[i] for i in keep]
+            self._size = len(keep)
+            self._rows = {}
+            for row, owner in enumerate(self._owners):
+                self._rows.setdefault(owner, []).append(row)
+            self._ivf = None
+
+    def verify(self, customer_id, vector, k=3):
+        """
+        Scores a questioned vector against one customer's references.
+        Returns the mean of the top-k cosine similarities (higher = more similar).
+        """
+        with self._lock:
+            rows = self._rows.get(customer_id)
+            if not rows:
+                raise KeyError(f"Customer '{customer_id}' has no enrolled references.")
+            similarities = self._vectors[rows] @ _normalize(vector)[0]
+        top = np.sort(similarities)[::-1][:k]
+        return float(top.mean())
+
+    def search(self, vector, k=5, approximate=False, n_probe=4):
+        """ Returns the k most similar references over all customers as [(customer_id, similarity)]. """
+        query = _normalize(vector)[0]
+        with self._lock:
+            if approximate and self._size > 0:
+                candidates = self._ivf_candidates(query, n_probe)
+            else:
+                candidates = np.arange(self._size)
+            similarities = self._vectors[candidates] @ query
+            owners = self._owners
+        k = min(k, len(candidates))
+        if k == 0:
+            return []
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [(owners[candidates[i]], float(similarities[i])) for i in top]
+
+    def _ivf_candidates(self, query, n_probe):
+        if self._ivf is None:
+            self._ivf = self._build_ivf()
+        centroids, lists = self._ivf
+        nearest = np.argsort(-(centroids @ query))[:n_probe]
+        return np.concatenate([lists[i] for i in nearest])
+
+    def _build_ivf(self, iterations=10, seed=0):
+        """ Spherical k-means with ~sqrt(n) lists over the current vectors. """
+        vectors = self._vectors[:self._size]
+        n_lists = max(1, int(np.sqrt(self._size)))
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(self._size, n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = vectors[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        lists = [np.flatnonzero(assignment == c) for c in range(n_lists)]
+        return centroids, lists
+
+    def save(self, index_dir=INDEX_DIR):
+        """
+        Writes the vectors and customer metadata into a single index.npz in index_dir,
+        replaced atomically, so a reader never pairs new vectors with old owners.
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        with self._lock:
+            meta = {"dim": self.dim, "feature_config": feature_config(), "owners": self._owners}
+            tmp_path = os.path.join(index_dir, "index.tmp.npz")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, vectors=self._vectors[:self._size], meta=np.array(json.dumps(meta)))
+            os.replace(tmp_path, os.path.join(index_dir, INDEX_FILE))
+
+    @classmethod
+    def load(cls, index_dir=INDEX_DIR, dim=None):
+        """
+        Loads a saved index, or returns an empty one of dimension ``dim`` if none exists.
+        Indexes saved as vectors.npy + customers.json by older versions are still read.
+        """
+        index_path = os.path.join(index_dir, INDEX_FILE)
+        legacy_meta_path = os.path.join(index_dir, "customers.json")
+        if os.path.exists(index_path):
+            with np.load(index_path) as data:
+                meta = json.loads(str(data["meta"]))
+                vectors = data["vectors"]
+        elif os.path.exists(legacy_meta_path):
+            with open(legacy_meta_path) as f:
+                meta = json.load(f)
+            vectors = np.load(os.path.join(index_dir, "vectors.npy"))
+        elif dim is None:
+            raise FileNotFoundError(f"No reference index found in '{index_dir}'.")
+        else:
+            return cls(dim)
+        if meta["feature_config"] != feature_config():
+            raise ValueError(f"Reference index in '{index_dir}' was built with different feature parameters.")
+        index = cls(meta["dim"])
+        index._vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        index._owners = list(meta["owners"])
+        index._size = len(index._owners)
+        for row, owner in enumerate(index._owners):
+            index._rows.setdefault(owner, []).append(row)
+        return index
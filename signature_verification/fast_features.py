@@ -0,0 +1,194 @@
+import threading
+
+import numpy as np
+
+from .features import HOG_PARAMS, LBP_PARAMS
+
+# --- Fast HOG + LBP Engine ---
+#
+# A NumPy re-implementation of skimage's hog(block_norm='L2-Hys') and
+# local_binary_pattern(method='uniform') for a fixed image shape.
+#
+# LBP: skimage interpolates all P neighbours of every pixel one pixel at a time.
+# The sampling offsets are the same for every pixel, so each neighbour becomes four
+# shifted views of a zero-padded copy of the image blended with per-row/per-column
+# weights. The weights are precomputed with the same floating-point expressions
+# skimage uses, which makes the LBP codes (and histogram) bit-identical.
+#
+# HOG: cell histograms are accumulated in float32 in the same pixel order as
+# skimage's Cython loop, so they match exactly. Block normalisation sums each block
+# in a different order than NumPy does inside skimage, which could move a value by
+# a few ulps; on the bundled dataset the two engines are bit-identical.
+#
+# Tolerance: max |fast - skimage| <= FEATURE_TOLERANCE on every vector
+# (benchmarks/verify_fast_features.py checks this on the bundled dataset).
+FEATURE_TOLERANCE = 1e-12
+
+
+class FastFeatureExtractor:
+    """
+    Extracts the same HOG + LBP vector as features.extract_single_feature for images of
+    one fixed shape, reusing preallocated buffers between calls.
+
+    Instances are not thread-safe; use extract_single_feature_fast(), which keeps one
+    extractor per thread and image shape.
+    """
+
+    def __init__(self, shape):
+        self.shape = rows, cols = shape
+        self._init_lbp(rows, cols)
+        self._init_hog(rows, cols)
+        self._image = np.empty(shape, dtype=np.float64)
+
+    # --- LBP ---
+
+    def _init_lbp(self, rows, cols):
+        P, R = LBP_PARAMS["P"], LBP_PARAMS["R"]
+        if LBP_PARAMS["method"] != "uniform":
+            raise ValueError("FastFeatureExtractor only supports method='uniform' LBP.")
+        self.P = P
+        rp = np.round(-R * np.sin(2 * np.pi * np.arange(P, dtype=np.float64) / P), 5)
+        cp = np.round(R * np.cos(2 * np.pi * np.arange(P, dtype=np.float64) / P), 5)
+        self._pad = pad = int(np.ceil(R)) + 1
+        self._padded = np.zeros((rows + 2 * pad, cols + 2 * pad), dtype=np.float64)
+
+        r_idx = np.arange(rows, dtype=np.float64)
+        c_idx = np.arange(cols, dtype=np.float64)
+        self._samples = []
+        for i in range(P):
+            r = r_idx + rp[i]
+            c = c_idx + cp[i]
+            minr, maxr = np.floor(r), np.ceil(r)
+            minc, maxc = np.floor(c), np.ceil(c)
+            dr, dc = r - minr, c - minc
+            self._samples.append((
+                self._index(minr, r_idx, pad), self._index(maxr, r_idx, pad),
+                self._index(minc, c_idx, pad), self._index(maxc, c_idx, pad),
+                (1 - dr)[:, None], dr[:, None], (1 - dc)[None, :], dc[None, :],
+            ))
+
+        self._texture = np.empty((rows, cols), dtype=np.float64)
+        self._tmp = np.empty((rows, cols), dtype=np.float64)
+        self._tmp2 = np.empty((rows, cols), dtype=np.float64)
+        self._bits = np.empty((P, rows, cols), dtype=bool)
+        self._changes = np.empty((rows, cols), dtype=np.int16)
+        self._ones = np.empty((rows, cols), dtype=np.int16)
+
+    @staticmethod
+    def _index(target, base, pad):
+        """ Returns a slice if target - base is a constant integer shift, else a fancy index. """
+        shift = target - base
+        if np.all(shift == shift[0]):
+            start = int(shift[0]) + pad
+            return slice(start, start + len(base))
+        return target.astype(np.intp) + pad
+
+    def _shifted(self, row_index, col_index):
+        if isinstance(row_index, slice) and isinstance(col_index, slice):
+            return self._padded[row_index, col_index]
+        rows = np.arange(self._padded.shape[0])[row_index]
+        cols = np.arange(self._padded.shape[1])[col_index]
+        return self._padded[np.ix_(rows, cols)]
+
+    def lbp_histogram(self, image):
+        """ Normalised 'uniform' LBP histogram (P + 2 bins), as in extract_single_feature. """
+        pad, rows, cols = self._pad, *self.shape
+        self._padded[pad:pad + rows, pad:pad + cols] = image
+        texture, tmp, tmp2 = self._texture, self._tmp, self._tmp2
+
+        for i, (minr, maxr, minc, maxc, w_r0, w_r1, w_c0, w_c1) in enumerate(self._samples):
+            top_left, top_right = self._shifted(minr, minc), self._shifted(minr, maxc)
+            bottom_left, bottom_right = self._shifted(maxr, minc), self._shifted(maxr, maxc)
+            # top = (1 - dc) * top_left + dc * top_right
+            np.multiply(w_c0, top_left, out=texture)
+            np.multiply(w_c1, top_right, out=tmp)
+            texture += tmp
+            texture *= w_r0
+            # bottom = (1 - dc) * bottom_left + dc * bottom_right
+            np.multiply(w_c0, bottom_left, out=tmp)
+            np.multiply(w_c1, bottom_right, out=tmp2)
+            tmp += tmp2
+            tmp *= w_r1
+            texture += tmp
+            texture -= image
+            np.greater_equal(texture, 0, out=self._bits[i])
+
+        bits = self._bits
+        np.sum(bits[:-1] != bits[1:], axis=0, dtype=np.int16, out=self._changes)
+        np.sum(bits, axis=0, dtype=np.int16, out=self._ones)
+        codes = np.where(self._changes <= 2, self._ones, self.P + 1)
+
+        lbp_hist = np.bincount(codes.ravel(), minlength=self.P + 2).astype("float")
+        lbp_hist /= (lbp_hist.sum() + 1e-7)
+        return lbp_hist
+
+    # --- HOG ---
+
+    def _init_hog(self, rows, cols):
+        if HOG_PARAMS["block_norm"] != "L2-Hys":
+            raise ValueError("FastFeatureExtractor only supports block_norm='L2-Hys' HOG.")
+        self.orientations = HOG_PARAMS["orientations"]
+        self.cell_rows, self.cell_cols = HOG_PARAMS["pixels_per_cell"]
+        self.block_rows, self.block_cols = HOG_PARAMS["cells_per_block"]
+        self.n_cells_row = rows // self.cell_rows
+        self.n_cells_col = cols // self.cell_cols
+        per_bin = np.float32(180.0 / self.orientations)
+        # Bin edges as skimage computes them (in float32).
+        self._bin_edges = np.array([per_bin * np.float32(i) for i in range(self.orientations + 1)], dtype=np.float64)
+
+        self._g_row = np.zeros((rows, cols), dtype=np.float64)
+        self._g_col = np.zeros((rows, cols), dtype=np.float64)
+        self._cell_hist = np.empty((self.n_cells_row, self.n_cells_col, self.orientations + 1), dtype=np.float32)
+        self._cell_offsets = np.arange(self.n_cells_row * self.n_cells_col) * (self.orientations + 1)
+
+    def hog_features(self, image):
+        """ HOG descriptor identical (to FEATURE_TOLERANCE) to skimage.feature.hog with HOG_PARAMS. """
+        g_row, g_col = self._g_row, self._g_col
+        np.subtract(image[2:, :], image[:-2, :], out=g_row[1:-1, :])
+        np.subtract(image[:, 2:], image[:, :-2], out=g_col[:, 1:-1])
+        magnitude = np.hypot(g_col, g_row)
+        orientation = np.rad2deg(np.arctan2(g_row, g_col)) % 180
+        bins = np.searchsorted(self._bin_edges, orientation, side="right") - 1
+
+        # One extra bin catches the (rare) orientation of exactly 180 degrees, which
+        # skimage drops; it is sliced off below.
+        hist = self._cell_hist
+        hist.fill(0)
+        flat_hist = hist.reshape(-1)
+        n_r, n_c = self.n_cells_row * self.cell_rows, self.n_cells_col * self.cell_cols
+        # skimage visits the pixels of each cell row by row, adding to a float32 total.
+        for dr in range(self.cell_rows):
+            for dc in range(self.cell_cols):
+                index = self._cell_offsets + bins[dr:n_r:self.cell_rows, dc:n_c:self.cell_cols].ravel()
+                cell_mag = magnitude[dr:n_r:self.cell_rows, dc:n_c:self.cell_cols].ravel()
+                flat_hist[index] = flat_hist[index] + cell_mag
+        cells = (hist[..., :self.orientations] / np.float32(self.cell_rows * self.cell_cols)).astype(np.float64)
+
+        blocks = np.lib.stride_tricks.sliding_window_view(cells, (self.block_rows, self.block_cols), axis=(0, 1))
+        # sliding_window_view puts the window axes last: (n_blocks_row, n_blocks_col, orient, b_row, b_col)
+        blocks = blocks.transpose(0, 1, 3, 4, 2).reshape(blocks.shape[0], blocks.shape[1], -1)
+        eps = 1e-5
+        out = blocks / np.sqrt(np.sum(blocks ** 2, axis=-1, keepdims=True) + eps ** 2)
+        np.minimum(out, 0.2, out=out)
+        out /= np.sqrt(np.sum(out ** 2, axis=-1, keepdims=True) + eps ** 2)
+        return out.ravel()
+
+    # --- Combined ---
+
+    def extract(self, image):
+        """ Returns the (1, n_features) HOG + LBP vector for one binarized image. """
+        np.copyto(self._image, image, casting="unsafe")
+        return np.hstack([self.hog_features(self._image), self.lbp_histogram(self._image)]).reshape(1, -1)
+
+
+_local = threading.local()
+
+def extract_single_feature_fast(image):
+    """ Thread-safe drop-in replacement for features.extract_single_feature. """
+    extractors = getattr(_local, "extractors", None)
+    if extractors is None:
+        extractors = _local.extractors = {}
+    extractor = extractors.get(image.shape)
+    if extractor is None:
+        extractor = extractors[image.shape] = FastFeatureExtractor(image.shape)
+    return extractor.extract(image)
@@ -0,0 +1,212 @@
+import io
+import os
+
+import numpy as np
+
+from .metrics import counter, histogram
+
+# OpenCV and scikit-image are imported inside the functions that use them, so
+# importing this module (e.g. for feature_length on the login page) stays cheap.
+
+# --- Feature Parameters ---
+# Shared by training and the app; changing any of these invalidates cached
+# features and requires a retrained model.
+IMAGE_SIZE = (256, 128)
+HOG_PARAMS = {"orientations": 9, "pixels_per_cell": (8, 8), "cells_per_block": (2, 2), "block_norm": "L2-Hys"}
+LBP_PARAMS = {"P": 24, "R": 8, "method": "uniform"}
+
+# Feature engine used by extract_single_feature: "skimage" (reference implementation)
+# or "fast" (fast_features.py, numerically equivalent within FEATURE_TOLERANCE).
+FEATURE_ENGINES = ("skimage", "fast")
+FEATURE_ENGINE = os.environ.get("SIGNATURE_FEATURE_ENGINE", "skimage")
+
+# Extraction runs in float64; vectors are cached, stored and shipped between
+# processes as float32, which halves their size without affecting accuracy.
+FEATURE_DTYPE = np.float32
+
+# Preprocessing used by preprocess_single_image: "resize" squeezes the whole scan to
+# IMAGE_SIZE; "crop" decodes large inputs at reduced resolution and crops, deskews
+# and pads the signature's ink bounding box before resizing. A model must be served
+# with the mode it was trained with (train_model.py --preprocess).
+PREPROCESS_MODES = ("resize", "crop")
+PREPROCESS_MODE = os.environ.get("SIGNATURE_PREPROCESS_MODE", "resize")
+CROP_PARAMS = {"max_skew_degrees": 15, "margin": 0.05, "ink_percentile": 0.5}
+
+
+def feature_config(preprocess_mode=None, hog_params=None, lbp_params=None):
+    """
+    Returns a JSON-serialisable description of the feature pipeline. ``hog_params`` and
+    ``lbp_params`` override HOG_PARAMS / LBP_PARAMS (used by tune_model.py).
+    """
+    hog_params = {**HOG_PARAMS, **(hog_params or {})}
+    config = {
+        "image_size": list(IMAGE_SIZE),
+        "hog": {k: list(v) if isinstance(v, tuple) else v for k, v in hog_params.items()},
+        "lbp": {**LBP_PARAMS, **(lbp_params or {})},
+    }
+    preprocess_mode = preprocess_mode or PREPROCESS_MODE
+    if preprocess_mode != "resize":
+        # Only recorded for non-default modes, so caches and indexes built before
+        # crop mode existed stay valid.
+        config["preprocess"] = {"mode": preprocess_mode, **CROP_PARAMS}
+    return config
+
+
+def feature_length(image_size=IMAGE_SIZE, hog_params=None, lbp_params=None):
+    """ Returns the length of the HOG + LBP vector produced by extract_single_feature. """
+    hog_params = {**HOG_PARAMS, **(hog_params or {})}
+    lbp_params = {**LBP_PARAMS, **(lbp_params or {})}
+    width, height = image_size
+    cell_rows, cell_cols = hog_params["pixels_per_cell"]
+    block_rows, block_cols = hog_params["cells_per_block"]
+    n_blocks_row = height // cell_rows - block_rows + 1
+    n_blocks_col = width // cell_cols - block_cols + 1
+    hog_length = n_blocks_row * n_blocks_col * block_rows * block_cols * hog_params["orientations"]
+    return hog_length + lbp_params["P"] + 2
+
+
+PREPROCESS_MS = histogram("signature_preprocess_ms", "Decode + preprocess latency per image in ms.")
+EXTRACT_MS = histogram("signature_extract_features_ms", "HOG + LBP extraction latency per image in ms.")
+DECODE_FAILURES = counter("signature_decode_failures_total", "Images that could not be decoded.")
+
+
+# --- Helper Functions ---
+
+def preprocess_single_image(image_bytes, image_size=IMAGE_SIZE, mode=None):
+    """
+    Preprocesses a single image from bytes for prediction.
+    Returns (binarized image of image_size, display image) or (None, None) if it can't be decoded.
+    """
+    mode = mode or PREPROCESS_MODE
+    if mode not in PREPROCESS_MODES:
+        raise ValueError(f"Unknown preprocessing mode '{mode}'. Choose one of {PREPROCESS_MODES}.")
+    with PREPROCESS_MS.time():
+        if mode == "crop":
+            result = _preprocess_cropped(image_bytes, image_size)
+        else:
+            result = _preprocess_resized(image_bytes, image_size)
+    if result[0] is None:
+        DECODE_FAILURES.inc()
+    return result
+
+def _preprocess_resized(image_bytes, image_size):
+    """ "resize" mode: the whole scan squeezed to image_size and binarized with Otsu. """
+    import cv2
+
+    if not image_bytes:
+        return None, None
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    img = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
+    if img is not None:
+        resized_img = cv2.resize(img, image_size)
+        _, binarized_img = cv2.threshold(resized_img, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        return binarized_img, cv2.resize(img, (400, 200)) # Return original resized for display
+    return None, None
+
+def _reduced_read_flag(image_bytes, image_size):
+    """
+    Picks the largest cv2.IMREAD_REDUCED_GRAYSCALE_* factor that keeps the decoded image at
+    least twice image_size, reading only the header (via Pillow) to get the dimensions.
+    """
+    import cv2
+
+    try:
+        from PIL import Image
+        with Image.open(io.BytesIO(image_bytes)) as header:
+            width, height = header.size
+    except Exception:
+        return cv2.IMREAD_GRAYSCALE
+    for factor, flag in ((8, cv2.IMREAD_REDUCED_GRAYSCALE_8), (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+                         (2, cv2.IMREAD_REDUCED_GRAYSCALE_2)):
+        if width // factor >= 2 * image_size[0] and height // factor >= 2 * image_size[1]:
+            return flag
+    return cv2.IMREAD_GRAYSCALE
+
+def _ink_points(gray):
+    """ Returns the (x, y) coordinates of ink pixels (Otsu on a lightly blurred copy). """
+    import cv2
+
+    _, mask = cv2.threshold(cv2.GaussianBlur(gray, (3, 3), 0), 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    points = cv2.findNonZero(mask)
+    return None if points is None or len(points) < 10 else points.reshape(-1, 2)
+
+def _ink_box(points, percentile):
+    """ Bounding box of the ink, ignoring the outermost ``percentile`` % of pixels on each side (specks, borders). """
+    x0, y0 = np.percentile(points, percentile, axis=0)
+    x1, y1 = np.percentile(points, 100 - percentile, axis=0)
+    return x0, y0, x1 + 1, y1 + 1
+
+def _preprocess_cropped(image_bytes, image_size):
+    import cv2
+
+    if not image_bytes:
+        return None, None
+    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), _reduced_read_flag(image_bytes, image_size))
+    if img is None:
+        return None, None
+    background = int(np.median(img[::4, ::4]))
+
+    # Locate the ink on a working copy of at most ~4x image_size; crop the full image.
+    height, width = img.shape
+    scale = min(1.0, max(4 * image_size[0] / width, 4 * image_size[1] / height))
+    work = img if scale == 1.0 else cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    points = _ink_points(work)
+    if points is not None:
+        # Deskew: minAreaRect's angle, folded to the small rotation that levels the long side.
+        # A few thousand ink pixels pin down the angle as well as all of them.
+        step = max(1, len(points) // 4000)
+        (cx, cy), (w, h), angle = cv2.minAreaRect(points[::step].astype(np.float32))
+        if w < h:
+            angle -= 90
+        if 0.5 <= abs(angle) <= CROP_PARAMS["max_skew_degrees"]:
+            def rotate(image, factor):
+                rotation = cv2.getRotationMatrix2D((cx * factor, cy * factor), angle, 1.0)
+                return cv2.warpAffine(image, rotation, (image.shape[1], image.shape[0]), flags=cv2.INTER_LINEAR,
+                                      borderMode=cv2.BORDER_CONSTANT, borderValue=background)
+            img = rotate(img, 1 / scale)
+            work = img if scale == 1.0 else rotate(work, 1.0)
+            points = _ink_points(work)
+    if points is not None:
+        x0, y0, x1, y1 = (v / scale for v in _ink_box(points, CROP_PARAMS["ink_percentile"]))
+        img = img[max(0, int(y0)):int(np.ceil(y1)), max(0, int(x0)):int(np.ceil(x1))]
+
+    # Pad to the target aspect ratio (plus a margin) so the resize doesn't distort strokes.
+    height, width = img.shape
+    target_ratio = image_size[0] / image_size[1]
+    pad_w = max(width, int(round(height * target_ratio)))
+    pad_h = max(height, int(round(width / target_ratio)))
+    margin_x = int(pad_w * CROP_PARAMS["margin"])
+    margin_y = int(pad_h * CROP_PARAMS["margin"])
+    left, top = (pad_w - width) // 2 + margin_x, (pad_h - height) // 2 + margin_y
+    img = cv2.copyMakeBorder(img, top, pad_h - height - (pad_h - height) // 2 + margin_y,
+                             left, pad_w - width - (pad_w - width) // 2 + margin_x,
+                             cv2.BORDER_CONSTANT, value=background)
+
+    resized_img = cv2.resize(img, image_size, interpolation=cv2.INTER_AREA)
+    _, binarized_img = cv2.threshold(resized_img, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return binarized_img, cv2.resize(img, (400, 200))
+
+@EXTRACT_MS.time()
+def extract_single_feature(image, engine=None, hog_params=None, lbp_params=None):
+    """
+    Extracts features from a single preprocessed image. ``hog_params`` / ``lbp_params``
+    override HOG_PARAMS / LBP_PARAMS; the fast engine only implements the defaults, so
+    overridden parameters always use scikit-image.
+    """
+    engine = engine or FEATURE_ENGINE
+    if engine not in FEATURE_ENGINES:
+        raise ValueError(f"Unknown feature engine '{engine}'. Choose one of {FEATURE_ENGINES}.")
+    if engine == "fast" and not hog_params and not lbp_params:
+        from .fast_features import extract_single_feature_fast
+        return extract_single_feature_fast(image)
+    from skimage.feature import hog, local_binary_pattern
+
+    lbp_params = {**LBP_PARAMS, **(lbp_params or {})}
+    hog_features = hog(image, **{**HOG_PARAMS, **(hog_params or {})})
+    lbp = local_binary_pattern(image, **lbp_params)
+    n_codes = lbp_params["P"] + 2  # "uniform" LBP codes are 0..P+1
+    (lbp_hist, _) = np.histogram(lbp.ravel(), bins=np.arange(0, n_codes + 1), range=(0, n_codes))
+    lbp_hist = lbp_hist.astype("float")
+    lbp_hist /= (lbp_hist.sum() + 1e-7)
+    combined_features = np.hstack([hog_features, lbp_hist])
+    return combined_features.reshape(1, -1)
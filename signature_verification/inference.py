@@ -0,0 +1,125 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .metrics import counter, histogram
+
+# Result of scoring a feature matrix. All fields are arrays with one entry per row:
+#   labels         predicted class (1 = Genuine, 0 = Forged)
+#   confidences    calibrated probability of the predicted class, in [0, 1]
+#   margins        raw SVM decision value (positive = Genuine)
+#   probabilities  (n, 2) calibrated probabilities, columns ordered as model.classes_
+ScoreResult = namedtuple("ScoreResult", ["labels", "confidences", "margins", "probabilities"])
+
+SCORE_MS = histogram("signature_model_ms", "Model call latency (one call may score many vectors) in ms.")
+SCORED_VECTORS = counter("signature_scored_vectors_total", "Feature vectors scored by the model.")
+
+# Same constants libsvm uses in predict_probability / multiclass_probability.
+_MIN_PROB = 1e-7
+_MAX_ITER = 100
+_EPS = 0.005 / 2
+
+
+def _sigmoid_predict(decision_values, A, B):
+    """ Platt scaling exactly as libsvm's sigmoid_predict, vectorized. """
+    fApB = decision_values * A + B
+    out = np.empty_like(fApB)
+    pos = fApB >= 0
+    exp_neg = np.exp(-fApB[pos])
+    out[pos] = exp_neg / (1.0 + exp_neg)
+    out[~pos] = 1.0 / (1 + np.exp(fApB[~pos]))
+    return out
+
+def _binary_multiclass_probability(r01):
+    """
+    libsvm's multiclass_probability for k = 2, vectorized over samples.
+
+    libsvm does not return the pairwise probability directly; it runs the iterative
+    coupling solver with a loose tolerance, which shifts results by up to ~0.5%.
+    Reproducing it keeps confidences identical to model.predict_proba.
+    """
+    r10 = 1 - r01
+    n = r01.shape[0]
+    Q = np.empty((n, 2, 2))
+    Q[:, 0, 0] = r10 * r10
+    Q[:, 1, 1] = r01 * r01
+    Q[:, 0, 1] = Q[:, 1, 0] = -r10 * r01
+    p = np.full((n, 2), 0.5)
+
+    active = np.ones(n, dtype=bool)
+    for _ in range(_MAX_ITER):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        Qa, pa = Q[idx], p[idx]
+        Qp = Qa[:, :, 0] * pa[:, :1] + Qa[:, :, 1] * pa[:, 1:]
+        pQp = pa[:, 0] * Qp[:, 0] + pa[:, 1] * Qp[:, 1]
+        max_error = np.abs(Qp - pQp[:, None]).max(axis=1)
+        converged = max_error < _EPS
+        active[idx[converged]] = False
+        keep = ~converged
+        idx, Qa, pa, Qp, pQp = idx[keep], Qa[keep], pa[keep], Qp[keep], pQp[keep]
+        for t in range(2):
+            diff = (-Qp[:, t] + pQp) / Qa[:, t, t]
+            pa[:, t] += diff
+            pQp = (pQp + diff * (diff * Qa[:, t, t] + 2 * Qp[:, t])) / (1 + diff) / (1 + diff)
+            Qp = (Qp + diff[:, None] * Qa[:, t, :]) / (1 + diff[:, None])
+            pa /= (1 + diff[:, None])
+        p[idx] = pa
+    return p
+
+def _platt_params(model):
+    # probA_/probB_ emit deprecation warnings on recent scikit-learn; the private
+    # attributes hold the same arrays.
+    A = getattr(model, "_probA", None)
+    B = getattr(model, "_probB", None)
+    if A is None or B is None:
+        A, B = model.probA_, model.probB_
+    return A, B
+
+def _supports_single_pass(model):
+    classes = getattr(model, "classes_", None)
+    if classes is None or len(classes) != 2 or not hasattr(model, "decision_function"):
+        return False
+    A, B = _platt_params(model)
+    return len(A) == 1 and len(B) == 1
+
+@SCORE_MS.time()
+def score(model, X):
+    """
+    Scores a feature matrix with a single evaluation of the model.
+
+    For a binary SVC trained with probability=True the decision function is computed
+    once and the label, calibrated probabilities and raw margin are all derived from it,
+    matching model.predict and model.predict_proba. Other classifiers fall back to
+    separate predict / predict_proba calls. Pipelines are transformed first and then
+    scored with their final estimator.
+    """
+    X = np.asarray(X)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    SCORED_VECTORS.inc(X.shape[0])
+    if hasattr(model, "steps"):
+        # Pipeline (e.g. float32 cast + projection + SVC): transform once, score with the final step.
+        X = model[:-1].transform(X)
+        model = model[-1]
+    classes = model.classes_
+
+    if not _supports_single_pass(model):
+        labels = model.predict(X)
+        probabilities = model.predict_proba(X)
+        class_index = np.searchsorted(classes, labels)
+        margins = probabilities[:, -1] - probabilities[:, 0]
+        confidences = probabilities[np.arange(len(labels)), class_index]
+        return ScoreResult(labels, confidences, margins, probabilities)
+
+    margins = np.asarray(model.decision_function(X), dtype=np.float64).reshape(-1)
+    class_index = (margins > 0).astype(np.intp)
+    labels = classes[class_index]
+
+    # libsvm's internal decision value has the opposite sign to scikit-learn's.
+    A, B = _platt_params(model)
+    pairwise = np.clip(_sigmoid_predict(-margins, A[0], B[0]), _MIN_PROB, 1 - _MIN_PROB)
+    probabilities = _binary_multiclass_probability(pairwise)
+    confidences = probabilities[np.arange(len(labels)), class_index]
+    return ScoreResult(labels, confidences, margins, probabilities)
@@ -0,0 +1,137 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+RUNNING, DONE, FAILED, CANCELLED = "running", "done", "failed", "cancelled"
+
+
+def make_job_id(kind, model_version, named_images):
+    """ Content-addressed job id: the same inputs scored by the same model map to the same job. """
+    digest = hashlib.sha256(f"{kind}\0{model_version}\0".encode("utf-8"))
+    for name, data in named_images:
+        digest.update(name.encode("utf-8") + b"\0")
+        digest.update(hashlib.sha256(data).digest())
+    return digest.hexdigest()
+
+
+class Job:
+    """
+    Handle to work running on a JobManager thread. The worker function reports progress
+    through ``add()``; readers poll ``status``, ``progress()`` and ``rows()`` at any time.
+    """
+
+    def __init__(self, job_id, total=None):
+        self.id = job_id
+        self.total = total
+        self.status = RUNNING
+        self.result = None
+        self.error = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self._rows = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self.status != RUNNING
+
+    @property
+    def cancelled(self):
+        """ True once cancel() was called; worker functions should check it and stop early. """
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def add(self, row):
+        with self._lock:
+            self._rows.append(row)
+
+    def rows(self):
+        """ Snapshot of the rows added so far. """
+        with self._lock:
+            return list(self._rows)
+
+    def progress(self):
+        """ Fraction complete in [0, 1], or None when the total is unknown. """
+        if self.done:
+            return 1.0
+        if not self.total:
+            return None
+        with self._lock:
+            return min(len(self._rows) / self.total, 1.0)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        """ Blocks until the job finishes or ``timeout`` seconds pass; returns True if it finished. """
+        return self._done.wait(timeout)
+
+    def _finish(self, status, result=None, error=None):
+        self.result, self.error = result, error
+        self.finished = time.perf_counter()
+        self.status = status
+        self._done.set()
+
+
+class JobManager:
+    """
+    Runs scoring jobs on a small thread pool shared by every session, so the Streamlit
+    script thread only submits work and polls for it.
+
+    Jobs are keyed by id (see make_job_id): submitting an id that is already running or
+    recently finished returns the existing job instead of starting a duplicate, so reruns
+    and repeated clicks reuse the work. The ``keep_finished`` most recent finished jobs
+    are retained for redraws; running jobs are never evicted.
+    """
+
+    def __init__(self, max_workers=4, keep_finished=64):
+        self.keep_finished = keep_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scoring-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def submit(self, job_id, fn, *args, total=None, restart=False):
+        """
+        Starts ``fn(job, *args)`` unless a job with this id exists; with ``restart`` a failed
+        or cancelled job is started again. The return value of ``fn`` becomes ``job.result``;
+        an exception marks the job failed.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not (restart and job.status in (FAILED, CANCELLED)):
+                self._jobs.move_to_end(job_id)
+                return job
+            job = Job(job_id, total)
+            self._jobs[job_id] = job
+            self._evict()
+        self._pool.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job, fn, args):
+        try:
+            result = fn(job, *args)
+        except Exception as err:
+            job._finish(FAILED, error=str(err))
+        else:
+            job._finish(CANCELLED if job.cancelled else DONE, result=result)
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if not job.done)
+            return {"running": running, "finished": len(self._jobs) - running}
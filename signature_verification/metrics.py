@@ -0,0 +1,281 @@
+import bisect
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import ContextDecorator, contextmanager
+
+# --- Instrumentation ---
+#
+# Counters and latency histograms for the scoring and sign-in paths, rendered in the
+# Prometheus text format by render() / start_http_server() and summarised for the
+# admin panel by snapshot(). Modules create their metrics once at import time with
+# counter() / histogram(); asking for an existing name returns the same object, so
+# Streamlit reruns don't duplicate them.
+#
+# Cost per observation is two perf_counter() calls, a bisect and an uncontended lock,
+# about a microsecond, so instrumentation stays on in production. Metrics live in
+# the process that records them: work done in ProcessPool workers (batch and service
+# featurization) is recorded by the parent from the timings the workers return.
+#
+# Span tracing is off unless SIGNATURE_TRACING=1 (or TRACER.enabled is set). When on,
+# every timed block also records a span (trace id, parent, duration, error) into a
+# bounded in-memory buffer, served as JSON at /traces.
+
+DEFAULT_LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """ Monotonic count, optionally split by label values (e.g. ``outcome="success"``). """
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self):
+        """ Returns [(labels dict, value), ...]. """
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(dict(zip(self.label_names, key)), value) for key, value in items]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in self.samples():
+            lines.append(f"{self.name}{_label_text(labels.keys(), labels.values())} {value}")
+        if not self._values and not self.label_names:
+            lines.append(f"{self.name} 0")
+        return "\n".join(lines)
+
+
+class _Timer(ContextDecorator):
+    """ Observes the elapsed milliseconds of a block (or decorated call) into a histogram. """
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def _recreate_cm(self):
+        return _Timer(self.histogram)  # a fresh timer per decorated call, so threads don't share state
+
+    def __enter__(self):
+        self._span = TRACER.start(self.histogram.name) if TRACER.enabled else None
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self._start) * 1000
+        self.histogram.observe(elapsed_ms)
+        if self._span is not None:
+            TRACER.finish(self._span, elapsed_ms, exc)
+        return False
+
+
+class Histogram:
+    """ Cumulative histogram (latencies in ms, batch sizes, ...) rendered in Prometheus text format. """
+
+    def __init__(self, name, help_text, buckets=DEFAULT_LATENCY_BUCKETS_MS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def time(self):
+        """ Context manager / decorator timing a block in ms (and tracing it when tracing is on). """
+        return _Timer(self)
+
+    def quantile(self, q):
+        """ Upper bound of the bucket holding the q-quantile (inf if it falls past the last bucket). """
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return None
+        rank = q * count
+        for bound, cumulative in zip(self.buckets + (float("inf"),), itertools.accumulate(counts)):
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    def render(self):
+        with self._lock:
+            counts, total, count = list(self.counts), self.total, self.count
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for bound, cumulative in zip(self.buckets, itertools.accumulate(counts)):
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{self.name}_sum {total:.3f}")
+        lines.append(f"{self.name}_count {count}")
+        return "\n".join(lines)
+
+
+class MetricsRegistry:
+    """ Named collection of counters and histograms. """
+
+    def __init__(self):
+        self._metrics = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' is already registered as a {type(metric).__name__}.")
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_LATENCY_BUCKETS_MS):
+        return self._get_or_create(Histogram, name, help_text, buckets)
+
+    def render(self):
+        """ All metrics in the Prometheus text exposition format. """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+    def snapshot(self):
+        """ Returns (counter rows, histogram rows) as plain dicts for display. """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        counters, histograms = [], []
+        for metric in metrics:
+            if isinstance(metric, Counter):
+                for labels, value in metric.samples():
+                    name = metric.name + _label_text(labels.keys(), labels.values())
+                    counters.append({"metric": name, "value": value})
+            elif metric.count:
+                histograms.append({"metric": metric.name, "count": metric.count,
+                                   "mean": round(metric.total / metric.count, 3),
+                                   "p50": metric.quantile(0.5), "p95": metric.quantile(0.95)})
+        return counters, histograms
+
+
+REGISTRY = MetricsRegistry()
+
+def counter(name, help_text, labels=()):
+    return REGISTRY.counter(name, help_text, labels)
+
+def histogram(name, help_text, buckets=DEFAULT_LATENCY_BUCKETS_MS):
+    return REGISTRY.histogram(name, help_text, buckets)
+
+
+# --- Tracing ---
+
+class Tracer:
+    """
+    Minimal in-process span recorder. Spans started while another span is open on the
+    same thread (or asyncio task) become its children and share its trace id.
+    """
+
+    def __init__(self, enabled=False, max_spans=1000):
+        self.enabled = enabled
+        self._spans = deque(maxlen=max_spans)
+        self._current = contextvars.ContextVar("signature_span", default=None)
+        self._ids = itertools.count(1)
+
+    def start(self, name, **attributes):
+        parent = self._current.get()
+        span_id = next(self._ids)
+        span = {"name": name, "span_id": span_id,
+                "trace_id": parent["trace_id"] if parent else span_id,
+                "parent_id": parent["span_id"] if parent else None,
+                "start": time.time(), "attributes": attributes}
+        span["_token"] = self._current.set(span)
+        return span
+
+    def finish(self, span, duration_ms, error=None):
+        self._current.reset(span.pop("_token"))
+        span["duration_ms"] = round(duration_ms, 3)
+        if error is not None:
+            span["error"] = repr(error)
+        self._spans.append(span)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """ Records a span around a block that has no histogram of its own. """
+        if not self.enabled:
+            yield None
+            return
+        span = self.start(name, **attributes)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield span
+        except BaseException as err:
+            error = err
+            raise
+        finally:
+            self.finish(span, (time.perf_counter() - start) * 1000, error)
+
+    def recent(self, limit=100):
+        return list(self._spans)[-limit:]
+
+
+TRACER = Tracer(enabled=os.environ.get("SIGNATURE_TRACING", "") not in ("", "0"))
+
+
+# --- Exposition ---
+
+def start_http_server(port, host="127.0.0.1", registry=REGISTRY, tracer=TRACER):
+    """
+    Serves GET /metrics (Prometheus text) and GET /traces (recent spans as JSON) from a
+    daemon thread. Binds to localhost by default; returns the server.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = registry.render().encode(), "text/plain; version=0.0.4"
+            elif self.path.startswith("/traces"):
+                body, content_type = json.dumps(tracer.recent()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
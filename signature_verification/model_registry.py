@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+
+from .features import feature_config, feature_length
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """ Returns the SHA-256 hex digest of a file, read in chunks. """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for the trained classifier.
+
+    The model is loaded once and shared by every caller. ``get()`` only does an
+    ``os.stat`` on the fast path. What is watched depends on how the registry was built:
+
+    - ``ModelRegistry(path)``: a model file. It is re-hashed when its mtime or size
+      changes and reloaded only if the content actually differs. The version is the
+      file's SHA-256.
+    - ``ModelRegistry.for_store(store, pointer)``: a ModelStore pointer file (CURRENT or
+      CANDIDATE). When the pointer changes, the named version is loaded and its manifest's
+      feature configuration checked against this process. The version is the store's
+      version id. With ``fallback`` (a model file path), that file is served until the
+      pointer first appears, so activating a version needs no restart.
+
+    A replacement is fully loaded and validated before it is swapped in with a single
+    reference assignment, so concurrent callers see either the old or the new model,
+    never a mix. If a replacement fails to load, the previous model keeps serving and
+    the error is kept in ``last_error``.
+
+    Loading uses joblib's memory-mapping, so the support-vector arrays live in the
+    OS page cache and are shared by every server process that maps the same file.
+    Copy-on-write mode ("c") is used because libsvm rejects read-only buffers.
+    ``.npz`` files are CompactScorer exports and are read with NumPy instead.
+    """
+
+    def __init__(self, path, mmap_mode="c", n_features=None):
+        self.path = path
+        self.mmap_mode = mmap_mode
+        self.n_features = n_features if n_features is not None else feature_length()
+        self.store = None
+        self.pointer = None
+        self.fallback = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._loaded = (None, None)  # (model, version), swapped as one reference
+        self._stamp = None
+
+    @classmethod
+    def for_store(cls, store, pointer="CURRENT", mmap_mode="c", n_features=None, fallback=None):
+        registry = cls(store.pointer_path(pointer), mmap_mode, n_features)
+        registry.store, registry.pointer = store, pointer
+        if fallback is not None:
+            registry.fallback = cls(fallback, mmap_mode, n_features)
+        return registry
+
+    @property
+    def version(self):
+        """ Version of the currently loaded model, or None before the first load. """
+        return self._loaded[1]
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _validate(self, model, source):
+        if not hasattr(model, "predict") or not hasattr(model, "predict_proba"):
+            raise ValueError(f"'{source}' does not contain a probabilistic classifier.")
+        n_features = getattr(model, "n_features_in_", None)
+        if n_features is not None and n_features != self.n_features:
+            raise ValueError(f"'{source}' expects {n_features} features but the extractor "
+                             f"produces {self.n_features}. Please retrain with `train_model.py`.")
+
+    def _resolve(self):
+        """ Returns (version, model_path) of the model that should be live. """
+        if self.store is None:
+            return file_digest(self.path), self.path
+        version = self.store.read_pointer(self.pointer)
+        if version is None:
+            raise FileNotFoundError(f"No {self.pointer} model set in '{self.store.root}'.")
+        manifest = self.store.manifest(version)
+        if manifest.get("feature_config") != feature_config():
+            raise ValueError(f"Model {version} was trained with different feature/preprocessing "
+                             f"parameters than this server uses.")
+        return version, self.store.model_path(version)
+
+    def _load(self, model_path):
+        if model_path.endswith(".npz"):
+            from .compact import CompactScorer  # plain arrays exported by compact_model.py
+
+            model = CompactScorer.load(model_path)
+        else:
+            import joblib  # deferred: pulls in scikit-learn when the model is unpickled
+
+            model = joblib.load(model_path, mmap_mode=self.mmap_mode)
+        self._validate(model, model_path)
+        return model
+
+    def get_versioned(self):
+        """
+        Returns (model, version) as one consistent snapshot, loading or swapping in a new
+        model if the watched file changed. Raises FileNotFoundError or ValueError only when
+        there is no previously loaded model to keep serving.
+        """
+        if self.fallback is not None and self._loaded[0] is None and not os.path.exists(self.path):
+            return self.fallback.get_versioned()  # no version activated yet
+        stamp = self._file_stamp() if self._loaded[0] is None else self._try_stamp()
+        if stamp == self._stamp:
+            return self._loaded
+
+        with self._lock:
+            if stamp == self._stamp:
+                return self._loaded
+            try:
+                version, model_path = self._resolve()
+                if version != self._loaded[1]:
+                    self._loaded = (self._load(model_path), version)
+                self.last_error = None
+            except (OSError, ValueError) as err:
+                if self._loaded[0] is None:
+                    raise
+                self.last_error = str(err)
+            self._stamp = stamp
+            return self._loaded
+
+    def _try_stamp(self):
+        try:
+            return self._file_stamp()
+        except FileNotFoundError:
+            return self._stamp  # file briefly missing (or pointer cleared): keep serving
+
+    def get(self):
+        """
+        Returns the current model, loading or reloading it if the file changed.
+        Raises FileNotFoundError if the model file is missing and ValueError if it fails validation.
+        """
+        return self.get_versioned()[0]
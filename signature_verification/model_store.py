@@ -0,0 +1,215 @@
+import datetime
+import hashlib
+import itertools
+import json
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import uuid
+
+import numpy as np
+
+from .features import feature_config
+from .inference import score
+
+MODELS_DIR = "models"
+CURRENT = "CURRENT"
+CANDIDATE = "CANDIDATE"
+MODEL_FILE = "model.joblib"
+COMPACT_MODEL_FILE = "model.npz"  # CompactScorer exported by compact_model.py
+MANIFEST_FILE = "manifest.json"
+
+logger = logging.getLogger(__name__)
+
+
+def dataset_digest(dataset_dir, rel_paths, labels):
+    """ SHA-256 over (path, label, file content) of every training image, in order. """
+    digest = hashlib.sha256()
+    for rel_path, label in zip(rel_paths, labels):
+        digest.update(f"{rel_path}\0{int(label)}\0".encode("utf-8"))
+        with open(os.path.join(dataset_dir, rel_path), "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+class ModelStore:
+    """
+    Directory of immutable, versioned model artifacts:
+
+        models/
+          20260101-120000-1a2b3c4d/model.joblib    or model.npz for a CompactScorer
+          20260101-120000-1a2b3c4d/manifest.json   feature config, training-set hash, metrics, params
+          CURRENT                                  version served to users
+          CANDIDATE                                optional version scored in shadow mode
+
+    Versions are written to a temporary folder and renamed into place, and the pointer
+    files are replaced with os.replace, so readers never see a half-written artifact or
+    pointer. ModelRegistry.for_store() watches a pointer and hot-swaps on change.
+    """
+
+    def __init__(self, root=MODELS_DIR):
+        self.root = root
+
+    def model_path(self, version):
+        compact_path = os.path.join(self.root, version, COMPACT_MODEL_FILE)
+        return compact_path if os.path.exists(compact_path) else os.path.join(self.root, version, MODEL_FILE)
+
+    def pointer_path(self, pointer=CURRENT):
+        return os.path.join(self.root, pointer)
+
+    def manifest(self, version):
+        with open(os.path.join(self.root, version, MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def versions(self):
+        """ Returns every stored manifest, oldest first. """
+        if not os.path.isdir(self.root):
+            return []
+        manifests = [self.manifest(name) for name in os.listdir(self.root)
+                     if os.path.exists(os.path.join(self.root, name, MANIFEST_FILE))]
+        return sorted(manifests, key=lambda m: m["created"])
+
+    def publish(self, model_file, manifest):
+        """
+        Copies a saved model file into the store with its manifest and returns the new
+        version id (creation time + content hash, plus a "-2", "-3", ... suffix when the same
+        bytes are published again within the same second). Does not activate it.
+        """
+        from .model_registry import file_digest
+
+        sha256 = file_digest(model_file)
+        created = datetime.datetime.now(datetime.timezone.utc)
+        base_version = f"{created:%Y%m%d-%H%M%S}-{sha256[:8]}"
+        manifest = dict(manifest, created=created.isoformat(), sha256=sha256)
+        manifest.setdefault("feature_config", feature_config())
+
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.root)
+        try:
+            model_name = COMPACT_MODEL_FILE if model_file.endswith(".npz") else MODEL_FILE
+            shutil.copyfile(model_file, os.path.join(staging, model_name))
+            for attempt in itertools.count(1):
+                version = base_version if attempt == 1 else f"{base_version}-{attempt}"
+                with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+                    json.dump(dict(manifest, version=version), f, indent=2)
+                try:
+                    os.rename(staging, os.path.join(self.root, version))  # atomic; fails if the id is taken
+                    break
+                except OSError:
+                    if not os.path.isdir(os.path.join(self.root, version)):
+                        raise
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return version
+
+    def read_pointer(self, pointer=CURRENT):
+        """ Returns the version a pointer names, or None if it isn't set. """
+        try:
+            with open(self.pointer_path(pointer)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_pointer(self, version, pointer=CURRENT):
+        """ Atomically points CURRENT/CANDIDATE at a stored version (None clears the pointer). """
+        if version is None:
+            try:
+                os.remove(self.pointer_path(pointer))
+            except FileNotFoundError:
+                pass
+            return
+        if not os.path.exists(self.model_path(version)):
+            raise FileNotFoundError(f"Model version '{version}' not found in '{self.root}'.")
+        tmp_path = self.pointer_path(f".{pointer}.{uuid.uuid4().hex}")
+        with open(tmp_path, "w") as f:
+            f.write(version + "\n")
+        os.replace(tmp_path, self.pointer_path(pointer))
+
+
+class ShadowScorer:
+    """
+    Scores live requests with a candidate model off the request path.
+
+    ``submit()`` only enqueues the feature vector and the label the user was shown; a
+    background thread scores queued vectors in batches with the model behind
+    ``registry`` (typically the store's CANDIDATE pointer) and counts disagreements.
+    When the queue is full, new vectors are dropped rather than slowing callers down.
+    While the watched pointer is unset, submissions are ignored, so a candidate can be
+    set or cleared without restarting the server.
+    """
+
+    def __init__(self, registry, max_queue=1024, max_batch_size=64, log_every=100):
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.log_every = log_every
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.compared = 0
+        self.disagreements = 0
+        self.dropped = 0
+        self.errors = 0
+        self._confidence_delta = 0.0
+        self._scored_version = None
+        self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+        self._thread.start()
+
+    def submit(self, vector, label, confidence):
+        if not os.path.exists(self.registry.path):
+            return
+        try:
+            self._queue.put_nowait((vector, label, confidence))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            vectors, labels, confidences = zip(*batch)
+            try:
+                candidate, version = self.registry.get_versioned()
+                scored = score(candidate, np.vstack(vectors))
+            except Exception:
+                logger.exception("Shadow scoring failed")
+                with self._lock:
+                    self.errors += len(batch)
+                continue
+            disagreements = int((scored.labels != np.asarray(labels)).sum())
+            delta = float(np.abs(scored.confidences - np.asarray(confidences)).sum())
+            with self._lock:
+                if version != self._scored_version:  # new candidate: start counting afresh
+                    self._scored_version = version
+                    self.compared = self.disagreements = 0
+                    self._confidence_delta = 0.0
+                before = self.compared
+                self.compared += len(batch)
+                self.disagreements += disagreements
+                self._confidence_delta += delta
+                should_log = self.compared // self.log_every > before // self.log_every
+            if should_log:
+                stats = self.stats()
+                logger.info("Shadow model %s: %d compared, %.2f%% disagreement, mean |confidence delta| %.4f",
+                            stats["candidate"], stats["compared"], 100 * stats["disagreement_rate"],
+                            stats["mean_confidence_delta"])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "candidate": self._scored_version,
+                "compared": self.compared,
+                "disagreements": self.disagreements,
+                "disagreement_rate": self.disagreements / self.compared if self.compared else 0.0,
+                "mean_confidence_delta": self._confidence_delta / self.compared if self.compared else 0.0,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "queued": self._queue.qsize(),
+            }
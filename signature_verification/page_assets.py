@@ -0,0 +1,214 @@
+import base64
+import functools
+import mimetypes
+import os
+import re
+
+STATIC_DIR = "static"
+# Streamlit serves files in ./static at this URL prefix when server.enableStaticServing is on.
+STATIC_URL = "app/static"
+WALLPAPER = "wallpaper.jpg"
+
+GOOGLE_FONTS_CSS = ("@import url('https://fonts.googleapis.com/css2?family=Dancing+Script:wght@700"
+                    "&family=Poppins:wght@300;400;600&display=swap');")
+
+# Optional self-hosted font files (static/fonts/<file>) for offline deployments.
+LOCAL_FONTS = [
+    ("Dancing Script", 700, "DancingScript-Bold.woff2"),
+    ("Poppins", 300, "Poppins-Light.woff2"),
+    ("Poppins", 400, "Poppins-Regular.woff2"),
+    ("Poppins", 600, "Poppins-SemiBold.woff2"),
+]
+
+
+def _font_css(font_source, static_dir):
+    """
+    "google" imports the fonts from Google Fonts; "local" declares @font-face rules for
+    whichever LOCAL_FONTS files exist (falling back to system fonts for the rest).
+    """
+    if font_source == "google":
+        return GOOGLE_FONTS_CSS
+    if font_source != "local":
+        raise ValueError(f"Unknown font source '{font_source}'. Use 'google' or 'local'.")
+    rules = []
+    for family, weight, filename in LOCAL_FONTS:
+        if os.path.exists(os.path.join(static_dir, "fonts", filename)):
+            rules.append(f"@font-face {{ font-family: '{family}'; font-weight: {weight}; font-display: swap; "
+                         f"src: url('{STATIC_URL}/fonts/{filename}') format('woff2'); }}")
+    return "\n".join(rules)
+
+def _data_uri(path):
+    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+
+def _minify(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    return "\n".join(line.strip() for line in css.splitlines() if line.strip())
+
+@functools.lru_cache(maxsize=8)
+def page_style(static_serving=True, font_source="google", static_dir=STATIC_DIR):
+    """
+    Builds the page <style> block once per process and configuration.
+
+    With Streamlit static serving enabled the wallpaper is referenced by URL, so the
+    browser downloads and caches it once instead of receiving ~43 KB of base64 inside
+    the CSS on every rerun. Without it, the data URI is still only encoded once.
+    Returns None if the wallpaper is missing.
+    """
+    wallpaper_path = os.path.join(static_dir, WALLPAPER)
+    if not os.path.exists(wallpaper_path):
+        return None
+    background_url = f"{STATIC_URL}/{WALLPAPER}" if static_serving else _data_uri(wallpaper_path)
+    return _minify(style_block(background_url, _font_css(font_source, static_dir)))
+
+def style_block(background_url, font_css):
+    """ The raw (unminified) <style> block for a given background URL and font rules. """
+    return f"""
+    <style>
+    /* Fonts: Dancing Script (Headers) & Poppins (Body) */
+    {font_css}
+
+    /* --- Global Styles --- */
+    .stApp {{
+        background-image: url("{background_url}");
+        background-size: cover;
+        background-position: center;
+        background-attachment: fixed;
+    }}
+
+    /* --- Animations --- */
+    @keyframes slideUpFade {{
+        0% {{
+            opacity: 0;
+            transform: translateY(50px);
+        }}
+        100% {{
+            opacity: 1;
+            transform: translateY(0);
+        }}
+    }}
+
+    @keyframes pulseGlow {{
+        0% {{ box-shadow: 0 0 15px rgba(118, 75, 162, 0.3); }}
+        50% {{ box-shadow: 0 0 25px rgba(118, 75, 162, 0.6); }}
+        100% {{ box-shadow: 0 0 15px rgba(118, 75, 162, 0.3); }}
+    }}
+
+    /* --- Glassmorphism Main Container --- */
+    .main .block-container {{
+        background: rgba(0, 0, 0, 0.65);
+        backdrop-filter: blur(20px);
+        -webkit-backdrop-filter: blur(20px);
+        border-radius: 25px;
+        padding: 3rem !important;
+        /* Neon Glow Border */
+        border: 1px solid rgba(255, 255, 255, 0.1);
+        box-shadow: 0 8px 32px 0 rgba(0, 0, 0, 0.5);
+        max-width: 1100px;
+        margin-top: 2rem;
+        /* Apply Entrance Animation */
+        animation: slideUpFade 1s ease-out forwards;
+    }}
+
+    /* --- Typography --- */
+    h1, h2, h3 {{
+        font-family: 'Dancing Script', cursive !important;
+        font-weight: 700 !important;
+    }}
+    
+    /* Gradient Title */
+    h1 {{ 
+        font-size: 4.5rem !important; 
+        margin-bottom: 0.5rem !important; 
+        background: linear-gradient(to right, #ffffff, #a8c0ff);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        text-shadow: 0px 0px 20px rgba(168, 192, 255, 0.3);
+    }}
+
+    h2 {{ font-size: 2.8rem !important; color: #ffffff !important; }}
+    h3 {{ font-size: 2rem !important; color: #e0e0e0 !important; }}
+
+    p, label, .stMarkdown {{
+        font-family: 'Poppins', sans-serif !important;
+        color: #d1d1d1 !important;
+        font-size: 1.1rem !important;
+        line-height: 1.6;
+    }}
+
+    /* --- Interactive Input Fields --- */
+    .stTextInput > div > div > input {{
+        background-color: rgba(255, 255, 255, 0.9);
+        color: #333 !important;
+        border-radius: 12px;
+        border: 2px solid transparent;
+        padding: 12px 15px;
+        font-size: 1rem;
+        transition: all 0.3s ease;
+    }}
+    
+    /* Focus Effect: Glows and expands slightly */
+    .stTextInput > div > div > input:focus {{
+        border-color: #764ba2;
+        box-shadow: 0 0 15px rgba(118, 75, 162, 0.5);
+        transform: scale(1.02);
+        background-color: #ffffff;
+    }}
+
+    .stTextInput label {{
+        font-weight: 600 !important;
+        color: #ffffff !important;
+        letter-spacing: 0.5px;
+    }}
+
+    /* --- Buttons --- */
+    .stButton > button {{
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white !important;
+        border-radius: 50px;
+        border: none;
+        padding: 0.7rem 2.5rem;
+        font-size: 1.2rem !important;
+        font-weight: 600;
+        box-shadow: 0 4px 15px rgba(0,0,0,0.3);
+        transition: all 0.3s ease;
+        width: 100%;
+        text-transform: uppercase;
+        letter-spacing: 1px;
+    }}
+    
+    .stButton > button:hover {{
+        transform: translateY(-4px) scale(1.02);
+        box-shadow: 0 10px 25px rgba(118, 75, 162, 0.6);
+        background: linear-gradient(135deg, #764ba2 0%, #667eea 100%);
+    }}
+
+    /* --- Tabs --- */
+    .stTabs [data-baseweb="tab-list"] {{
+        gap: 10px;
+        border-bottom: none;
+    }}
+    .stTabs [data-baseweb="tab"] {{
+        background-color: rgba(255,255,255,0.05);
+        border-radius: 30px;
+        color: #aaa;
+        border: 1px solid rgba(255,255,255,0.1);
+        padding: 10px 25px;
+        transition: all 0.3s;
+    }}
+    .stTabs [aria-selected="true"] {{
+        background-color: #764ba2 !important;
+        color: white !important;
+        border: 1px solid #764ba2;
+        font-weight: bold;
+        box-shadow: 0 0 15px rgba(118, 75, 162, 0.4);
+    }}
+    
+    /* --- Sidebar --- */
+    [data-testid="stSidebar"] {{
+        background-color: rgba(15, 15, 20, 0.98);
+        border-right: 1px solid rgba(255,255,255,0.05);
+    }}
+    </style>
+"""
@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from .metrics import counter, histogram
+
+DEFAULT_ROUNDS = 12
+
+HASH_MS = histogram("signature_bcrypt_hash_ms", "bcrypt hash latency including queueing, in ms.")
+VERIFY_MS = histogram("signature_bcrypt_verify_ms", "bcrypt verify latency including queueing, in ms.")
+HASHER_BUSY = counter("signature_hasher_busy_total", "Hash/verify requests rejected because the bcrypt pool was full.")
+
+
+class LoginThrottled(Exception):
+    """ Raised when a username has too many recent failed sign-in attempts. """
+
+    def __init__(self, retry_after):
+        super().__init__(f"Too many failed attempts. Try again in {int(retry_after) + 1} seconds.")
+        self.retry_after = retry_after
+
+
+class HasherBusy(Exception):
+    """ Raised when the hashing pool's queue is full or a job doesn't finish within the timeout. """
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded pool of worker threads.
+
+    bcrypt releases the GIL, so hashes for concurrent sessions run in parallel on the
+    workers instead of serializing on the Streamlit script threads. At most
+    ``max_pending`` jobs may be queued or running; beyond that callers get HasherBusy
+    rather than piling up. A job still waiting after ``timeout`` seconds also raises
+    HasherBusy, but keeps its slot until it actually finishes. ``rounds`` is the cost factor for new hashes; verification always uses
+    the cost stored in the hash itself.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, max_workers=4, max_pending=64, timeout=30.0):
+        self.rounds = rounds
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._pending = threading.BoundedSemaphore(max_pending)
+
+    def _run(self, fn, *args):
+        if not self._pending.acquire(blocking=False):
+            HASHER_BUSY.inc()
+            raise HasherBusy("The server is busy. Please try again.")
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._pending.release()
+            raise
+        # Released when the job finishes, not when the caller gives up waiting for it.
+        future.add_done_callback(lambda _: self._pending.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()  # drops it if still queued; the callback then frees the slot
+            HASHER_BUSY.inc()
+            raise HasherBusy("The server is busy. Please try again.") from None
+
+    def hash(self, password):
+        """ Returns the bcrypt hash (bytes) of a plain-text password. """
+        import bcrypt
+
+        with HASH_MS.time():
+            return self._run(lambda: bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(self.rounds)))
+
+    def verify(self, password, hashed_password):
+        """ Checks a plain-text password against a stored bcrypt hash (str or bytes). """
+        if isinstance(hashed_password, str):
+            hashed_password = hashed_password.encode("utf-8")
+        import bcrypt
+
+        with VERIFY_MS.time():
+            return self._run(bcrypt.checkpw, password.encode("utf-8"), hashed_password)
+
+
+class LoginThrottle:
+    """
+    Per-username sliding-window limit on failed sign-ins.
+
+    After ``max_failures`` failures within ``window`` seconds, further attempts for that
+    username are rejected (before any bcrypt work) until the oldest failure ages out.
+    A successful sign-in clears the user's history. Every ``sweep_every`` recorded
+    failures, usernames whose failures have all aged out are forgotten, so cycling through
+    random usernames can't grow the table without bound.
+    """
+
+    def __init__(self, max_failures=5, window=300.0, sweep_every=1024):
+        self.max_failures = max_failures
+        self.window = window
+        self.sweep_every = sweep_every
+        self._failures = defaultdict(deque)
+        self._recorded = 0
+        self._lock = threading.Lock()
+
+    def _prune(self, failures, now):
+        while failures and failures[0] <= now - self.window:
+            failures.popleft()
+
+    def check(self, username):
+        """ Raises LoginThrottled if username is currently locked out. """
+        now = time.monotonic()
+        with self._lock:
+            failures = self._failures.get(username)
+            if failures is None:
+                return
+            self._prune(failures, now)
+            if not failures:
+                del self._failures[username]
+            elif len(failures) >= self.max_failures:
+                raise LoginThrottled(failures[0] + self.window - now)
+
+    def record_failure(self, username):
+        now = time.monotonic()
+        with self._lock:
+            failures = self._failures[username]
+            self._prune(failures, now)
+            failures.append(now)
+            self._recorded += 1
+            if self._recorded % self.sweep_every == 0:
+                self._sweep(now)
+
+    def _sweep(self, now):
+        for username in [name for name, failures in self._failures.items()
+                         if not failures or failures[-1] <= now - self.window]:
+            del self._failures[username]
+
+    def record_success(self, username):
+        with self._lock:
+            self._failures.pop(username, None)
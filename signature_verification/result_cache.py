@@ -0,0 +1,117 @@
+import hashlib
+import io
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from .metrics import counter
+
+# Everything the app needs to redraw a prediction without recomputing it.
+CachedResult = namedtuple("CachedResult", ["processed_image", "feature_vector", "label", "confidence", "margin"])
+
+
+def make_cache_key(image_bytes, model_version):
+    """ Content-addressed key: SHA-256 of the uploaded bytes plus the model version id. """
+    return f"{hashlib.sha256(image_bytes).hexdigest()}:{model_version}"
+
+def _serialize(result):
+    buffer = io.BytesIO()
+    np.savez(buffer, processed_image=result.processed_image, feature_vector=result.feature_vector,
+             scalars=np.array([result.label, result.confidence, result.margin], dtype=np.float64))
+    return buffer.getvalue()
+
+def _deserialize(payload):
+    with np.load(io.BytesIO(payload)) as data:
+        label, confidence, margin = data["scalars"]
+        return CachedResult(data["processed_image"], data["feature_vector"], int(label), float(confidence), float(margin))
+
+CACHE_LOOKUPS = counter("signature_result_cache_lookups_total", "Result cache lookups by outcome.", labels=("result",))
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of scoring results keyed by make_cache_key().
+
+    When ``spill_path`` is set, entries are also written to a SQLite file so hits survive
+    a restart; memory misses fall back to disk and promote the entry. Every 100 writes the
+    disk store is pruned to ``max_disk_entries`` (oldest first). All methods are thread-safe.
+    """
+
+    def __init__(self, max_entries=256, spill_path=None, max_disk_entries=10000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._disk_writes = 0
+        self._db = None
+        if spill_path:
+            self._db = sqlite3.connect(spill_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, payload BLOB, created REAL)")
+            self._db.commit()
+
+    def get(self, key):
+        """ Returns the CachedResult for key, or None. """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                CACHE_LOOKUPS.inc(result="hit")
+                return result
+            if self._db is not None:
+                row = self._db.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    result = _deserialize(row[0])
+                    self._remember(key, result)
+                    self.disk_hits += 1
+                    CACHE_LOOKUPS.inc(result="disk_hit")
+                    return result
+            self.misses += 1
+            CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+    def put(self, key, result):
+        """ Stores a CachedResult, evicting the least recently used entry if the cache is full. """
+        with self._lock:
+            self._remember(key, result)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO results (key, payload, created) VALUES (?, ?, ?)",
+                                 (key, _serialize(result), time.time()))
+                self._disk_writes += 1
+                if self._disk_writes % 100 == 0:
+                    self._db.execute("DELETE FROM results WHERE key NOT IN "
+                                     "(SELECT key FROM results ORDER BY created DESC LIMIT ?)", (self.max_disk_entries,))
+                self._db.commit()
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """ Drops every cached entry (memory and disk) and resets the counters. """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self):
+        """ Returns a snapshot of the hit/miss counters. """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,212 @@
+import abc
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from .metrics import counter, histogram
+
+DB_QUERY_MS = histogram("signature_db_query_ms", "User database round trip (connection checkout + query) in ms.")
+DB_ACQUIRE_MS = histogram("signature_db_acquire_ms", "Wait for a pooled database connection in ms.")
+DB_ERRORS = counter("signature_db_errors_total", "User database errors.")
+HASH_CACHE_LOOKUPS = counter("signature_password_hash_cache_total", "Password-hash cache lookups by outcome.",
+                             labels=("result",))
+
+
+class UserStoreError(Exception):
+    """ Raised when the user database cannot be reached or a query fails. """
+
+
+class UserStore(abc.ABC):
+    """
+    Base class for the users table (id, username, password_hash).
+
+    Subclasses provide ``_connection()``, a context manager yielding a DB-API connection,
+    and the SQL placeholder style. Password-hash lookups are cached for ``cache_ttl``
+    seconds so repeated sign-in attempts don't hit the database every time.
+    """
+
+    placeholder = "%s"
+    errors = ()
+
+    def __init__(self, cache_ttl=30.0):
+        self.cache_ttl = cache_ttl
+        self._hash_cache = {}
+        self._cache_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _connection(self):
+        """ Context manager yielding a DB-API connection for one query or transaction. """
+
+    def _cursor(self, conn):
+        return conn.cursor()
+
+    def _sql(self, query):
+        return query.replace("%s", self.placeholder)
+
+    def _query_one(self, query, params):
+        try:
+            with DB_QUERY_MS.time(), self._connection() as conn:
+                cursor = self._cursor(conn)
+                try:
+                    cursor.execute(self._sql(query), params)
+                    return cursor.fetchone()
+                finally:
+                    cursor.close()
+        except self.errors as err:
+            DB_ERRORS.inc()
+            raise UserStoreError(str(err)) from err
+
+    def get_password_hash(self, username):
+        """ Returns the stored bcrypt hash for username, or None if the user doesn't exist. """
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._hash_cache.get(username)
+            if cached is not None and cached[1] > now:
+                HASH_CACHE_LOOKUPS.inc(result="hit")
+                return cached[0]
+        HASH_CACHE_LOOKUPS.inc(result="miss")
+        row = self._query_one("SELECT password_hash FROM users WHERE username = %s", (username,))
+        if row is None:
+            return None
+        with self._cache_lock:
+            self._hash_cache[username] = (row[0], now + self.cache_ttl)
+        return row[0]
+
+    def user_exists(self, username):
+        return self._query_one("SELECT username FROM users WHERE username = %s", (username,)) is not None
+
+    def create_user(self, username, password_hash):
+        """ Inserts a user. Returns False if the username is already taken. """
+        if isinstance(password_hash, bytes):
+            password_hash = password_hash.decode("utf-8")
+        try:
+            with DB_QUERY_MS.time(), self._connection() as conn:
+                cursor = self._cursor(conn)
+                try:
+                    cursor.execute(self._sql("SELECT username FROM users WHERE username = %s"), (username,))
+                    if cursor.fetchone():
+                        return False
+                    cursor.execute(self._sql("INSERT INTO users (username, password_hash) VALUES (%s, %s)"),
+                                   (username, password_hash))
+                    conn.commit()
+                    return True
+                finally:
+                    cursor.close()
+        except self.errors as err:
+            DB_ERRORS.inc()
+            raise UserStoreError(str(err)) from err
+        finally:
+            self.invalidate(username)
+
+    def invalidate(self, username=None):
+        """ Drops cached hashes for one user, or for everyone. """
+        with self._cache_lock:
+            if username is None:
+                self._hash_cache.clear()
+            else:
+                self._hash_cache.pop(username, None)
+
+
+class MySQLUserStore(UserStore):
+    """
+    MySQL backend using a size-bounded mysql.connector connection pool.
+
+    Callers beyond ``pool_size`` wait up to ``acquire_timeout`` seconds for a free
+    connection instead of failing with "pool exhausted". Every checkout is pinged and
+    transparently reconnected if the server dropped it.
+    """
+
+    def __init__(self, host, user, password, database, port=3306, pool_size=5,
+                 acquire_timeout=10.0, pool_name="signature_app", cache_ttl=30.0):
+        super().__init__(cache_ttl)
+        import mysql.connector
+        from mysql.connector import pooling
+
+        self.errors = (mysql.connector.Error,)
+        self.acquire_timeout = acquire_timeout
+        self._slots = threading.BoundedSemaphore(pool_size)
+        try:
+            self._pool = pooling.MySQLConnectionPool(
+                pool_name=pool_name, pool_size=pool_size, pool_reset_session=True,
+                host=host, user=user, password=password, database=database, port=port)
+        except mysql.connector.Error as err:
+            DB_ERRORS.inc()
+            raise UserStoreError(str(err)) from err
+
+    def _cursor(self, conn):
+        return conn.cursor(buffered=True)
+
+    @contextmanager
+    def _connection(self):
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            DB_ERRORS.inc()
+            raise UserStoreError("Timed out waiting for a free database connection.")
+        try:
+            conn = self._pool.get_connection()
+            try:
+                conn.ping(reconnect=True, attempts=2, delay=0)
+                DB_ACQUIRE_MS.observe((time.perf_counter() - start) * 1000)
+                yield conn
+            finally:
+                conn.close()  # returns the connection to the pool
+        finally:
+            self._slots.release()
+
+
+class SQLiteUserStore(UserStore):
+    """
+    SQLite backend for tests and single-machine deployments. Creates the table if needed.
+
+    One connection is shared by every thread and serialized by a lock (SQLite allows a
+    single writer anyway), so Streamlit's per-session script threads don't each open a
+    connection that is never closed. close() releases it.
+    """
+
+    placeholder = "?"
+    errors = (sqlite3.Error,)
+
+    def __init__(self, path="users.sqlite", cache_ttl=30.0):
+        super().__init__(cache_ttl)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS users ("
+                         "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "username VARCHAR(100) NOT NULL UNIQUE, "
+                         "password_hash VARCHAR(255) NOT NULL)")
+            conn.commit()
+
+    @contextmanager
+    def _connection(self):
+        start = time.perf_counter()
+        with self._lock:
+            DB_ACQUIRE_MS.observe((time.perf_counter() - start) * 1000)
+            yield self._conn
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_user_store(db_config):
+    """
+    Builds the store described by the [database] section of secrets.toml.
+    ``backend`` is "mysql" (default) or "sqlite".
+    """
+    backend = db_config.get("backend", "mysql")
+    if backend == "sqlite":
+        return SQLiteUserStore(db_config.get("path", "users.sqlite"), cache_ttl=db_config.get("cache_ttl", 30.0))
+    if backend == "mysql":
+        return MySQLUserStore(
+            host=db_config["host"],
+            user=db_config["user"],
+            password=db_config["password"],
+            database=db_config["db_name"],
+            port=db_config["port"],
+            pool_size=db_config.get("pool_size", 5),
+            cache_ttl=db_config.get("cache_ttl", 30.0),
+        )
+    raise ValueError(f"Unknown database backend '{backend}'. Use 'mysql' or 'sqlite'.")
@@ -0,0 +1,74 @@
+import pytest
+
+from signature_verification import UserStoreError, create_user_store
+from signature_verification.user_store import HASH_CACHE_LOOKUPS, SQLiteUserStore
+
+HASH = "$2b$12$abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = create_user_store({"backend": "sqlite", "path": str(tmp_path / "users.sqlite"), "cache_ttl": 60})
+    yield store
+    store.close()
+
+
+def test_create_user_store_builds_sqlite_backend(store):
+    assert isinstance(store, SQLiteUserStore)
+    assert store.cache_ttl == 60
+
+
+def test_create_and_duplicate(store):
+    assert store.create_user("alice", HASH.encode("utf-8"))
+    assert not store.create_user("alice", "$2b$12$other")
+    assert store.user_exists("alice")
+    assert not store.user_exists("bob")
+    assert store.get_password_hash("alice") == HASH
+
+
+def test_unknown_user_has_no_hash(store):
+    assert store.get_password_hash("nobody") is None
+
+
+def test_password_hash_is_cached(store):
+    store.create_user("alice", HASH)
+    hits = HASH_CACHE_LOOKUPS.value(result="hit")
+    assert store.get_password_hash("alice") == HASH
+    assert HASH_CACHE_LOOKUPS.value(result="hit") == hits
+    with store._connection() as conn:  # a cached hash survives a change behind the store's back
+        conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", ("$2b$12$changed", "alice"))
+        conn.commit()
+    assert store.get_password_hash("alice") == HASH
+    assert HASH_CACHE_LOOKUPS.value(result="hit") == hits + 1
+
+
+@pytest.mark.parametrize("username", ["alice", None])
+def test_invalidate_drops_cached_hash(store, username):
+    store.create_user("alice", HASH)
+    store.get_password_hash("alice")
+    with store._connection() as conn:
+        conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", ("$2b$12$changed", "alice"))
+        conn.commit()
+    store.invalidate(username)
+    assert store.get_password_hash("alice") == "$2b$12$changed"
+
+
+def test_create_user_invalidates_cached_miss(store):
+    assert store.get_password_hash("carol") is None
+    store.create_user("carol", HASH)
+    assert store.get_password_hash("carol") == HASH
+
+
+def test_data_persists_after_close(tmp_path):
+    config = {"backend": "sqlite", "path": str(tmp_path / "users.sqlite")}
+    store = create_user_store(config)
+    store.create_user("alice", HASH)
+    store.close()
+    with pytest.raises(UserStoreError):
+        store.user_exists("alice")
+
+    reopened = create_user_store(config)
+    try:
+        assert reopened.user_exists("alice")
+    finally:
+        reopened.close()
@@ -1,104 +1,331 @@
-# app.py (Dynamic UI Version)
+# train_model.py (Training Pipeline)
+#
+#   python train_model.py                                  # writes signature_model.joblib
+#   python train_model.py --store models --activate        # publishes a new version and serves it
+#   python train_model.py --store models --candidate       # publishes it for shadow scoring first
+#   python train_model.py --augment 2                      # adds 2 augmented copies of each training image
 
-import streamlit as st
-import cv2
-import numpy as np
+import argparse
+import hashlib
+import itertools
+import json
 import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import joblib
-from skimage.feature import hog, local_binary_pattern
-
-# --- Helper Functions (No changes needed here) ---
-
-def preprocess_single_image(image_bytes, image_size=(256, 128)):
-    """ Preprocesses a single image from bytes for prediction. """
-    nparr = np.frombuffer(image_bytes, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
-    if img is not None:
-        resized_img = cv2.resize(img, image_size)
-        _, binarized_img = cv2.threshold(resized_img, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-        return binarized_img, cv2.resize(img, (400, 200)) # Return original resized for display
-    return None, None
-
-def extract_single_feature(image):
-    """ Extracts features from a single preprocessed image. """
-    hog_features = hog(image, orientations=9, pixels_per_cell=(8, 8),
-                       cells_per_block=(2, 2), block_norm='L2-Hys')
-    lbp = local_binary_pattern(image, P=24, R=8, method="uniform")
-    (lbp_hist, _) = np.histogram(lbp.ravel(), bins=np.arange(0, 27), range=(0, 26))
-    lbp_hist = lbp_hist.astype("float")
-    lbp_hist /= (lbp_hist.sum() + 1e-7)
-    combined_features = np.hstack([hog_features, lbp_hist])
-    return combined_features.reshape(1, -1)
-
-# --- Streamlit Web Application Interface ---
-
-# Set page configuration
-st.set_page_config(page_title="Signature Forgery Detection", layout="wide")
-
-# --- Sidebar ---
-with st.sidebar:
-    st.title("About the App")
-    st.write("""
-        This application uses a **Support Vector Machine (SVM)** model to distinguish between genuine and forged signatures.
-        
-        The model was trained on the CEDAR dataset and uses a combination of **HOG (Histogram of Oriented Gradients)** and **LBP (Local Binary Patterns)** features to analyze the signature's texture and shape.
-    """)
-    st.info("Upload an image to get started!")
-    st.markdown("---")
-    st.header("Model Details")
-    st.write("**Model:** Support Vector Machine (SVM)")
-    st.write("**Features:** HOG + LBP")
-    st.write("**Dataset:** CEDAR (subset)")
-
-
-# --- Main Page ---
-st.title("✍️ Signature Forgery Detection")
-st.write("Upload a signature image and the model will predict if it's Genuine or Forged.")
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer
+from sklearn.random_projection import SparseRandomProjection
+from sklearn.svm import SVC
+
+from signature_verification import (CANDIDATE, CURRENT, FEATURE_DTYPE, FEATURE_ENGINES, PREPROCESS_MODE,
+                                    PREPROCESS_MODES, ModelStore, dataset_digest, extract_single_feature,
+                                    feature_config, iter_augmented, preprocess_single_image)
 
 MODEL_FILENAME = "signature_model.joblib"
+DATASET_DIR = "dataset"
+CACHE_DIR = "feature_cache"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+PROJECTIONS = ("none", "pca", "random")
+
+# Sub-folder name -> class label (1 = Genuine, 0 = Forged, as expected by app.py)
+CLASS_FOLDERS = {"real": 1, "forge": 0}
+
+
+# --- Dataset Discovery ---
+
+def list_dataset(dataset_dir=DATASET_DIR):
+    """ Returns a sorted list of (relative_path, label) pairs for every image in the dataset. """
+    items = []
+    for folder, label in CLASS_FOLDERS.items():
+        folder_path = os.path.join(dataset_dir, folder)
+        if not os.path.isdir(folder_path):
+            raise FileNotFoundError(f"Dataset folder '{folder_path}' not found.")
+        for name in sorted(os.listdir(folder_path)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                items.append((os.path.join(folder, name), label))
+    return items
+
+def _file_key(dataset_dir, rel_path):
+    """ Identifies a file version by path, size and modification time. """
+    stat = os.stat(os.path.join(dataset_dir, rel_path))
+    return [rel_path, stat.st_size, stat.st_mtime_ns]
+
+def _featurize_file(path, engine=None, preprocess=None, hog_params=None, lbp_params=None):
+    """ Worker: decodes, preprocesses and featurizes one image file. Returns None on decode failure. """
+    with open(path, "rb") as f:
+        return _featurize_image(f.read(), engine, preprocess, hog_params, lbp_params)
+
+def _featurize_image(image_bytes, engine=None, preprocess=None, hog_params=None, lbp_params=None):
+    """ Worker: preprocesses and featurizes one encoded image. Returns None on decode failure. """
+    processed_image, _ = preprocess_single_image(image_bytes, mode=preprocess)
+    if processed_image is None:
+        return None
+    features = extract_single_feature(processed_image, engine=engine, hog_params=hog_params, lbp_params=lbp_params)
+    return features[0].astype(FEATURE_DTYPE)
+
+
+# --- Feature Cache ---
+
+def _load_manifest(cache_dir):
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    if not os.path.exists(manifest_path) or not os.path.exists(os.path.join(cache_dir, "features.npy")):
+        return None
+    with open(manifest_path) as f:
+        return json.load(f)
+
+def build_feature_matrix(dataset_dir=DATASET_DIR, cache_dir=CACHE_DIR, workers=None, engine=None, preprocess=None,
+                         hog_params=None, lbp_params=None):
+    """
+    Returns (X, y, paths) for the whole dataset.
+
+    Features are stored as a memory-mapped ``features.npy`` plus a ``manifest.json``
+    describing the feature configuration and the exact file versions each row came from.
+    Only files that are new or changed since the last run are decoded and featurized;
+    everything else is copied from the previous cache. Non-default preprocessing modes
+    are cached in their own sub-folder, so switching modes doesn't discard the other cache;
+    so are HOG/LBP overrides, one sub-folder per parameter set.
+    """
+    preprocess = preprocess or PREPROCESS_MODE
+    config = feature_config(preprocess, hog_params, lbp_params)
+    if preprocess != "resize":
+        cache_dir = os.path.join(cache_dir, preprocess)
+    if config != feature_config(preprocess):
+        config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+        cache_dir = os.path.join(cache_dir, f"params-{config_hash[:12]}")
+    items = list_dataset(dataset_dir)
+    keys = [_file_key(dataset_dir, rel_path) for rel_path, _ in items]
+
+    manifest = _load_manifest(cache_dir)
+    old_rows, known_failed, old_features = {}, set(), None
+    if manifest is not None and manifest.get("feature_config") == config:
+        old_features = np.load(os.path.join(cache_dir, "features.npy"), mmap_mode="r")
+        old_rows = {tuple(entry["key"]): i for i, entry in enumerate(manifest["files"])}
+        known_failed = {tuple(key) for key in manifest["failed"]}
+
+    missing = [i for i, key in enumerate(keys) if tuple(key) not in old_rows and tuple(key) not in known_failed]
+    failed = [key for key in keys if tuple(key) in known_failed]
+    if old_features is not None and not missing and [key for key in keys if tuple(key) in old_rows] == [e["key"] for e in manifest["files"]]:
+        print(f"Feature cache hit: {len(old_rows)} images loaded from '{cache_dir}'.")
+        return old_features, np.array(manifest["labels"]), [entry["key"][0] for entry in manifest["files"]]
+
+    print(f"Featurizing {len(missing)} of {len(items)} images ({len(items) - len(missing)} cached)...")
+    start = time.perf_counter()
+    new_vectors = {}
+    if missing:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            paths = [os.path.join(dataset_dir, items[i][0]) for i in missing]
+            featurize = partial(_featurize_file, engine=engine, preprocess=preprocess,
+                                hog_params=hog_params, lbp_params=lbp_params)
+            new_vectors = dict(zip(missing, pool.map(featurize, paths, chunksize=16)))
+    print(f"Featurization finished in {time.perf_counter() - start:.1f}s.")
+
+    for i, vec in new_vectors.items():
+        if vec is None:
+            print(f"Warning: could not decode '{items[i][0]}', skipping.")
+            failed.append(keys[i])
+    failed_set = {tuple(key) for key in failed}
+    kept = [i for i in range(len(items)) if tuple(keys[i]) not in failed_set]
+    if not kept:
+        raise ValueError(f"No decodable images found in '{dataset_dir}'.")
+
+    if old_features is not None:
+        n_features = old_features.shape[1]
+    else:
+        n_features = next(vec.shape[0] for vec in new_vectors.values() if vec is not None)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = os.path.join(cache_dir, "features.tmp.npy")
+    features = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=FEATURE_DTYPE, shape=(len(kept), n_features))
+    for row, i in enumerate(kept):
+        if i in new_vectors:
+            features[row] = new_vectors[i]
+        else:
+            features[row] = old_features[old_rows[tuple(keys[i])]]
+    features.flush()
+    del features, old_features
+
+    manifest = {
+        "feature_config": config,
+        "files": [{"key": keys[i]} for i in kept],
+        "labels": [items[i][1] for i in kept],
+        "failed": failed,
+    }
+    os.replace(tmp_path, os.path.join(cache_dir, "features.npy"))
+    with open(os.path.join(cache_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+    X = np.load(os.path.join(cache_dir, "features.npy"), mmap_mode="r")
+    return X, np.array(manifest["labels"]), [keys[i][0] for i in kept]
+
+
+# --- Augmentation ---
+
+def augment_features(dataset_dir, paths, labels, copies, indices, seed=42, workers=None, engine=None,
+                     preprocess=None, chunk_size=256):
+    """
+    Returns (X, y) for ``copies`` augmented variants of each image in ``indices`` (rows of
+    ``paths`` / ``labels``), generated by iter_augmented and featurized in a process pool.
+    Nothing is cached or written to disk; images are generated ``chunk_size`` at a time
+    so large scans don't pile up in memory.
+    """
+    sources = []
+    for i in indices:
+        with open(os.path.join(dataset_dir, paths[i]), "rb") as f:
+            sources.append((paths[i], int(labels[i]), f.read()))
+    stream = iter_augmented(sources, copies * len(sources), seed=seed)
+    featurize = partial(_featurize_image, engine=engine, preprocess=preprocess)
+
+    print(f"Featurizing {copies * len(sources)} augmented training images ({copies} per image)...")
+    start = time.perf_counter()
+    vectors, augmented_labels = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            chunk = list(itertools.islice(stream, chunk_size))
+            if not chunk:
+                break
+            for (_, label, _), vec in zip(chunk, pool.map(featurize, [data for _, _, data in chunk], chunksize=16)):
+                if vec is not None:
+                    vectors.append(vec)
+                    augmented_labels.append(label)
+    print(f"Augmentation finished in {time.perf_counter() - start:.1f}s.")
+    return np.stack(vectors), np.array(augmented_labels)
+
+
+# --- Training ---
+
+def make_projection(kind="none", n_components=256, seed=42):
+    """
+    Returns the pipeline steps placed in front of the SVM: a float32 cast and, for
+    ``kind`` "pca" or "random", a projection down to ``n_components`` dimensions.
+    """
+    steps = [("float32", FunctionTransformer(np.asarray, kw_args={"dtype": np.float32}))]
+    if kind == "pca":
+        steps.append(("project", PCA(n_components=n_components, svd_solver="randomized", random_state=seed)))
+    elif kind == "random":
+        steps.append(("project", SparseRandomProjection(n_components=n_components, dense_output=True, random_state=seed)))
+    elif kind != "none":
+        raise ValueError(f"Unknown projection '{kind}'. Use one of {PROJECTIONS}.")
+    return steps
+
+def train(X, y, C=1.0, gamma="scale", kernel="rbf", test_size=0.2, seed=42, projection="none", n_components=256,
+          augment=None):
+    """
+    Fits the SVM on a stratified split, prints hold-out metrics and returns (model, metrics).
+    With a projection the saved model is a Pipeline (cast -> projection -> SVM).
+    ``augment(train_indices)`` may return extra (X, y) rows that are added to the training
+    split only, so augmented copies of hold-out images never leak into training.
+    """
+    train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=test_size, random_state=seed, stratify=y)
+    X_train, X_test, y_train, y_test = X[train_idx], X[test_idx], y[train_idx], y[test_idx]
+    augmented = 0
+    if augment is not None:
+        X_extra, y_extra = augment(train_idx)
+        X_train, y_train = np.concatenate([X_train, X_extra]), np.concatenate([y_train, y_extra])
+        augmented = len(y_extra)
+    svm = SVC(kernel=kernel, C=C, gamma=gamma, probability=True, random_state=seed)
+    model = svm if projection == "none" else Pipeline(make_projection(projection, n_components, seed) + [("svm", svm)])
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+    print(f"Training finished in {fit_s:.1f}s "
+          f"({len(y_train)} samples, {svm.support_vectors_.shape[0]} support vectors "
+          f"of {svm.support_vectors_.shape[1]} features).")
+
+    y_pred = model.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred)
+    print(f"Hold-out accuracy: {accuracy:.4f}")
+    print(classification_report(y_test, y_pred, target_names=["Forged", "Genuine"]))
+    metrics = {
+        "holdout_accuracy": float(accuracy),
+        "train_samples": len(y_train),
+        "augmented_samples": augmented,
+        "test_samples": len(y_test),
+        "support_vectors": int(svm.support_vectors_.shape[0]),
+        "fit_seconds": round(fit_s, 2),
+    }
+    return model, metrics
+
+def publish(model, store_dir, manifest, pointer=None):
+    """ Saves the model into a ModelStore as a new version, optionally pointing CURRENT/CANDIDATE at it. """
+    store = ModelStore(store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=store_dir, prefix=".build-") as tmp_dir:
+        model_file = os.path.join(tmp_dir, "model.joblib")
+        joblib.dump(model, model_file)
+        version = store.publish(model_file, manifest)
+    if pointer is not None:
+        store.set_pointer(version, pointer)
+    return version
+
+def _parse_gamma(value):
+    return value if value in ("scale", "auto") else float(value)
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the signature forgery SVM and save it for app.py.")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="folder containing real/ and forge/ sub-folders")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="where the extracted feature matrix is cached")
+    parser.add_argument("--output", default=MODEL_FILENAME, help="path of the saved model")
+    parser.add_argument("--workers", type=int, default=None, help="featurization processes (default: all cores)")
+    parser.add_argument("--engine", choices=FEATURE_ENGINES, default=None,
+                        help="feature extraction engine (default: $SIGNATURE_FEATURE_ENGINE or skimage)")
+    parser.add_argument("--preprocess", choices=PREPROCESS_MODES, default=None,
+                        help="preprocessing mode (default: $SIGNATURE_PREPROCESS_MODE or resize); "
+                             "serve the model with the same SIGNATURE_PREPROCESS_MODE")
+    parser.add_argument("--C", type=float, default=1.0)
+    parser.add_argument("--gamma", type=_parse_gamma, default="scale")
+    parser.add_argument("--kernel", default="rbf")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--projection", choices=PROJECTIONS, default="none",
+                        help="reduce features before the SVM (see benchmarks/bench_projection.py)")
+    parser.add_argument("--components", type=int, default=256, help="output dimensions of the projection")
+    parser.add_argument("--augment", type=int, default=0, metavar="COPIES",
+                        help="add COPIES augmented variants of each training image (see augment_dataset.py)")
+    parser.add_argument("--store", default=None,
+                        help="publish a new version into this model store (see manage_models.py) instead of --output")
+    pointer = parser.add_mutually_exclusive_group()
+    pointer.add_argument("--activate", action="store_true", help="with --store: serve the new version (CURRENT)")
+    pointer.add_argument("--candidate", action="store_true", help="with --store: shadow-score the new version (CANDIDATE)")
+    args = parser.parse_args()
+    if (args.activate or args.candidate) and not args.store:
+        parser.error("--activate and --candidate need --store.")
+
+    X, y, paths = build_feature_matrix(args.dataset, args.cache_dir, args.workers, args.engine, args.preprocess)
+    print(f"Feature matrix: {X.shape[0]} images x {X.shape[1]} features "
+          f"({int(y.sum())} genuine, {int(len(y) - y.sum())} forged).")
+
+    augment = None
+    if args.augment:
+        augment = partial(augment_features, args.dataset, paths, y, args.augment, seed=args.seed,
+                          workers=args.workers, engine=args.engine, preprocess=args.preprocess)
+    model, metrics = train(X, y, C=args.C, gamma=args.gamma, kernel=args.kernel,
+                           test_size=args.test_size, seed=args.seed,
+                           projection=args.projection, n_components=args.components, augment=augment)
+    if args.store is None:
+        joblib.dump(model, args.output)
+        print(f"Model saved to '{args.output}'.")
+        return
+
+    manifest = {
+        "feature_config": feature_config(args.preprocess),
+        "training_set": {"images": len(paths), "sha256": dataset_digest(args.dataset, paths, y)},
+        "metrics": metrics,
+        "params": {"C": args.C, "gamma": args.gamma, "kernel": args.kernel, "test_size": args.test_size,
+                   "seed": args.seed, "projection": args.projection, "components": args.components,
+                   "augment": args.augment},
+    }
+    pointer = CURRENT if args.activate else CANDIDATE if args.candidate else None
+    version = publish(model, args.store, manifest, pointer)
+    print(f"Model published to '{args.store}' as version {version}" + (f" ({pointer})." if pointer else "."))
 
-if not os.path.exists(MODEL_FILENAME):
-    st.error(f"Error: Model file '{MODEL_FILENAME}' not found! Please run `train_model.py` to create it.")
-else:
-    model = joblib.load(MODEL_FILENAME)
-    
-    uploaded_file = st.file_uploader("Choose a signature image...", type=["png", "jpg", "jpeg"], label_visibility="collapsed")
-
-    if uploaded_file is not None:
-        image_bytes = uploaded_file.getvalue()
-        
-        # Create columns for a side-by-side view
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Uploaded Signature")
-            st.image(image_bytes, use_container_width=True)
-        
-        with col2:
-            st.subheader("Prediction Analysis")
-            with st.spinner('Analyzing...'):
-                processed_image, display_image = preprocess_single_image(image_bytes)
-                
-                if processed_image is not None:
-                    feature_vector = extract_single_feature(processed_image)
-                    prediction = model.predict(feature_vector)
-                    probabilities = model.predict_proba(feature_vector)
-                    
-                    if prediction[0] == 1:
-                        result = "Genuine"
-                        confidence = probabilities[0][1] * 100
-                        st.success(f"**Prediction: {result}**")
-                    else:
-                        result = "Forged"
-                        confidence = probabilities[0][0] * 100
-                        st.error(f"**Prediction: {result}**")
-                    
-                    # Display confidence with st.metric for a nicer look
-                    st.metric(label="Confidence Score", value=f"{confidence:.2f}%")
-                    st.progress(int(confidence))
-
-                    # Expander to show what the model "sees"
-                    with st.expander("Show Preprocessed Image"):
-                        st.image(processed_image, caption="Binarized & Resized Image (Model Input)", use_container_width=True)
-                else:
-                    st.error("Could not process the uploaded image.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
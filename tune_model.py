@@ -0,0 +1,259 @@
+# tune_model.py (Hyperparameter Search)
+#
+# Searches HOG/LBP feature settings and SVM hyperparameters with cross-validation
+# grouped by claimed writer: every fold holds out all genuine signatures and
+# forgeries of whole writers (parsed from the dataset file names). Forgers are also
+# writers in the dataset, so a forger's own hand can still appear in another fold's
+# training data; the CV scores are therefore somewhat optimistic (see writer_groups).
+#
+# Each feature setting is extracted once and cached by build_feature_matrix() under
+# its own folder, so re-running or widening the search only featurizes new settings.
+# The SVM search (successive halving by default, or an exhaustive grid) runs its
+# fits across all cores. The top candidates are then refit on the whole dataset and
+# timed one image at a time, giving a leaderboard of accuracy against per-image
+# latency; the best candidate within --max-latency-ms is trained and saved.
+#
+#   python tune_model.py                                          # C/gamma for the current features
+#   python tune_model.py --orientations 9 12 --cell 8 16 --lbp 24:8 8:1
+#   python tune_model.py --max-latency-ms 15 --store models --candidate
+
+import argparse
+import json
+import os
+import statistics
+import time
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingGridSearchCV)
+from sklearn.model_selection import GridSearchCV, GroupKFold, HalvingGridSearchCV
+from sklearn.svm import SVC
+
+from signature_verification import (CANDIDATE, CURRENT, FEATURE_ENGINES, HOG_PARAMS, LBP_PARAMS, PREPROCESS_MODES,
+                                    dataset_digest, feature_config, writer_id_from_filename)
+from train_model import CACHE_DIR, DATASET_DIR, _featurize_file, build_feature_matrix, publish, train
+
+LEADERBOARD_FILE = "tune_leaderboard.json"
+TUNED_MODEL_FILENAME = "tuned_model.joblib"
+
+
+# --- Search Space ---
+
+def parse_lbp(text):
+    points, _, radius = text.partition(":")
+    return int(points), int(radius)
+
+def feature_grid(orientations, cells, lbps):
+    """
+    Returns the (hog_params, lbp_params) overrides to evaluate. Settings equal to the
+    defaults in features.py are None, so they reuse the main feature cache and the fast engine.
+    """
+    grid = []
+    for n_orientations in orientations:
+        for cell in cells:
+            hog_params = {"orientations": n_orientations, "pixels_per_cell": (cell, cell)}
+            if all(HOG_PARAMS[k] == v for k, v in hog_params.items()):
+                hog_params = None
+            for points, radius in lbps:
+                lbp_params = {"P": points, "R": radius}
+                if all(LBP_PARAMS[k] == v for k, v in lbp_params.items()):
+                    lbp_params = None
+                if (hog_params, lbp_params) not in grid:
+                    grid.append((hog_params, lbp_params))
+    return grid
+
+def describe_features(hog_params, lbp_params):
+    hog_params = {**HOG_PARAMS, **(hog_params or {})}
+    lbp_params = {**LBP_PARAMS, **(lbp_params or {})}
+    return (f"hog {hog_params['orientations']}o/{hog_params['pixels_per_cell'][0]}px "
+            f"lbp {lbp_params['P']}:{lbp_params['R']}")
+
+def writer_groups(paths):
+    """
+    CV group of each image: the writer whose signature it claims to be (ZZZ in XXXYYZZZ;
+    the file itself if unparseable). This is not fully writer-disjoint: forgery XXXYYZZZ
+    is in XXX's hand, and XXX's own signatures sit in another group. Joining forger and
+    victim instead links this dataset's writers into ~4 groups (too few for 5 folds),
+    and purging shared hands from each training fold discards over half of it.
+    """
+    return np.array([writer_id_from_filename(path) or path for path in paths])
+
+def svm_grid(X, Cs, gamma_factors):
+    """ C values as given; gamma as multiples of sklearn's "scale" value for this feature matrix. """
+    gamma_scale = 1.0 / (X.shape[1] * float(np.asarray(X, dtype=np.float64).var()))
+    return {"C": list(Cs), "gamma": [factor * gamma_scale for factor in gamma_factors]}
+
+
+# --- Search ---
+
+def search(X, y, groups, param_grid, method="halving", folds=5, seed=42, n_jobs=-1):
+    """
+    Cross-validates every C/gamma pair on folds grouped by claimed writer. Probability calibration
+    is off during the search: Platt scaling fits five extra SVMs per candidate and does
+    not change which one classifies best.
+    """
+    cv = GroupKFold(n_splits=folds)
+    svm = SVC(kernel="rbf")
+    if method == "halving":
+        # Each round keeps the best third of the candidates and triples their samples.
+        min_resources = min(len(y), max(len(y) // 9, 30 * folds))
+        searcher = HalvingGridSearchCV(svm, param_grid, cv=cv, factor=3, min_resources=min_resources,
+                                       refit=False, random_state=seed, n_jobs=n_jobs)
+    else:
+        searcher = GridSearchCV(svm, param_grid, cv=cv, refit=False, n_jobs=n_jobs)
+    searcher.fit(X, y, groups=groups)
+    return searcher
+
+def candidates(searcher):
+    """
+    Candidates evaluated in the search's final round, best first. Successive halving
+    scores earlier rounds on fewer samples, so those scores aren't comparable and the
+    candidates eliminated there are left out (an exhaustive grid has a single round).
+    """
+    results = searcher.cv_results_
+    rounds = results.get("iter", np.zeros(len(results["params"]), dtype=int))
+    n_samples = results.get("n_resources", np.full(len(results["params"]), -1))
+    final = [i for i in range(len(results["params"])) if rounds[i] == rounds.max()]
+    rows = [{
+        "C": float(results["params"][i]["C"]),
+        "gamma": float(results["params"][i]["gamma"]),
+        "cv_accuracy": float(results["mean_test_score"][i]),
+        "cv_std": float(results["std_test_score"][i]),
+        "rounds": int(rounds[i]) + 1,
+        "cv_samples": int(n_samples[i]),
+    } for i in final]
+    return sorted(rows, key=lambda row: -row["cv_accuracy"])
+
+
+# --- Latency ---
+
+def time_featurize(dataset_dir, paths, preprocess, engine, hog_params, lbp_params, n_images):
+    """ Median decode + preprocess + featurize time per image, in ms. """
+    timings = []
+    for rel_path in paths[:n_images]:
+        start = time.perf_counter()
+        _featurize_file(os.path.join(dataset_dir, rel_path), engine, preprocess, hog_params, lbp_params)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def time_classify(X, y, C, gamma, n_images):
+    """ Refits on the whole dataset; returns (support vectors, median single-vector decision time in ms). """
+    svm = SVC(kernel="rbf", C=C, gamma=gamma).fit(X, y)
+    rows = np.asarray(X[:n_images])
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        svm.decision_function(row.reshape(1, -1))
+        timings.append((time.perf_counter() - start) * 1000)
+    return int(svm.support_vectors_.shape[0]), statistics.median(timings)
+
+
+# --- Command Line ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune feature and SVM hyperparameters with writer-grouped CV.")
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="feature caches, one sub-folder per feature setting")
+    parser.add_argument("--workers", type=int, default=None, help="featurization processes (default: all cores)")
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel CV fits (default: all cores)")
+    parser.add_argument("--engine", choices=FEATURE_ENGINES, default=None,
+                        help="feature engine for default feature settings (others always use skimage)")
+    parser.add_argument("--preprocess", choices=PREPROCESS_MODES, default=None)
+    parser.add_argument("--orientations", type=int, nargs="+", default=[HOG_PARAMS["orientations"]])
+    parser.add_argument("--cell", type=int, nargs="+", default=[HOG_PARAMS["pixels_per_cell"][0]],
+                        help="HOG cell sizes in pixels (square cells)")
+    parser.add_argument("--lbp", type=parse_lbp, nargs="+", default=[(LBP_PARAMS["P"], LBP_PARAMS["R"])],
+                        help="LBP settings as P:R")
+    parser.add_argument("--C", type=float, nargs="+", default=[0.3, 1.0, 3.0, 10.0, 30.0])
+    parser.add_argument("--gamma-factors", type=float, nargs="+", default=[0.25, 1.0, 4.0],
+                        help="gamma values as multiples of the 'scale' gamma of each feature setting")
+    parser.add_argument("--search", choices=("halving", "grid"), default="halving")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--top", type=int, default=3, help="candidates per feature setting to time")
+    parser.add_argument("--timing-images", type=int, default=50)
+    parser.add_argument("--max-latency-ms", type=float, default=None,
+                        help="pick the most accurate candidate whose featurize + classify time is within this budget")
+    parser.add_argument("--leaderboard", default=LEADERBOARD_FILE, help="where to write the leaderboard as JSON")
+    parser.add_argument("--output", default=TUNED_MODEL_FILENAME, help="path of the tuned model")
+    parser.add_argument("--store", default=None, help="publish the tuned model into this model store instead")
+    pointer = parser.add_mutually_exclusive_group()
+    pointer.add_argument("--activate", action="store_true", help="with --store: serve the tuned model (CURRENT)")
+    pointer.add_argument("--candidate", action="store_true", help="with --store: shadow-score it (CANDIDATE)")
+    args = parser.parse_args()
+    if (args.activate or args.candidate) and not args.store:
+        parser.error("--activate and --candidate need --store.")
+    warnings.simplefilter("ignore", FutureWarning)
+
+    leaderboard = []
+    for hog_params, lbp_params in feature_grid(args.orientations, args.cell, args.lbp):
+        name = describe_features(hog_params, lbp_params)
+        print(f"--- {name} ---")
+        X, y, paths = build_feature_matrix(args.dataset, args.cache_dir, args.workers, args.engine,
+                                           args.preprocess, hog_params, lbp_params)
+        groups = writer_groups(paths)
+        start = time.perf_counter()
+        searcher = search(X, y, groups, svm_grid(X, args.C, args.gamma_factors),
+                          args.search, args.folds, args.seed, args.jobs)
+        rows = candidates(searcher)
+        print(f"{len(rows)} final-round candidates on {len(set(groups))} writers in {time.perf_counter() - start:.1f}s.")
+
+        featurize_ms = time_featurize(args.dataset, paths, args.preprocess, args.engine,
+                                      hog_params, lbp_params, args.timing_images)
+        for row in rows[:args.top]:
+            support_vectors, classify_ms = time_classify(X, y, row["C"], row["gamma"], args.timing_images)
+            leaderboard.append(dict(row, features=name, hog_params=hog_params, lbp_params=lbp_params,
+                                    dims=int(X.shape[1]), support_vectors=support_vectors,
+                                    featurize_ms=featurize_ms, classify_ms=classify_ms,
+                                    total_ms=featurize_ms + classify_ms))
+        del X
+
+    leaderboard.sort(key=lambda row: (-row["cv_accuracy"], row["total_ms"]))
+    print(f"\n{'#':>3}  {'features':<24}{'C':>7}{'gamma':>10}{'cv accuracy':>17}{'cv n':>6}{'dims':>7}{'SVs':>6}"
+          f"{'feat ms':>9}{'svm ms':>8}{'total':>8}")
+    for rank, row in enumerate(leaderboard, 1):
+        print(f"{rank:>3}  {row['features']:<24}{row['C']:>7.2g}{row['gamma']:>10.2e}"
+              f"{row['cv_accuracy']:>10.4f} ±{row['cv_std']:.3f}{row['cv_samples']:>6}{row['dims']:>7}{row['support_vectors']:>6}"
+              f"{row['featurize_ms']:>9.2f}{row['classify_ms']:>8.2f}{row['total_ms']:>8.2f}")
+    with open(args.leaderboard, "w") as f:
+        json.dump({"search": args.search, "folds": args.folds, "leaderboard": leaderboard}, f, indent=2)
+    print(f"Leaderboard written to '{args.leaderboard}'.")
+
+    eligible = [row for row in leaderboard
+                if args.max_latency_ms is None or row["total_ms"] <= args.max_latency_ms]
+    if not eligible:
+        raise SystemExit(f"No candidate runs within {args.max_latency_ms} ms per image.")
+    best = eligible[0]
+    print(f"\nBest: {best['features']}, C={best['C']:.3g}, gamma={best['gamma']:.3g} "
+          f"(cv accuracy {best['cv_accuracy']:.4f}, {best['total_ms']:.2f} ms per image).")
+
+    X, y, paths = build_feature_matrix(args.dataset, args.cache_dir, args.workers, args.engine,
+                                       args.preprocess, best["hog_params"], best["lbp_params"])
+    model, metrics = train(X, y, C=best["C"], gamma=best["gamma"], seed=args.seed)
+    config = feature_config(args.preprocess, best["hog_params"], best["lbp_params"])
+    if config != feature_config(args.preprocess):
+        print("Note: the best feature setting differs from HOG_PARAMS/LBP_PARAMS in features.py; "
+              "update them before serving this model.")
+        if args.activate:
+            raise SystemExit("Not activating a model whose features the server does not produce.")
+    if args.store is None:
+        joblib.dump(model, args.output)
+        print(f"Model saved to '{args.output}'.")
+        return
+
+    manifest = {
+        "feature_config": config,
+        "training_set": {"images": len(paths), "sha256": dataset_digest(args.dataset, paths, y)},
+        "metrics": dict(metrics, cv_accuracy=best["cv_accuracy"], cv_std=best["cv_std"],
+                        latency_ms=best["total_ms"]),
+        "params": {"C": best["C"], "gamma": best["gamma"], "kernel": "rbf", "seed": args.seed},
+        "tuning": {"search": args.search, "folds": args.folds, "cv": "GroupKFold by claimed writer",
+                   "candidates": len(leaderboard)},
+    }
+    pointer = CURRENT if args.activate else CANDIDATE if args.candidate else None
+    version = publish(model, args.store, manifest, pointer)
+    print(f"Model published to '{args.store}' as version {version}" + (f" ({pointer})." if pointer else "."))
+
+if __name__ == "__main__":
+    main()